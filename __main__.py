@@ -1,7 +1,17 @@
 # __main__.py
+import importlib
+import sys
 from colors import print_colored, Colors
-from encryption import encryption_mode
-from decryption import decryption_mode, decryption_mode_manual
+
+# Modes are imported when first chosen, so the menu (and exiting it) starts without
+# loading Pillow, cryptography, argon2 or PyCryptodome. See bench.py for the budget.
+MENU_MODES = {
+    "1": ("encrypt", "encryption", "encryption_mode"),
+    "2": ("decrypt", "decryption", "decryption_mode"),
+    "3": ("manual-decrypt", "decryption", "decryption_mode_manual"),
+    "4": ("vault", "vault_mode", "vault_mode"),
+    "5": ("lookup", "decryption", "lookup_mode"),
+}
 
 def main():
     print_colored("=== Fractured Keys — Offline Password Manager (stego) ===\n", Colors.INFO, Colors.BOLD)
@@ -18,22 +28,31 @@ def main():
         print("1. Encrypt a password and embed into image")
         print("2. Decrypt from stego image (file picker)")
         print("3. Manual decryption / legacy (.bin or base64)")
-        print("4. Exit")
-        choice = input("\nEnter your choice (1-4): ").strip()
-        if choice == "1":
-            encryption_mode()
-        elif choice == "2":
-            decryption_mode()
-        elif choice == "3":
-            decryption_mode_manual()
-        elif choice == "4":
+        print("4. Password vault (many entries in one stego set)")
+        print("5. Find a credential by label (blind index)")
+        print("6. Exit")
+        choice = input("\nEnter your choice (1-6): ").strip()
+        if choice in MENU_MODES:
+            name, module, function = MENU_MODES[choice]
+            mode = getattr(importlib.import_module(module), function)
+            import profiling
+            with profiling.profile_operation(f"menu-{name}"):
+                mode()
+        elif choice == "6":
             print_colored("Goodbye!", Colors.SUCCESS, Colors.BOLD)
             break
         else:
-            print_colored("Invalid choice! Enter 1-4.", Colors.ERROR)
+            print_colored("Invalid choice! Enter 1-6.", Colors.ERROR)
 
         print("\n" + "="*60 + "\n")
 
 if __name__ == "__main__":
+    if sys.argv[1:] == ["--profile"]:   # menu with every entry profiled
+        import profiling
+        profiling.enable()
+        del sys.argv[1:]
+    if len(sys.argv) > 1:
+        from cli import main as cli_main   # subcommands: see cli.py
+        sys.exit(cli_main(sys.argv[1:]))
     main()
 
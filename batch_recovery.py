@@ -0,0 +1,142 @@
+"""
+Recovery of every password share set under a folder with one master password.
+
+    results = recover_folder("backups/", master_password, on_result=print)
+
+The folder is indexed with ShareIndex (in memory unless index_path is given). The
+share records the scan parses are kept; only shares a persistent index already
+knew are read back, in parallel, decoding only the rows that hold the payload.
+Whether a set is complete is judged from its images under the folder alone. For each set K2 is recovered from threshold distinct shares and
+packaged_cipher opened, which needs no master password. The blobs are then grouped
+by salt and Argon2id runs once per distinct salt; every blob of the group is
+decrypted with that key (sets written by the bulk importer share one salt).
+
+Each set ends up with one status:
+    recovered       - password decrypted
+    wrong-password  - the master password does not open the blob
+    incomplete      - fewer than threshold distinct shares in the folder
+    bad-shares      - enough shares, but no threshold of them opens packaged_cipher
+    vault           - a password vault set (use the vault lookup instead)
+
+on_result(result) is called as each set is settled: sets that cannot be decrypted
+right after the shares are read, the others after their salt's derivation.
+progress gets "read" events (shares read) and the "kdf" events of each derivation.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from itertools import combinations
+from typing import Callable, Dict, List, Optional
+from cryptography.exceptions import InvalidTag
+from crypto import decrypt_password_with_key, derive_key_argon2id
+from progress import reporter
+from session_key import open_with_session_key, recover_session_key, split_binary_blob
+from share_index import ShareIndex, folder_prefix, set_digest
+from scrub import MAX_COMBINATIONS, read_share
+from cancel import check
+
+STATUS_RECOVERED = "recovered"
+STATUS_WRONG_PASSWORD = "wrong-password"
+STATUS_INCOMPLETE = "incomplete"
+STATUS_BAD_SHARES = "bad-shares"
+STATUS_VAULT = "vault"
+
+
+class RecoveryResult:
+    __slots__ = ("digest", "total", "threshold", "shares", "paths", "status", "password")
+
+    def __init__(self, digest: str, total: int, threshold: int, paths: List[str]):
+        self.digest = digest
+        self.total = total
+        self.threshold = threshold
+        self.shares = 0            # distinct readable share indices found
+        self.paths = paths
+        self.status: Optional[str] = None
+        self.password: Optional[str] = None
+
+    def __repr__(self):
+        return (f"RecoveryResult(digest={self.digest!r}, status={self.status!r}, "
+                f"shares={self.shares}/{self.total}, threshold={self.threshold})")
+
+
+def _open_set(result: RecoveryResult, records: list):
+    """binary_blob of a set from its (path, record) pairs, or None if no threshold subset opens it."""
+    firsts: Dict[int, object] = {}
+    for _, record in records:
+        if record is not None and set_digest(record.packaged_cipher) == result.digest:
+            firsts.setdefault(record.index, record)
+    result.shares = len(firsts)
+    for tried, subset in enumerate(combinations(sorted(firsts.values(), key=lambda r: r.index), result.threshold)):
+        if tried >= MAX_COMBINATIONS:
+            break
+        try:
+            k2 = recover_session_key([r.share_bytes for r in subset])
+            return open_with_session_key(k2, subset[0].packaged_cipher)
+        except Exception:
+            continue
+    return None
+
+
+def recover_folder(folder: str, master_password: str, index_path: Optional[str] = None,
+                   workers: Optional[int] = None, progress=None, cancel=None,
+                   on_result: Optional[Callable[[RecoveryResult], None]] = None) -> List[RecoveryResult]:
+    """
+    Recover every share set under folder. Returns one RecoveryResult per set, in the
+    order they were settled. cancel: a cancel.CancelToken, checked per share and per salt.
+    """
+    def settle(result: RecoveryResult, status: str):
+        result.status = status
+        results.append(result)
+        if on_result is not None:
+            on_result(result)
+
+    records = {}
+    with ShareIndex(index_path or ":memory:") as index:
+        index.scan(folder, workers=workers, cancel=cancel, records=records)
+        prefix = folder_prefix(folder)
+        sets = [s.within(prefix) for s in index.sets()]
+
+    results: List[RecoveryResult] = []
+    pending = []
+    for share_set in sets:
+        if not share_set.paths:
+            continue
+        result = RecoveryResult(share_set.digest, share_set.total, share_set.threshold, share_set.paths)
+        result.shares = len(set(share_set.indices))
+        if share_set.is_vault:
+            settle(result, STATUS_VAULT)
+        elif not share_set.recoverable:
+            settle(result, STATUS_INCOMPLETE)
+        else:
+            pending.append(result)
+
+    paths = [p for result in pending for p in result.paths if p not in records]
+    report = reporter(progress, "read", len(paths), "shares", cancel=cancel)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        try:
+            for done, (path, record) in enumerate(zip(paths, pool.map(read_share, paths, [cancel] * len(paths))), 1):
+                records[path] = record
+                report.update(done)
+        except BaseException:
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+    report.finish()
+
+    by_salt: Dict[bytes, list] = {}
+    for result in pending:
+        check(cancel)
+        binary_blob = _open_set(result, [(p, records[p]) for p in result.paths])
+        if binary_blob is None:
+            settle(result, STATUS_INCOMPLETE if result.shares < result.threshold else STATUS_BAD_SHARES)
+            continue
+        salt, nonce, ciphertext_with_tag = split_binary_blob(binary_blob)
+        by_salt.setdefault(salt, []).append((result, nonce, ciphertext_with_tag))
+
+    for salt, group in by_salt.items():
+        key = derive_key_argon2id(master_password, salt, progress, cancel)
+        for result, nonce, ciphertext_with_tag in group:
+            try:
+                result.password = decrypt_password_with_key(nonce, ciphertext_with_tag, key)
+                settle(result, STATUS_RECOVERED)
+            except InvalidTag:
+                settle(result, STATUS_WRONG_PASSWORD)
+    return results
@@ -0,0 +1,315 @@
+"""
+Microbenchmarks with stored baselines.
+
+    python -m bench                              # default suite, prints a table
+    python -m bench --json out.json              # also write results
+    python -m bench --save-baseline              # store results as bench_baseline.json
+    python -m bench --baseline bench_baseline.json --threshold 0.15 --threshold-for kdf=0.3
+    python -m bench -k embed --megapixels 1,16,100 --payloads 256,65536
+
+Covered: derive_key_argon2id, AES-GCM packaging (seal/open with K2), Shamir split and
+recover for each available backend, embed/extract across carrier sizes (in
+megapixels) and payload sizes, and cold start of the entry point.
+
+Cold start ("startup.*") runs a fresh interpreter per call: opening and leaving the
+menu, and the CLI's --help. Neither may import the heavy libraries in HEAVY_MODULES;
+those load only when a mode or command needs them. The timings are held to the
+baseline like everything else, and
+
+    python -m bench --import-report
+
+prints where the startup import time goes (from python -X importtime) and exits 1 if
+a heavy library is imported at start.
+
+Each benchmark is warmed up once, then timed for --repeat samples; a sample loops
+the operation until it has run for at least --min-time seconds, so fast operations
+are not dominated by timer resolution. The median per-call time is what baselines
+are compared on: a benchmark regresses when its median exceeds the baseline median
+by more than its threshold. Exit status is 1 if anything regressed.
+
+Large carriers are expensive: 100 MP needs several GB of RAM with the current
+embedder, so the default suite stops at 1 MP.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+from PIL import Image
+from colors import print_colored, Colors
+import sss
+from crypto import derive_key_argon2id
+from session_key import new_session_key, seal_with_session_key, open_with_session_key
+from steganography import MAGIC_LEN, embed_data_into_image, extract_data_from_image
+
+DEFAULT_BASELINE = "bench_baseline.json"
+DEFAULT_THRESHOLD = 0.10
+RESULT_VERSION = 1
+
+_ROOT = os.path.dirname(os.path.abspath(__file__))
+STARTUP_SCENARIOS = {
+    "menu": (["__main__.py"], "6\n"),
+    "cli_help": (["__main__.py", "--help"], ""),
+}
+HEAVY_MODULES = ("PIL", "Crypto", "argon2", "cryptography", "colorama", "sqlite3", "tkinter")
+
+
+class Benchmark:
+    __slots__ = ("name", "run", "setup", "params")
+
+    def __init__(self, name: str, run: Callable, setup: Optional[Callable] = None, params: dict = None):
+        self.name = name
+        self.run = run          # run(state) -> None
+        self.setup = setup      # setup() -> state, called once before timing
+        self.params = params or {}
+
+
+def time_benchmark(bench: Benchmark, repeat: int, min_time: float) -> dict:
+    state = bench.setup() if bench.setup else None
+    bench.run(state)   # warm-up
+    samples = []
+    for _ in range(repeat):
+        loops = 0
+        start = time.perf_counter()
+        while True:
+            bench.run(state)
+            loops += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                break
+        samples.append(elapsed / loops)
+    return {
+        "median_ms": statistics.median(samples) * 1000,
+        "min_ms": min(samples) * 1000,
+        "max_ms": max(samples) * 1000,
+        "samples": len(samples),
+        "params": bench.params,
+    }
+
+
+# --- Benchmark definitions ---
+
+def _sss_backends() -> Dict[str, tuple]:
+    backends = {"pure": (sss._split_bytes_pure, sss._recover_bytes_pure)}
+    if sss._USE_PYCRYPTO:
+        backends["pycryptodome"] = (sss._split_bytes_pycrypto, sss._recover_bytes_pycrypto)
+    return backends
+
+
+def _carrier_size(megapixels: float):
+    side = int((megapixels * 1_000_000) ** 0.5)
+    return side, side
+
+
+def _noise_carrier(folder: str, megapixels: float) -> str:
+    path = os.path.join(folder, f"carrier_{megapixels:g}mp.png")
+    if not os.path.exists(path):
+        size = _carrier_size(megapixels)
+        Image.effect_noise(size, 64).convert('RGB').save(path)
+    return path
+
+
+def _run_startup(scenario: str, extra_flags: List[str] = ()) -> subprocess.CompletedProcess:
+    args, stdin = STARTUP_SCENARIOS[scenario]
+    return subprocess.run([sys.executable, *extra_flags, *args], input=stdin, cwd=_ROOT,
+                          capture_output=True, text=True, check=True)
+
+
+def import_report(scenario: str) -> List[tuple]:
+    """(module, self_us, cumulative_us) for every import of a cold start, in import order."""
+    stderr = _run_startup(scenario, ["-X", "importtime"]).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def heavy_imports(rows: List[tuple]) -> List[str]:
+    return sorted({name for name, _, _ in rows if name.split(".")[0] in HEAVY_MODULES})
+
+
+def build_suite(folder: str, megapixels: List[float], payloads: List[int]) -> List[Benchmark]:
+    suite = [
+        Benchmark("kdf.argon2id", lambda _: derive_key_argon2id("bench-master-password", b"\x00" * 16)),
+    ]
+    for scenario in STARTUP_SCENARIOS:
+        suite.append(Benchmark(f"startup.{scenario}", lambda _, scenario=scenario: _run_startup(scenario),
+                               params={"scenario": scenario}))
+
+    for size in payloads:
+        def seal_setup(size=size):
+            return new_session_key(), os.urandom(size)
+
+        def open_setup(size=size):
+            k2 = new_session_key()
+            return k2, seal_with_session_key(k2, os.urandom(size))
+
+        suite.append(Benchmark(f"aes.package.{size}B", lambda s: seal_with_session_key(*s), seal_setup,
+                               {"payload_bytes": size}))
+        suite.append(Benchmark(f"aes.open.{size}B", lambda s: open_with_session_key(*s), open_setup,
+                               {"payload_bytes": size}))
+
+    for backend, (split, recover) in _sss_backends().items():
+        suite.append(Benchmark(f"sss.split.{backend}", lambda _, split=split: split(os.urandom(16), 3, 2),
+                               params={"backend": backend, "n": 3, "k": 2}))
+        suite.append(Benchmark(f"sss.recover.{backend}", lambda shares, recover=recover: recover(shares[:2]),
+                               lambda split=split: split(os.urandom(16), 3, 2),
+                               {"backend": backend, "n": 3, "k": 2}))
+
+    for mp in megapixels:
+        capacity = _carrier_size(mp)[0] * _carrier_size(mp)[1] * 3 // 8 - MAGIC_LEN - 4
+        for size in payloads:
+            if size > capacity:
+                continue
+            params = {"megapixels": mp, "payload_bytes": size}
+
+            def embed_setup(mp=mp, size=size):
+                carrier = _noise_carrier(folder, mp)
+                return carrier, os.urandom(size), os.path.join(folder, f"stego_{mp:g}mp_{size}.png")
+
+            def extract_setup(mp=mp, size=size):
+                carrier, payload, out = embed_setup(mp, size)
+                embed_data_into_image(carrier, payload, output_path=out)
+                return out
+
+            suite.append(Benchmark(f"stego.embed.{mp:g}MP.{size}B",
+                                   lambda s: embed_data_into_image(s[0], s[1], output_path=s[2]),
+                                   embed_setup, params))
+            suite.append(Benchmark(f"stego.extract.{mp:g}MP.{size}B", extract_data_from_image,
+                                   extract_setup, params))
+    return suite
+
+
+# --- Baselines ---
+
+def compare(results: dict, baseline: dict, threshold: float, overrides: Dict[str, float]) -> List[dict]:
+    """
+    Compare median_ms per benchmark. overrides maps a name prefix to its own threshold
+    (the longest matching prefix wins). Returns one row per benchmark present in both.
+    """
+    rows = []
+    for name, current in results["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        prefixes = [p for p in overrides if name.startswith(p)]
+        limit = overrides[max(prefixes, key=len)] if prefixes else threshold
+        change = current["median_ms"] / base["median_ms"] - 1 if base["median_ms"] else 0.0
+        rows.append({"name": name, "baseline_ms": base["median_ms"], "current_ms": current["median_ms"],
+                     "change": change, "threshold": limit, "regressed": change > limit})
+    return rows
+
+
+def _parse_overrides(items: List[str]) -> Dict[str, float]:
+    overrides = {}
+    for item in items:
+        prefix, _, value = item.partition("=")
+        overrides[prefix] = float(value)
+    return overrides
+
+
+def run_suite(names_filter: Optional[str], megapixels: List[float], payloads: List[int],
+              repeat: int, min_time: float) -> dict:
+    results = {}
+    folder = tempfile.mkdtemp(prefix="fk_bench_")
+    try:
+        for bench in build_suite(folder, megapixels, payloads):
+            if names_filter and names_filter not in bench.name:
+                continue
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                results[bench.name] = time_benchmark(bench, repeat, min_time)
+            print_colored(f"{bench.name:<36}{results[bench.name]['median_ms']:>12.3f} ms", Colors.INFO)
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+    return {
+        "version": RESULT_VERSION,
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "sss_backend": "pycryptodome" if sss._USE_PYCRYPTO else "pure",
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def print_import_report(top: int = 15) -> int:
+    """Print the slowest top-level imports of each startup scenario. Returns 1 if a heavy one is found."""
+    status = 0
+    for scenario in STARTUP_SCENARIOS:
+        rows = import_report(scenario)
+        total_ms = sum(self_us for _, self_us, _ in rows) / 1000
+        print_colored(f"\nstartup.{scenario}: {len(rows)} modules, {total_ms:.1f} ms importing",
+                      Colors.INFO, Colors.BOLD)
+        for name, self_us, cumulative_us in sorted(rows, key=lambda r: -r[2])[:top]:
+            print(f"  {cumulative_us / 1000:>8.1f} ms cumulative {self_us / 1000:>8.1f} ms self  {name}")
+        heavy = heavy_imports(rows)
+        if heavy:
+            print_colored(f"  Imported at start: {', '.join(heavy)}", Colors.ERROR)
+            status = 1
+    return status
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench", description="Fractured Keys microbenchmarks")
+    parser.add_argument("-k", dest="filter", help="only benchmarks whose name contains this")
+    parser.add_argument("--megapixels", default="1", help="carrier sizes in MP, e.g. 1,4,16,100")
+    parser.add_argument("--payloads", default="256,4096", help="payload sizes in bytes")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.05, help="minimum seconds per sample")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help=f"compare against this results file (default: {DEFAULT_BASELINE} if present)")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE, help="store results as the baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown as a fraction (0.10 = 10%%)")
+    parser.add_argument("--threshold-for", action="append", default=[], metavar="PREFIX=FRACTION",
+                        help="per-benchmark threshold, matched by name prefix")
+    parser.add_argument("--import-report", action="store_true",
+                        help="show where cold-start import time goes instead of benchmarking")
+    args = parser.parse_args(argv)
+
+    if args.import_report:
+        return print_import_report()
+
+    results = run_suite(args.filter, [float(v) for v in args.megapixels.split(",")],
+                        [int(v) for v in args.payloads.split(",")], args.repeat, args.min_time)
+    for path in filter(None, (args.json, args.save_baseline)):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print_colored(f"Results written to {path}", Colors.SUCCESS)
+
+    baseline_path = args.baseline or (DEFAULT_BASELINE if os.path.exists(DEFAULT_BASELINE)
+                                      and not args.save_baseline else None)
+    if not baseline_path:
+        return 0
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    rows = compare(results, baseline, args.threshold, _parse_overrides(args.threshold_for))
+    print_colored(f"\nCompared with {baseline_path} ({baseline.get('meta', {}).get('timestamp', '?')}):",
+                  Colors.INFO, Colors.BOLD)
+    for row in rows:
+        color = Colors.ERROR if row["regressed"] else Colors.SUCCESS
+        print_colored(f"{row['name']:<36}{row['baseline_ms']:>10.3f} -> {row['current_ms']:>10.3f} ms "
+                      f"({row['change']:+.1%}, limit {row['threshold']:.0%})", color)
+    regressed = [row["name"] for row in rows if row["regressed"]]
+    if regressed:
+        print_colored(f"{len(regressed)} benchmark(s) regressed.", Colors.ERROR, Colors.BOLD)
+        return 1
+    print_colored("No regressions.", Colors.SUCCESS)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
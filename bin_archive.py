@@ -0,0 +1,343 @@
+"""
+Append-only archive of master-encrypted blobs (salt|nonce|ciphertext) with a footer index.
+
+File layout:
+    ARCHIVE_MAGIC (6) | block | block | ...
+
+    record block = RECORD_MAGIC (4) | id_len (2 BE) | entry_id (utf-8) | blob_len (4 BE) | blob
+                   | crc32(entry_id + blob) (4 BE)
+    index block  = INDEX_MAGIC (4) | body_len (4 BE) | body | crc32(body) (4 BE)
+                   | index_offset (8 BE) | TRAILER_MAGIC (4)
+    index body   = count (4 BE) then per entry:
+                   id_len (2 BE) | entry_id | blob_offset (8 BE) | blob_len (4 BE) | salt (16)
+    delta block  = as an index block, with INDEX_DELTA_MAGIC and
+                   body = prev_index_offset (8 BE) | index body of the entries it adds
+
+Every append writes one record block followed by an index block, so the last 12
+bytes of a healthy file always point at the current index. Usually that is a delta
+block holding just the appended entry and the offset of the index block before
+it; readers follow the chain back to the last full index and apply the deltas in
+order. Once the deltas since that full index outgrow it, the append writes a full
+index instead, so dead index bytes stay proportional to the entries appended and
+the file grows linearly. If an append is torn, readers fall back to a forward scan
+of the CRC-checked blocks and the next append truncates the torn tail first.
+Superseded records and old index blocks are only dropped by compact_archive(),
+which rewrites the file and atomically replaces it.
+"""
+
+import mmap
+import os
+import struct
+import zlib
+from typing import Dict, Optional, Tuple
+
+ARCHIVE_MAGIC = b"FKAR01"
+RECORD_MAGIC = b"FKRC"
+INDEX_MAGIC = b"FKIX"
+INDEX_DELTA_MAGIC = b"FKID"
+TRAILER_MAGIC = b"FKAE"
+SALT_LEN = 16
+
+_U16 = struct.Struct(">H")
+_U32 = struct.Struct(">I")
+_U64 = struct.Struct(">Q")
+_TRAILER = struct.Struct(">Q4s")           # index_offset, TRAILER_MAGIC
+_INDEX_ENTRY = struct.Struct(">QI16s")     # blob_offset, blob_len, salt
+
+
+class ArchiveEntry:
+    __slots__ = ("entry_id", "offset", "length", "salt")
+
+    def __init__(self, entry_id: str, offset: int, length: int, salt: bytes):
+        self.entry_id = entry_id
+        self.offset = offset
+        self.length = length
+        self.salt = salt
+
+
+def is_archive(path: str) -> bool:
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(ARCHIVE_MAGIC)) == ARCHIVE_MAGIC
+    except OSError:
+        return False
+
+
+def _encode_record(entry_id: str, blob: bytes) -> bytes:
+    raw_id = entry_id.encode('utf-8')
+    crc = zlib.crc32(raw_id + blob)
+    return RECORD_MAGIC + _U16.pack(len(raw_id)) + raw_id + _U32.pack(len(blob)) + blob + _U32.pack(crc)
+
+
+def _encode_index(entries: Dict[str, ArchiveEntry], index_offset: int,
+                  prev_offset: Optional[int] = None) -> bytes:
+    """A full index block, or with prev_offset a delta block chained to the index there."""
+    body = bytearray() if prev_offset is None else bytearray(_U64.pack(prev_offset))
+    body += _U32.pack(len(entries))
+    for entry in entries.values():
+        raw_id = entry.entry_id.encode('utf-8')
+        body += _U16.pack(len(raw_id)) + raw_id + _INDEX_ENTRY.pack(entry.offset, entry.length, entry.salt)
+    magic = INDEX_MAGIC if prev_offset is None else INDEX_DELTA_MAGIC
+    return (magic + _U32.pack(len(body)) + bytes(body) + _U32.pack(zlib.crc32(body))
+            + _TRAILER.pack(index_offset, TRAILER_MAGIC))
+
+
+def _parse_index_body(body, pos: int = 0) -> Dict[str, ArchiveEntry]:
+    (count,) = _U32.unpack_from(body, pos)
+    pos += _U32.size
+    entries = {}
+    for _ in range(count):
+        (id_len,) = _U16.unpack_from(body, pos)
+        pos += _U16.size
+        entry_id = bytes(body[pos:pos + id_len]).decode('utf-8')
+        pos += id_len
+        offset, length, salt = _INDEX_ENTRY.unpack_from(body, pos)
+        pos += _INDEX_ENTRY.size
+        entries[entry_id] = ArchiveEntry(entry_id, offset, length, salt)
+    return entries
+
+
+def _read_index_block(buf, pos: int) -> Optional[Tuple[Dict[str, ArchiveEntry], int, Optional[int]]]:
+    """
+    Parse the index or delta block at pos. Returns (entries, end_pos, prev_offset),
+    prev_offset being None for a full index, or None if the block is invalid.
+    """
+    head = pos + len(INDEX_MAGIC) + _U32.size
+    magic = buf[pos:pos + len(INDEX_MAGIC)]
+    if head > len(buf) or magic not in (INDEX_MAGIC, INDEX_DELTA_MAGIC):
+        return None
+    (body_len,) = _U32.unpack_from(buf, pos + len(INDEX_MAGIC))
+    end = head + body_len + _U32.size + _TRAILER.size
+    if end > len(buf):
+        return None
+    body = buf[head:head + body_len]
+    (crc,) = _U32.unpack_from(buf, head + body_len)
+    if zlib.crc32(body) != crc:
+        return None
+    if magic == INDEX_MAGIC:
+        return _parse_index_body(body), end, None
+    return _parse_index_body(body, _U64.size), end, _U64.unpack_from(body, 0)[0]
+
+
+def _index_from_trailer(buf) -> Optional[Tuple[Dict[str, ArchiveEntry], int, int, int]]:
+    """
+    The current index via the trailer and the delta chain. Returns (entries,
+    index_offset, delta_bytes, full_bytes) - the offset of the last index block, the
+    size of the delta blocks since the last full index and of that full index - or
+    None if the trailer or any block of the chain is invalid.
+    """
+    if len(buf) < len(ARCHIVE_MAGIC) + _TRAILER.size:
+        return None
+    index_offset, magic = _TRAILER.unpack_from(buf, len(buf) - _TRAILER.size)
+    if magic != TRAILER_MAGIC:
+        return None
+    parsed = _read_index_block(buf, index_offset)
+    if parsed is None or parsed[1] != len(buf):
+        return None
+    deltas = []
+    pos, delta_bytes = index_offset, 0
+    while parsed[2] is not None:
+        deltas.append(parsed[0])
+        delta_bytes += parsed[1] - pos
+        if parsed[2] >= pos:   # the chain only points backwards
+            return None
+        pos = parsed[2]
+        parsed = _read_index_block(buf, pos)
+        if parsed is None:
+            return None
+    entries = parsed[0]
+    for delta in reversed(deltas):
+        entries.update(delta)
+    return entries, index_offset, delta_bytes, parsed[1] - pos
+
+
+def _scan(buf) -> Tuple[Dict[str, ArchiveEntry], int]:
+    """
+    Rebuild the index by walking blocks from the start. Returns (entries, valid_end):
+    valid_end is where the first torn or corrupt block begins.
+    """
+    entries: Dict[str, ArchiveEntry] = {}
+    pos = len(ARCHIVE_MAGIC)
+    while pos < len(buf):
+        tag = buf[pos:pos + 4]
+        if tag in (INDEX_MAGIC, INDEX_DELTA_MAGIC):
+            parsed = _read_index_block(buf, pos)
+            if parsed is None:
+                break
+            pos = parsed[1]
+            continue
+        if tag != RECORD_MAGIC or pos + 6 > len(buf):
+            break
+        (id_len,) = _U16.unpack_from(buf, pos + 4)
+        id_start = pos + 6
+        len_pos = id_start + id_len
+        if len_pos + _U32.size > len(buf):
+            break
+        (blob_len,) = _U32.unpack_from(buf, len_pos)
+        blob_start = len_pos + _U32.size
+        end = blob_start + blob_len + _U32.size
+        if end > len(buf):
+            break
+        raw_id = bytes(buf[id_start:len_pos])
+        blob = buf[blob_start:blob_start + blob_len]
+        (crc,) = _U32.unpack_from(buf, blob_start + blob_len)
+        if zlib.crc32(raw_id + bytes(blob)) != crc:
+            break
+        entry_id = raw_id.decode('utf-8')
+        entries[entry_id] = ArchiveEntry(entry_id, blob_start, blob_len, bytes(blob[:SALT_LEN]))
+        pos = end
+    return entries, pos
+
+
+class BinArchive:
+    """Read-only, mmap-backed view of an archive. Use as a context manager."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+        if self._map[:len(ARCHIVE_MAGIC)] != ARCHIVE_MAGIC:
+            self.close()
+            raise ValueError("Not a Fractured Keys archive")
+        current = _index_from_trailer(self._map)
+        self.recovered = current is None
+        entries = current[0] if current is not None else _scan(self._map)[0]
+        self.entries: Dict[str, ArchiveEntry] = entries
+
+    def read(self, entry_id: str) -> bytes:
+        """Return the salt|nonce|ciphertext blob for entry_id. Raises KeyError if absent."""
+        entry = self.entries[entry_id]
+        if entry.offset + entry.length > len(self._map):
+            raise ValueError("Archive entry extends beyond end of file")
+        return self._map[entry.offset:entry.offset + entry.length]
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _fsync_dir(path: str):
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def append_entry(path: str, entry_id: str, binary_blob: bytes) -> ArchiveEntry:
+    """
+    Append (or supersede) entry_id. Creates the archive if it does not exist.
+    The record and its new index are written and fsynced before returning.
+    """
+    if not entry_id:
+        raise ValueError("Entry ID cannot be empty")
+    if len(binary_blob) < 28:
+        raise ValueError("Binary blob too small to be valid (need >=28 bytes).")
+
+    if not os.path.exists(path):
+        with open(path, "wb") as f:
+            f.write(ARCHIVE_MAGIC)
+            f.flush()
+            os.fsync(f.fileno())
+        _fsync_dir(path)
+
+    with open(path, "r+b") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            if buf[:len(ARCHIVE_MAGIC)] != ARCHIVE_MAGIC:
+                raise ValueError("Not a Fractured Keys archive")
+            size = len(buf)
+            current = _index_from_trailer(buf)
+            end = size
+            if current is not None:
+                entries, prev_offset, delta_bytes, full_bytes = current
+            else:
+                (entries, end), prev_offset = _scan(buf), None   # rewrite a full index
+        if end != size:
+            f.truncate(end)   # drop the torn tail of an interrupted append
+
+        record = _encode_record(entry_id, binary_blob)
+        raw_id_len = len(entry_id.encode('utf-8'))
+        blob_offset = end + len(RECORD_MAGIC) + _U16.size + raw_id_len + _U32.size
+        entry = ArchiveEntry(entry_id, blob_offset, len(binary_blob), bytes(binary_blob[:SALT_LEN]))
+        entries[entry_id] = entry
+        index_offset = end + len(record)
+
+        index = None
+        if prev_offset is not None:
+            index = _encode_index({entry_id: entry}, index_offset, prev_offset)
+            if delta_bytes + len(index) > full_bytes:
+                index = None   # the chain outgrew the full index: start over from a new one
+        if index is None:
+            index = _encode_index(entries, index_offset)
+
+        f.seek(end)
+        f.write(record + index)
+        f.flush()
+        os.fsync(f.fileno())
+    return entry
+
+
+def compact_archive(path: str) -> Tuple[int, int]:
+    """
+    Rewrite the archive with only the live record of each entry and a single index.
+    The new file replaces the old one atomically. Returns (old_size, new_size).
+    """
+    with BinArchive(path) as archive:
+        old_size = os.path.getsize(path)
+        out = bytearray(ARCHIVE_MAGIC)
+        entries: Dict[str, ArchiveEntry] = {}
+        for entry_id in sorted(archive.entries):
+            blob = archive.read(entry_id)
+            record = _encode_record(entry_id, blob)
+            blob_offset = len(out) + len(record) - len(blob) - _U32.size
+            entries[entry_id] = ArchiveEntry(entry_id, blob_offset, len(blob), bytes(blob[:SALT_LEN]))
+            out += record
+    out += _encode_index(entries, len(out))
+
+    tmp_path = path + ".compact.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(out)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _fsync_dir(path)
+    return old_size, len(out)
+
+
+def main(argv=None):
+    import argparse
+    from colors import print_colored, Colors
+
+    parser = argparse.ArgumentParser(description="Inspect or compact a Fractured Keys .bin archive")
+    parser.add_argument("command", choices=["list", "compact"])
+    parser.add_argument("archive")
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        with BinArchive(args.archive) as archive:
+            if archive.recovered:
+                print_colored("Index trailer invalid - entries recovered by scanning records.", Colors.WARNING)
+            for entry in sorted(archive.entries.values(), key=lambda e: e.entry_id):
+                print_colored(f"{entry.entry_id}  offset={entry.offset} length={entry.length}", Colors.INFO)
+    else:
+        old_size, new_size = compact_archive(args.archive)
+        print_colored(f"Compacted {args.archive}: {old_size} -> {new_size} bytes", Colors.SUCCESS)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Keyed blind index for finding which stego images hold a credential.
+
+Share headers (version 3, see share_codec.py) may carry tags of entry labels:
+    index_key = Argon2id(master_password, index_salt)
+    tag       = HMAC-SHA256(index_key, normalize_label(label))[:BLIND_TAG_LEN]
+index_salt is 16 random bytes made the first time labels are written and kept in a
+file of the user's (FK_BLIND_INDEX_SALT, default ~/.fractured_keys/blind_index.salt),
+never in the shares. One derivation serves every set of the same master password.
+
+Labels are opt-in, because they weaken what a single share gives away. Without them
+one image is useless on its own: the password needs threshold shares. A tag,
+though, is a password check that needs no other share: with the salt file, anyone
+holding one labelled image can test master-password guesses against likely labels
+("github", "email", ...) offline, one Argon2 run per guess. Keeping the salt out of
+the shares makes the attacker get that file too; a fixed salt would also let one
+precomputed guess list serve every user. Losing the salt file loses the lookups
+only (the shares still decrypt), and two images with the same tag still visibly
+hold the same label.
+
+The share index (share_index.py) stores the tags of every scanned header, so a lookup
+is one Argon2 run, one HMAC and an indexed SQLite query - no image decoding.
+"""
+
+import hashlib
+import hmac
+import os
+from typing import List
+from crypto import derive_key_argon2id
+from share_codec import BLIND_TAG_LEN
+from share_index import DEFAULT_INDEX_PATH, ShareIndex, ShareSet
+
+SALT_FILE_ENV = "FK_BLIND_INDEX_SALT"
+DEFAULT_SALT_FILE = os.path.join("~", ".fractured_keys", "blind_index.salt")
+INDEX_SALT_LEN = 16
+LABEL_WARNING = ("Labels let anyone holding one share image and your blind-index salt file "
+                 "test master-password guesses offline.")
+
+
+def index_salt_path() -> str:
+    return os.path.expanduser(os.environ.get(SALT_FILE_ENV) or DEFAULT_SALT_FILE)
+
+
+def load_index_salt(create: bool = False) -> bytes:
+    """
+    This user's blind-index salt. With create, a missing salt file is made (random,
+    readable by the owner only); otherwise a missing file raises ValueError.
+    """
+    path = index_salt_path()
+    try:
+        with open(path, "rb") as f:
+            salt = f.read()
+    except FileNotFoundError:
+        if not create:
+            raise ValueError(f"No blind-index salt at {path}: labels were not written on this machine "
+                             f"(copy the file from the one that wrote them, or set {SALT_FILE_ENV})")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        salt = os.urandom(INDEX_SALT_LEN)
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:   # made meanwhile by another process
+            return load_index_salt()
+        with os.fdopen(fd, "wb") as f:
+            f.write(salt)
+            f.flush()
+            os.fsync(f.fileno())
+    if len(salt) != INDEX_SALT_LEN:
+        raise ValueError(f"Blind-index salt file {path} is damaged")
+    return salt
+
+
+def normalize_label(label: str) -> str:
+    return label.strip().casefold()
+
+
+def derive_index_key(master_password: str, create: bool = False) -> bytes:
+    """Index key of master_password. Writers of tags pass create=True (see load_index_salt)."""
+    return derive_key_argon2id(master_password, load_index_salt(create))
+
+
+def blind_tag(index_key: bytes, label: str) -> bytes:
+    return hmac.new(index_key, normalize_label(label).encode('utf-8'), hashlib.sha256).digest()[:BLIND_TAG_LEN]
+
+
+def lookup(label: str, master_password: str, db_path: str = DEFAULT_INDEX_PATH) -> List[ShareSet]:
+    """Derive the index key once, hash label and return the matching sets from the share index."""
+    tag = blind_tag(derive_index_key(master_password), label)
+    with ShareIndex(db_path) as index:
+        return index.find_tag(tag)
@@ -0,0 +1,78 @@
+"""
+Cooperative cancellation and deadlines for long operations.
+
+    token = CancelToken(timeout=30)      # or CancelToken() and token.cancel() later
+    embed_data_into_image(carrier, payload, out, cancel=token)
+
+The stego functions, Argon2id, the bulk importer, share index scans and scrub take
+cancel=token and call token.check() between stages and files, and every
+progress.CHUNK_BYTES of payload or PNG output. check() raises Cancelled, or
+DeadlineExceeded once the deadline has passed. A cancelled save removes its .part
+file, so no output is left half written. Argon2id and Pillow's decode run in C and
+cannot be interrupted; cancellation takes effect when they return.
+
+Cancelled derives from BaseException, like KeyboardInterrupt, so the per-item
+"except Exception" handlers of batch loops let it through.
+
+The token's flag can be a multiprocessing.Event, for checks inside worker processes
+(see importer.py). In the CLI the first Ctrl-C cancels the command's token
+(install_sigint) and a second one raises KeyboardInterrupt as usual.
+"""
+
+import signal
+import threading
+import time
+from typing import Optional
+
+
+class Cancelled(BaseException):
+    """The operation was cancelled through its CancelToken."""
+
+
+class DeadlineExceeded(Cancelled):
+    """The operation ran past the deadline of its CancelToken."""
+
+
+class CancelToken:
+    __slots__ = ("_event", "deadline", "reason")
+
+    def __init__(self, timeout: Optional[float] = None, event=None):
+        self._event = event if event is not None else threading.Event()
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+        self.reason = "Cancelled"
+
+    def cancel(self, reason: str = "Cancelled"):
+        self.reason = reason
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set() or (self.deadline is not None and time.monotonic() >= self.deadline)
+
+    def remaining(self) -> Optional[float]:
+        """Seconds until the deadline (None without one)."""
+        return None if self.deadline is None else max(0.0, self.deadline - time.monotonic())
+
+    def check(self):
+        if self._event.is_set():
+            raise Cancelled(self.reason)
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            raise DeadlineExceeded("Deadline exceeded")
+
+
+def check(token: Optional[CancelToken]):
+    """token.check() for an optional token."""
+    if token is not None:
+        token.check()
+
+
+def install_sigint(token: CancelToken):
+    """
+    Make the first SIGINT cancel token and the next one raise KeyboardInterrupt.
+    Returns the previous handler (for signal.signal). Main thread only.
+    """
+    def handle(signum, frame):
+        if token._event.is_set():
+            signal.default_int_handler(signum, frame)
+        token.cancel("Interrupted")
+    return signal.signal(signal.SIGINT, handle)
@@ -0,0 +1,494 @@
+"""
+Non-interactive command line for scripted and batch use.
+
+    python . encrypt --out-dir blobs            < secrets.txt
+    python . split blobs/*.bin --out-dir shares
+    python . embed shares/github.share1 shares/github.share2 --carriers a.png b.png
+    python . extract stego/*.png --out-dir shares
+    python . recover shares/* --out-dir blobs
+    python . decrypt blobs/*.bin                < master.txt
+    python . index photos/
+    python . lookup github --master-fd 3        3< master.txt
+    python . scrub backups/ --no-index
+    python . import export.csv --carriers photos/ --out-dir stego < master.txt
+
+Secrets are never taken from arguments: the master password is the first line of
+stdin, or the first line of --master-fd when stdin carries records. encrypt reads its
+records from the remaining stdin lines, either a bare password or a JSON object
+{"id": ..., "password": ...}.
+
+Every result is written to stdout as one JSON object per line as soon as it is ready;
+failures are reported as {"op": ..., "input": ..., "error": ...} lines and processing
+moves on to the next record. Progress output of the library goes to stderr. The exit
+status is 1 if any record failed.
+
+    python . --trace trace.json decrypt blobs/*.bin < master.txt
+
+writes a Chrome trace of the run (see tracing.py); --profile writes a cProfile
+profile of it (see profiling.py). --memory adds a final {"op": "memory", ...} line with
+the peak memory of every stage, and --memory-budget 2G makes large carriers take the
+tiled path or fail up front (see memory.py). --metrics-file PATH writes the counters
+and latency histograms for a node-exporter textfile collector (see metrics.py).
+
+Ctrl-C cancels the running command (see cancel.py): the record in progress is
+abandoned without leaving a partial output, a {"op": "cancelled", ...} line is written
+and the exit status is 130. --timeout SECONDS does the same once the time is up, with
+exit status 124. A second Ctrl-C interrupts immediately.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import re
+import signal
+import sys
+import threading
+from typing import Dict, List
+from share_codec import SHARE_MAGIC, wrap_share_payload, parse_share_payload, records_compatible
+from bin_archive import BinArchive, is_archive
+from share_index import DEFAULT_INDEX_PATH, ShareIndex, folder_prefix, set_digest
+import memory
+from progress import console_callback
+from cancel import CancelToken, Cancelled, DeadlineExceeded, install_sigint
+import metrics
+import profiling
+import tracing
+
+_SAFE_ID = re.compile(r"^[A-Za-z0-9._-]+$")
+EXIT_TIMEOUT = 124       # --timeout ran out (the status timeout(1) uses)
+EXIT_INTERRUPTED = 130   # cancelled by Ctrl-C
+
+
+class _Emitter:
+    """Writes one JSON line per result and remembers whether any record failed."""
+
+    def __init__(self, out):
+        self.out = out
+        self.failed = False
+
+    def emit(self, op: str, **fields):
+        self.out.write(json.dumps(dict(op=op, **fields)) + "\n")
+        self.out.flush()
+
+    def error(self, op: str, source, exc: Exception):
+        self.failed = True
+        self.emit(op, input=source, error=str(exc) or type(exc).__name__)
+
+
+def _progress(args, label: str):
+    """progress= callback for one item when --progress is given, else None."""
+    return console_callback(label) if args.progress else None
+
+
+def _read_line(stream) -> str:
+    line = stream.readline()
+    if not line:
+        raise ValueError("Expected a secret but reached end of input")
+    return line.rstrip("\r\n")
+
+
+def _read_master(args) -> str:
+    if args.master_fd is None:
+        master_password = _read_line(sys.stdin)
+    else:
+        with os.fdopen(args.master_fd, "r", closefd=False) as stream:
+            master_password = _read_line(stream)
+    if not master_password:
+        raise ValueError("Master password cannot be empty")
+    return master_password
+
+
+def _entry_id(value, default: str) -> str:
+    entry_id = str(value) if value is not None else default
+    if not _SAFE_ID.match(entry_id):
+        raise ValueError(f"Entry ID must match {_SAFE_ID.pattern}: {entry_id!r}")
+    return entry_id
+
+
+def _stem(path: str) -> str:
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def _write(path: str, data: bytes) -> str:
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+
+def _load_share(path: str):
+    """Parse a share from a share file written by split/extract or from a stego image."""
+    with open(path, "rb") as f:
+        is_share_file = f.read(len(SHARE_MAGIC)) == SHARE_MAGIC
+    if is_share_file:
+        with open(path, "rb") as f:
+            return parse_share_payload(f.read())
+    from steganography import peek_data_from_image
+    return parse_share_payload(peek_data_from_image(path, 0xFFFFFFFF))
+
+
+# Commands import the pipeline modules they need, so that starting the CLI (or
+# running a command that does not touch images or Argon2) stays fast.
+
+def cmd_encrypt(args, out: _Emitter):
+    from crypto import encrypt_password_aes_gcm
+    master_password = _read_master(args)
+    os.makedirs(args.out_dir, exist_ok=True)
+    for number, line in enumerate(sys.stdin, start=1):
+        line = line.rstrip("\r\n")
+        if not line:
+            continue
+        args.cancel.check()
+        try:
+            record = json.loads(line) if line.startswith("{") else {"password": line}
+            entry_id = _entry_id(record.get("id"), f"entry{number}")
+            salt, nonce, ciphertext_with_tag = encrypt_password_aes_gcm(
+                record["password"], master_password, _progress(args, entry_id), args.cancel)
+            path = _write(os.path.join(args.out_dir, f"{entry_id}.bin"), salt + nonce + ciphertext_with_tag)
+            out.emit("encrypt", id=entry_id, blob=path)
+        except Exception as e:
+            out.error("encrypt", number, e)
+
+
+def cmd_split(args, out: _Emitter):
+    from blind_index import LABEL_WARNING, blind_tag, derive_index_key
+    from session_key import package_binary_blob, split_binary_blob
+    from sss import split_bytes_into_shares
+    blind_tags = []
+    if args.label:
+        print(f"warning: {LABEL_WARNING}", file=sys.stderr)
+        blind_tags = [blind_tag(derive_index_key(_read_master(args), create=True), args.label)]
+    os.makedirs(args.out_dir, exist_ok=True)
+    for blob_path in args.blobs:
+        args.cancel.check()
+        try:
+            with open(blob_path, "rb") as f:
+                binary_blob = f.read()
+            split_binary_blob(binary_blob)   # validates the blob size
+            k2, packaged_cipher = package_binary_blob(binary_blob)
+            shares = split_bytes_into_shares(k2, n=args.shares, k=args.threshold)
+            paths = []
+            for i, share_bytes in enumerate(shares, start=1):
+                payload = wrap_share_payload(share_bytes, i, args.shares, args.threshold, packaged_cipher,
+                                             blind_tags=blind_tags)
+                paths.append(_write(os.path.join(args.out_dir, f"{_stem(blob_path)}.share{i}"), payload))
+            out.emit("split", blob=blob_path, set=set_digest(packaged_cipher),
+                     threshold=args.threshold, shares=paths)
+        except Exception as e:
+            out.error("split", blob_path, e)
+
+
+def cmd_embed(args, out: _Emitter):
+    from steganography import embed_data_into_image
+    if len(args.carriers) != len(args.shares):
+        raise ValueError(f"Got {len(args.shares)} shares but {len(args.carriers)} carriers")
+    if args.out_dir:
+        os.makedirs(args.out_dir, exist_ok=True)
+    for share_path, carrier in zip(args.shares, args.carriers):
+        args.cancel.check()
+        try:
+            with open(share_path, "rb") as f:
+                payload = f.read()
+            record = parse_share_payload(payload)
+            output_path = None
+            if args.out_dir:
+                output_path = os.path.join(args.out_dir, f"{_stem(carrier)}_stego.png")
+            image = embed_data_into_image(carrier, payload, output_path=output_path,
+                                          progress=_progress(args, os.path.basename(carrier)), cancel=args.cancel)
+            out.emit("embed", share=share_path, carrier=carrier, image=image,
+                     set=set_digest(record.packaged_cipher), index=record.index)
+        except Exception as e:
+            out.error("embed", share_path, e)
+
+
+def cmd_extract(args, out: _Emitter):
+    from steganography import peek_data_from_image
+    if args.out_dir:
+        os.makedirs(args.out_dir, exist_ok=True)
+    for image_path in args.images:
+        args.cancel.check()
+        try:
+            payload = peek_data_from_image(image_path, 0xFFFFFFFF)
+            record = parse_share_payload(payload)
+            fields = dict(image=image_path, set=set_digest(record.packaged_cipher), index=record.index,
+                          total=record.total, threshold=record.threshold, vault=record.is_vault)
+            if args.out_dir:
+                fields["share"] = _write(os.path.join(args.out_dir, f"{_stem(image_path)}.share"), payload)
+            out.emit("extract", **fields)
+        except Exception as e:
+            out.error("extract", image_path, e)
+
+
+def cmd_recover(args, out: _Emitter):
+    from session_key import recover_session_key, open_with_session_key
+    groups: Dict[str, List] = {}
+    for path in args.inputs:
+        args.cancel.check()
+        try:
+            record = _load_share(path)
+        except Exception as e:
+            out.error("recover", path, e)
+            continue
+        groups.setdefault(set_digest(record.packaged_cipher), []).append((path, record))
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    for digest, members in groups.items():
+        sources = [path for path, _ in members]
+        try:
+            distinct = list({record.index: record for _, record in members}.values())
+            if not records_compatible(distinct):
+                raise ValueError("Shares do not belong to the same set")
+            first = distinct[0]
+            if first.is_vault:
+                raise ValueError("Vault set: open it from the vault menu")
+            if len(distinct) < first.threshold:
+                raise ValueError(f"Need at least {first.threshold} shares; got {len(distinct)}")
+            k2 = recover_session_key([r.share_bytes for r in distinct[:first.threshold]])
+            binary_blob = open_with_session_key(k2, first.packaged_cipher)
+            path = _write(os.path.join(args.out_dir, f"{digest}.bin"), binary_blob)
+            out.emit("recover", set=digest, inputs=sources, blob=path)
+        except Exception as e:
+            out.error("recover", sources, e)
+
+
+def _iter_blobs(paths: List[str], entry_id: str = None):
+    """Yield (source, entry_id, binary_blob) for .bin files and every (or one) archive entry."""
+    for path in paths:
+        if not is_archive(path):
+            with open(path, "rb") as f:
+                yield path, None, f.read()
+            continue
+        with BinArchive(path) as archive:
+            ids = [entry_id] if entry_id else sorted(archive.entries)
+            for archive_id in ids:
+                yield path, archive_id, bytes(archive.read(archive_id))
+
+
+def cmd_decrypt(args, out: _Emitter):
+    from crypto import decrypt_password_aes_gcm
+    from session_key import split_binary_blob
+    master_password = _read_master(args)
+    for path in args.blobs:
+        try:
+            for source, entry_id, binary_blob in _iter_blobs([path], args.entry_id):
+                args.cancel.check()
+                try:
+                    salt, nonce, ciphertext_with_tag = split_binary_blob(binary_blob)
+                    label = f"{source}#{entry_id}" if entry_id else source
+                    password = decrypt_password_aes_gcm(salt, nonce, ciphertext_with_tag, master_password,
+                                                        _progress(args, label), args.cancel)
+                    out.emit("decrypt", blob=source, id=entry_id, password=password)
+                except Exception as e:
+                    out.error("decrypt", source if entry_id is None else f"{source}#{entry_id}", e)
+        except Exception as e:
+            out.error("decrypt", path, e)
+
+
+def _emit_set(out: _Emitter, op: str, share_set, **fields):
+    out.emit(op, set=share_set.digest, vault=share_set.is_vault, total=share_set.total,
+             threshold=share_set.threshold, recoverable=share_set.recoverable,
+             images=share_set.paths, **fields)
+
+
+def cmd_index(args, out: _Emitter):
+    prefix = folder_prefix(args.folder)
+    with ShareIndex(args.index) as index:
+        stats = index.scan(args.folder, workers=args.workers, cancel=args.cancel)
+        out.emit("scan", folder=args.folder, seen=stats.seen, probed=stats.probed,
+                 removed=stats.removed, shares=stats.shares, skipped=stats.skipped)
+        for share_set in index.sets():
+            share_set = share_set.within(prefix)
+            if share_set.paths:
+                _emit_set(out, "set", share_set)
+
+
+def cmd_lookup(args, out: _Emitter):
+    from blind_index import blind_tag, derive_index_key
+    tag = blind_tag(derive_index_key(_read_master(args)), args.label)
+    with ShareIndex(args.index) as index:
+        for share_set in index.find_tag(tag):
+            _emit_set(out, "lookup", share_set, label=args.label)
+
+
+def cmd_import(args, out: _Emitter):
+    from importer import import_records, iter_records, list_carriers
+    from journal import JobJournal
+    master_password = _read_master(args)
+    if args.labels:
+        from blind_index import LABEL_WARNING
+        print(f"warning: {LABEL_WARNING}", file=sys.stderr)
+    os.makedirs(args.out_dir, exist_ok=True)
+    journal = None
+    if not args.no_journal:
+        params = {"export": os.path.abspath(args.export), "shares": args.shares, "threshold": args.threshold}
+        journal = JobJournal(args.journal or os.path.join(args.out_dir, "import.journal"), params)
+    try:
+        if journal is not None and journal.in_flight:
+            out.emit("resume", journal=journal.path, finished=len(journal.done), in_flight=len(journal.in_flight))
+        results = import_records(iter_records(args.export), master_password, list_carriers(args.carriers),
+                                 args.out_dir, total=args.shares, threshold=args.threshold,
+                                 workers=args.workers, with_blind_index=args.labels, journal=journal,
+                                 cancel=args.cancel)
+        for result in results:
+            if "error" in result:
+                out.failed = True
+            out.emit("import", **result)
+    finally:
+        if journal is not None:
+            journal.close()
+
+
+def cmd_scrub(args, out: _Emitter):
+    from scrub import STATUS_OK, scrub_folder
+    reports = scrub_folder(args.folder, None if args.no_index else args.index, workers=args.workers,
+                           cancel=args.cancel)
+    counts = {}
+    for report in reports:
+        counts[report.status] = counts.get(report.status, 0) + 1
+        if report.status != STATUS_OK:
+            out.failed = True
+        out.emit("scrub", **report.as_dict())
+    out.emit("scrub_summary", folder=args.folder, sets=len(reports), **counts)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="fractured-keys",
+                                     description="Fractured Keys batch commands (JSON-lines output)")
+    parser.add_argument("--trace", metavar="FILE", help="write a Chrome trace of this run to FILE")
+    parser.add_argument("--profile", action="store_true", help="profile this run with cProfile")
+    parser.add_argument("--profile-dir", metavar="DIR",
+                        help=f"folder for --profile output (default: ${profiling.PROFILE_ENV} or "
+                             f"{profiling.DEFAULT_PROFILE_DIR})")
+    parser.add_argument("--memory", action="store_true", help="report peak memory per stage")
+    parser.add_argument("--memory-budget", metavar="SIZE", type=memory.parse_size,
+                        help=f"memory budget such as 512M or 2G (default: ${memory.BUDGET_ENV})")
+    parser.add_argument("--metrics-file", metavar="PATH",
+                        help="write metrics in text exposition format to PATH during and after the run")
+    parser.add_argument("--progress", action="store_true",
+                        help="report embed/save/key-derivation progress on stderr")
+    parser.add_argument("--timeout", type=float, metavar="SECONDS",
+                        help="cancel the command after SECONDS (exit status 124)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def master_fd(p):
+        p.add_argument("--master-fd", type=int, default=None,
+                       help="read the master password from this file descriptor instead of stdin")
+
+    p = sub.add_parser("encrypt", help="encrypt passwords read from stdin into .bin blobs")
+    p.add_argument("--out-dir", required=True)
+    master_fd(p)
+    p.set_defaults(func=cmd_encrypt)
+
+    p = sub.add_parser("split", help="package blobs and split them into share files")
+    p.add_argument("blobs", nargs="+")
+    p.add_argument("--out-dir", required=True)
+    p.add_argument("-n", "--shares", type=int, default=3)
+    p.add_argument("-k", "--threshold", type=int, default=2)
+    p.add_argument("--label", help="blind-index label (needs the master password; see blind_index.py "
+                                   "for what it gives away)")
+    master_fd(p)
+    p.set_defaults(func=cmd_split)
+
+    p = sub.add_parser("embed", help="embed share files into carrier images")
+    p.add_argument("shares", nargs="+")
+    p.add_argument("--carriers", nargs="+", required=True, help="one carrier per share, in order")
+    p.add_argument("--out-dir", help="default: <carrier>_stego.png next to the carrier")
+    p.set_defaults(func=cmd_embed)
+
+    p = sub.add_parser("extract", help="read the share header (and payload) of stego images")
+    p.add_argument("images", nargs="+")
+    p.add_argument("--out-dir", help="also write each payload as a share file")
+    p.set_defaults(func=cmd_extract)
+
+    p = sub.add_parser("recover", help="rebuild the .bin blob of every set found in the inputs")
+    p.add_argument("inputs", nargs="+", help="share files or stego images")
+    p.add_argument("--out-dir", required=True)
+    p.set_defaults(func=cmd_recover)
+
+    p = sub.add_parser("decrypt", help="decrypt .bin blobs or archives with the master password")
+    p.add_argument("blobs", nargs="+")
+    p.add_argument("--entry-id", help="only this entry of an archive")
+    master_fd(p)
+    p.set_defaults(func=cmd_decrypt)
+
+    p = sub.add_parser("index", help="update the share index for a folder and list its sets")
+    p.add_argument("folder")
+    p.add_argument("--index", default=DEFAULT_INDEX_PATH)
+    p.add_argument("--workers", type=int, default=None)
+    p.set_defaults(func=cmd_index)
+
+    p = sub.add_parser("lookup", help="find the sets carrying a blind-index label")
+    p.add_argument("label")
+    p.add_argument("--index", default=DEFAULT_INDEX_PATH)
+    master_fd(p)
+    p.set_defaults(func=cmd_lookup)
+
+    p = sub.add_parser("scrub", help="check every share set under a folder is recoverable (no master password)")
+    p.add_argument("folder")
+    p.add_argument("--index", default=DEFAULT_INDEX_PATH)
+    p.add_argument("--no-index", action="store_true", help="walk the folder without reading or updating the index")
+    p.add_argument("--workers", type=int, default=None)
+    p.set_defaults(func=cmd_scrub)
+
+    p = sub.add_parser("import", help="encrypt and embed every credential of a CSV/JSON export")
+    p.add_argument("export", help=".csv, .json or .jsonl export of another password manager")
+    p.add_argument("--carriers", nargs="+", required=True, help="carrier images or folders of them")
+    p.add_argument("--out-dir", required=True)
+    p.add_argument("-n", "--shares", type=int, default=3)
+    p.add_argument("-k", "--threshold", type=int, default=2)
+    p.add_argument("--workers", type=int, default=None)
+    p.add_argument("--labels", action="store_true",
+                   help="tag shares with blind-index labels (see blind_index.py for what they give away)")
+    p.add_argument("--journal", help="job journal for resuming (default: OUT_DIR/import.journal)")
+    p.add_argument("--no-journal", action="store_true")
+    master_fd(p)
+    p.set_defaults(func=cmd_import)
+    return parser
+
+
+def main(argv=None, out=None) -> int:
+    args = build_parser().parse_args(argv)
+    emitter = _Emitter(out or sys.stdout)
+    if args.trace:
+        tracing.enable(args.trace, at_exit=False)
+    if args.profile:
+        profiling.enable(args.profile_dir)
+    budget = memory.get_budget()
+    if args.memory_budget is not None:
+        memory.set_budget(args.memory_budget)
+    if args.memory:
+        memory.start_accounting()
+    exporter = metrics.TextfileExporter(args.metrics_file).start() if args.metrics_file else None
+    args.cancel = CancelToken(args.timeout)
+    previous_sigint = install_sigint(args.cancel) if threading.current_thread() is threading.main_thread() else None
+    status = None
+    with contextlib.redirect_stdout(sys.stderr):
+        try:
+            with tracing.span(f"cli.{args.command}"), profiling.profile_operation(f"cli-{args.command}"):
+                args.func(args, emitter)
+        except Cancelled as e:
+            # Items finished so far have been reported; the one in progress left no output
+            emitter.emit("cancelled", command=args.command, reason=str(e))
+            status = EXIT_TIMEOUT if isinstance(e, DeadlineExceeded) else EXIT_INTERRUPTED
+        except Exception as e:
+            emitter.error(args.command, None, e)
+        finally:
+            if previous_sigint is not None:
+                signal.signal(signal.SIGINT, previous_sigint)
+            if args.trace:
+                tracing.write_trace(args.trace)
+                tracing.disable()
+            if args.profile:
+                profiling.disable()
+            if args.memory:
+                emitter.emit("memory", stages=memory.stop_accounting(), rss_peak_bytes=memory.peak_rss_bytes())
+            memory.set_budget(budget)
+            if exporter is not None:
+                exporter.stop()
+    if status is not None:
+        return status
+    return 1 if emitter.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,28 +1,42 @@
 # colors.py
-try:
-    from colorama import Fore, Style, init
-    init(autoreset=True)
-    COLORS_AVAILABLE = True
-except Exception:
-    COLORS_AVAILABLE = False
+# Plain ANSI codes (the same values colorama's Fore/Style provide). colorama itself is
+# only needed on Windows, where it translates them for the console; it is imported on
+# the first print_colored call there so that starting a command does not pay for it.
+import os
+import sys
 
 class Colors:
-    SALT = Fore.GREEN if COLORS_AVAILABLE else ""
-    NONCE = Fore.BLUE if COLORS_AVAILABLE else ""
-    CIPHERTEXT = Fore.RED if COLORS_AVAILABLE else ""
-    AUTH_TAG = Fore.MAGENTA if COLORS_AVAILABLE else ""
-    SUCCESS = Fore.GREEN if COLORS_AVAILABLE else ""
-    ERROR = Fore.RED if COLORS_AVAILABLE else ""
-    INFO = Fore.CYAN if COLORS_AVAILABLE else ""
-    WARNING = Fore.YELLOW if COLORS_AVAILABLE else ""
-    RESULT = Fore.LIGHTGREEN_EX if COLORS_AVAILABLE else ""
-    BOLD = Style.BRIGHT if COLORS_AVAILABLE else ""
-    RESET = Style.RESET_ALL if COLORS_AVAILABLE else ""
+    SALT = "\033[32m"
+    NONCE = "\033[34m"
+    CIPHERTEXT = "\033[31m"
+    AUTH_TAG = "\033[35m"
+    SUCCESS = "\033[32m"
+    ERROR = "\033[31m"
+    INFO = "\033[36m"
+    WARNING = "\033[33m"
+    RESULT = "\033[92m"
+    BOLD = "\033[1m"
+    RESET = "\033[0m"
+
+_colorama_ready = None   # None until the first print on Windows, then whether colorama loaded
+
+def _use_colors() -> bool:
+    global _colorama_ready
+    if os.name == "nt":
+        if _colorama_ready is None:
+            try:
+                from colorama import init
+                init(autoreset=True)   # wraps stdout/stderr; strips codes when not a console
+                _colorama_ready = True
+            except Exception:
+                _colorama_ready = False
+        return _colorama_ready
+    isatty = getattr(sys.stdout, "isatty", None)
+    return bool(isatty and isatty())
 
 def print_colored(text: str, color: str = "", style: str = ""):
-    """Print text with specified color and style (no-op if colorama missing)."""
-    if COLORS_AVAILABLE:
+    """Print text with specified color and style (plain text when not writing to a terminal)."""
+    if _use_colors():
         print(f"{style}{color}{text}{Colors.RESET}")
     else:
         print(text)
-
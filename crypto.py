@@ -1,34 +1,72 @@
 # crypto.py
 import os
 from argon2.low_level import hash_secret_raw, Type
+from cryptography.exceptions import InvalidTag
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from tracing import span
+from memory import FIXED_OVERHEAD, check_budget
+from metrics import DECRYPTIONS, KDF_DURATION
+from progress import reporter
+from cancel import check
 
-def derive_key_argon2id(master_password: str, salt: bytes) -> bytes:
+def derive_key_argon2id(master_password: str, salt: bytes, progress=None, cancel=None) -> bytes:
     time_cost = 3
     memory_cost = 65536
     parallelism = 1
     key_length = 32
-    return hash_secret_raw(
-        secret=master_password.encode('utf-8'),
-        salt=salt,
-        time_cost=time_cost,
-        memory_cost=memory_cost,
-        parallelism=parallelism,
-        hash_len=key_length,
-        type=Type.ID
-    )
+    check_budget("Argon2id key derivation", FIXED_OVERHEAD + memory_cost * 1024)
+    check(cancel)   # Argon2 itself cannot be interrupted
+    report = reporter(progress, "kdf", 1, "steps", expected=KDF_DURATION.mean())
+    with span("kdf.argon2id", memory_kib=memory_cost, time_cost=time_cost), KDF_DURATION.time():
+        key = hash_secret_raw(
+            secret=master_password.encode('utf-8'),
+            salt=salt,
+            time_cost=time_cost,
+            memory_cost=memory_cost,
+            parallelism=parallelism,
+            hash_len=key_length,
+            type=Type.ID
+        )
+    report.finish()
+    return key
 
-def encrypt_password_aes_gcm(password: str, master_password: str) -> tuple:
+def encrypt_password_aes_gcm(password: str, master_password: str, progress=None, cancel=None) -> tuple:
     salt = os.urandom(16)
     nonce = os.urandom(12)
-    key = derive_key_argon2id(master_password, salt)
+    key = derive_key_argon2id(master_password, salt, progress, cancel)
     aesgcm = AESGCM(key)
-    ciphertext_with_tag = aesgcm.encrypt(nonce, password.encode('utf-8'), None)
+    with span("aes.encrypt"):
+        ciphertext_with_tag = aesgcm.encrypt(nonce, password.encode('utf-8'), None)
     return salt, nonce, ciphertext_with_tag
 
-def decrypt_password_aes_gcm(salt: bytes, nonce: bytes, ciphertext_with_tag: bytes, master_password: str) -> str:
-    key = derive_key_argon2id(master_password, salt)
+def encrypt_password_with_key(password: str, key: bytes, salt: bytes) -> tuple:
+    """
+    Same output as encrypt_password_aes_gcm, for a key already derived with
+    derive_key_argon2id(master_password, salt). Lets a batch share one derivation;
+    every call still uses a fresh nonce.
+    """
+    nonce = os.urandom(12)
+    with span("aes.encrypt"):
+        ciphertext_with_tag = AESGCM(key).encrypt(nonce, password.encode('utf-8'), None)
+    return salt, nonce, ciphertext_with_tag
+
+def decrypt_password_aes_gcm(salt: bytes, nonce: bytes, ciphertext_with_tag: bytes, master_password: str,
+                             progress=None, cancel=None) -> str:
+    key = derive_key_argon2id(master_password, salt, progress, cancel)
+    return decrypt_password_with_key(nonce, ciphertext_with_tag, key)
+
+def decrypt_password_with_key(nonce: bytes, ciphertext_with_tag: bytes, key: bytes) -> str:
+    """
+    Inverse of encrypt_password_with_key: decrypt with a key already derived from the
+    blob's salt, so blobs sharing a salt share one derivation. Raises InvalidTag.
+    """
     aesgcm = AESGCM(key)
-    plaintext = aesgcm.decrypt(nonce, ciphertext_with_tag, None)
+    with span("aes.decrypt"):
+        try:
+            plaintext = aesgcm.decrypt(nonce, ciphertext_with_tag, None)
+        except InvalidTag:
+            DECRYPTIONS.inc(result="failed")   # wrong master password or tampered blob
+            raise
+    DECRYPTIONS.inc(result="ok")
     return plaintext.decode('utf-8')
 
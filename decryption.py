@@ -1,52 +1,19 @@
 # decryption.py
+import os
 import getpass
 from colors import print_colored, Colors
-from crypto import decrypt_password_aes_gcm
 from file_utils import create_file_chooser, read_binary_file
-from steganography import extract_data_from_image
-from sss import recover_bytes_from_shares
-from cryptography.hazmat.primitives.ciphers.aead import AESGCM
-
-# Share wrapper metadata (must match encryption)
-SHARE_MAGIC = b"FKSS01"
-SHARE_MAGIC_LEN = len(SHARE_MAGIC)
-
-def _parse_share_payload(payload: bytes):
-    """
-    Parse wrapped share payload:
-    SHARE_MAGIC (6) | version (1) | index (1) | total (1) | threshold (1)
-      | share_len (4) | packaged_cipher_len (4) | share_bytes | packaged_cipher_bytes
-    Returns dict with fields.
-    """
-    min_header = SHARE_MAGIC_LEN + 1 + 1 + 1 + 1 + 4 + 4
-    if len(payload) < min_header:
-        raise ValueError("Share payload too short / malformed")
-    if payload[:SHARE_MAGIC_LEN] != SHARE_MAGIC:
-        raise ValueError("Share magic mismatch")
-    pos = SHARE_MAGIC_LEN
-    version = payload[pos]; pos += 1
-    index = payload[pos]; pos += 1
-    total = payload[pos]; pos += 1
-    threshold = payload[pos]; pos += 1
-    share_len = int.from_bytes(payload[pos:pos+4], 'big'); pos += 4
-    packaged_cipher_len = int.from_bytes(payload[pos:pos+4], 'big'); pos += 4
-    if pos + share_len + packaged_cipher_len > len(payload):
-        raise ValueError("Declared sizes exceed payload size")
-    share_bytes = payload[pos:pos+share_len]; pos += share_len
-    packaged_cipher = payload[pos:pos+packaged_cipher_len]
-    return {
-        "version": version,
-        "index": index,
-        "total": total,
-        "threshold": threshold,
-        "share_len": share_len,
-        "packaged_cipher_len": packaged_cipher_len,
-        "share_bytes": share_bytes,
-        "packaged_cipher": packaged_cipher
-    }
-
+from bin_archive import BinArchive, is_archive
+from tracing import traced
+from share_codec import parse_share_payload, records_compatible
+# Pillow, cryptography, argon2 and the share index are imported by the modes that use
+# them, so that manual .bin decryption does not load the image stack.
 
 def decryption_mode():
+    from crypto import decrypt_password_aes_gcm
+    from steganography import extract_data_from_image
+    from session_key import recover_session_key
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
     print_colored("\n--- DECRYPTION MODE (SSS shares from images) ---", Colors.INFO, Colors.BOLD)
     print_colored("You must provide at least 2 stego images (shares).", Colors.INFO)
 
@@ -78,9 +45,9 @@ def decryption_mode():
     for p in selected:
         try:
             payload = extract_data_from_image(p)
-            meta = _parse_share_payload(payload)
+            meta = parse_share_payload(payload)
             parsed_shares.append(meta)
-            print_colored(f"Found share index {meta['index']}/{meta['total']} (threshold={meta['threshold']}) in {p}", Colors.INFO)
+            print_colored(f"Found share index {meta.index}/{meta.total} (threshold={meta.threshold}) in {p}", Colors.INFO)
         except Exception as e:
             print_colored(f"Failed to parse share from {p}: {e}", Colors.ERROR)
 
@@ -89,33 +56,26 @@ def decryption_mode():
         return
 
     # Validate: ensure shares are compatible (same version/total/threshold and packaged_cipher)
-    vs = {s['version'] for s in parsed_shares}
-    totals = {s['total'] for s in parsed_shares}
-    thresholds = {s['threshold'] for s in parsed_shares}
-    pkg_lens = {s['packaged_cipher_len'] for s in parsed_shares}
-    pkg_hashes = {s['packaged_cipher'] for s in parsed_shares}
-    if len(vs) != 1 or len(totals) != 1 or len(thresholds) != 1 or len(pkg_lens) != 1 or len(pkg_hashes) != 1:
+    if not records_compatible(parsed_shares):
         print_colored("Selected shares do not match (version/total/threshold/packaged_cipher mismatch). Aborting.", Colors.ERROR)
         return
 
-    threshold = parsed_shares[0]['threshold']
+    threshold = parsed_shares[0].threshold
     if len(parsed_shares) < threshold:
         print_colored(f"Need at least {threshold} shares to reconstruct; you provided {len(parsed_shares)}.", Colors.ERROR)
         return
 
+    if parsed_shares[0].is_vault:
+        print_colored("These images hold a password vault. Use the vault menu to look up entries.", Colors.WARNING)
+        return
+
     # Build share list for recovery (raw share bytes as produced by sss.split)
-    share_bytes_list = [s['share_bytes'] for s in parsed_shares[:threshold]]
-    packaged_cipher = parsed_shares[0]['packaged_cipher']
+    share_bytes_list = [s.share_bytes for s in parsed_shares[:threshold]]
+    packaged_cipher = parsed_shares[0].packaged_cipher
 
     try:
         # recover ephemeral key K2
-        recovered_k2 = recover_bytes_from_shares(share_bytes_list)
-        # ensure K2 is 16 bytes (pad left if needed)
-        if len(recovered_k2) < 16:
-            recovered_k2 = (b'\x00' * (16 - len(recovered_k2))) + recovered_k2
-        elif len(recovered_k2) > 16:
-            # trim if business; ideally shouldn't happen
-            recovered_k2 = recovered_k2[-16:]
+        recovered_k2 = recover_session_key(share_bytes_list)
 
         print_colored("Recovered ephemeral key from shares.", Colors.SUCCESS)
 
@@ -149,8 +109,96 @@ def decryption_mode():
     except Exception as e:
         print_colored(f"Reconstruction or decryption failed: {e}", Colors.ERROR)
 
+@traced("decrypt.share_set")
+def decrypt_share_set(image_paths, master_password: str) -> str:
+    """Non-interactive reconstruction of a single-password set from its stego images."""
+    from crypto import decrypt_password_aes_gcm
+    from steganography import extract_data_from_image
+    from session_key import recover_session_key, open_with_session_key, split_binary_blob
+    records = [parse_share_payload(extract_data_from_image(p)) for p in image_paths]
+    if not records_compatible(records):
+        raise ValueError("Shares do not belong to the same set")
+    threshold = records[0].threshold
+    if len(records) < threshold:
+        raise ValueError(f"Need at least {threshold} shares; got {len(records)}")
+    k2 = recover_session_key([r.share_bytes for r in records[:threshold]])
+    salt, nonce, ciphertext_with_tag = split_binary_blob(open_with_session_key(k2, records[0].packaged_cipher))
+    return decrypt_password_aes_gcm(salt, nonce, ciphertext_with_tag, master_password)
+
+def lookup_mode():
+    """Find the stego images holding a labelled credential, then decrypt only that set."""
+    from blind_index import blind_tag, derive_index_key
+    from share_index import DEFAULT_INDEX_PATH, ShareIndex
+    from vault import lookup_in_set
+    print_colored("\n--- FIND CREDENTIAL (blind index) ---", Colors.INFO, Colors.BOLD)
+    folder = input("Folder of stego images to search (Enter to use the existing index only): ").strip()
+    if folder and not os.path.isdir(folder):
+        print_colored("Folder not found. Aborting.", Colors.ERROR)
+        return
+    index_path = input(f"Share index file (default: {DEFAULT_INDEX_PATH}): ").strip() or DEFAULT_INDEX_PATH
+
+    label = input("Label to find (e.g. github): ").strip()
+    if not label:
+        print_colored("Label cannot be empty.", Colors.ERROR)
+        return
+    master_password = getpass.getpass("Enter master password: ").strip()
+    if not master_password:
+        print_colored("Master password cannot be empty.", Colors.ERROR)
+        return
+
+    try:
+        with ShareIndex(index_path) as index:
+            if folder:
+                stats = index.scan(folder)
+                print_colored(f"Scanned {stats.seen} images ({stats.probed} new or changed), "
+                              f"{stats.shares} shares indexed.", Colors.SUCCESS)
+            print_colored("Deriving blind-index key...", Colors.INFO)
+            matches = index.find_tag(blind_tag(derive_index_key(master_password), label))
+        if not matches:
+            print_colored(f"No indexed set is labelled '{label}'.", Colors.WARNING)
+            return
+        for m in matches:
+            kind = "vault" if m.is_vault else "password"
+            print_colored(f"Set {m.digest} ({kind}, {len(m.paths)}/{m.total} images, threshold {m.threshold}):", Colors.INFO, Colors.BOLD)
+            for path in m.paths:
+                print_colored(f"  {path}", Colors.INFO)
+
+        usable = [m for m in matches if m.recoverable]
+        if not usable:
+            print_colored("No matching set has enough indexed images to decrypt.", Colors.ERROR)
+            return
+        if input("\nDecrypt the matching set now? (Y/n): ").strip().lower() == 'n':
+            return
+        target = usable[0]
+        if target.is_vault:
+            plaintext = lookup_in_set(target.distinct_paths(), master_password, label)
+        else:
+            plaintext = decrypt_share_set(target.distinct_paths(), master_password)
+        print_colored("\n--- DECRYPTION RESULTS ---", Colors.SUCCESS, Colors.BOLD)
+        print_colored(f"Decrypted password for '{label}': {plaintext}", Colors.RESULT, Colors.BOLD)
+    except Exception as e:
+        print_colored(f"Lookup failed: {e}", Colors.ERROR)
+
+def _read_archive_blob(file_path: str):
+    """Let the user pick one entry of an archive; returns its blob or None."""
+    with BinArchive(file_path) as archive:
+        if archive.recovered:
+            print_colored("Archive index is damaged; entries were recovered by scanning records.", Colors.WARNING)
+        if not archive.entries:
+            print_colored("Archive contains no entries.", Colors.ERROR)
+            return None
+        print_colored(f"Archive holds {len(archive.entries)} entries:", Colors.INFO)
+        for entry_id in sorted(archive.entries):
+            print_colored(f"  {entry_id}", Colors.INFO)
+        entry_id = input("Entry ID to decrypt: ").strip()
+        if entry_id not in archive.entries:
+            print_colored(f"No entry '{entry_id}' in archive.", Colors.ERROR)
+            return None
+        return archive.read(entry_id)
+
 def decryption_mode_manual():
-    """Manual decryption for .bin files."""
+    """Manual decryption for .bin files and indexed .bin archives."""
+    from crypto import decrypt_password_aes_gcm
     print_colored("\n--- MANUAL DECRYPTION MODE (.bin files) ---", Colors.INFO, Colors.BOLD)
     
     # Ask for .bin file path
@@ -161,9 +209,14 @@ def decryption_mode_manual():
         return
     
     try:
-        # Read binary file
-        with open(file_path, "rb") as f:
-            binary_blob = f.read()
+        if is_archive(file_path):
+            binary_blob = _read_archive_blob(file_path)
+            if binary_blob is None:
+                return
+        else:
+            # Read binary file
+            with open(file_path, "rb") as f:
+                binary_blob = f.read()
         
         if len(binary_blob) < 28:
             print_colored("File too small to be valid (need >=28 bytes).", Colors.ERROR)
@@ -186,4 +239,3 @@ def decryption_mode_manual():
         
     except Exception as e:
         print_colored(f"Manual decryption failed: {e}", Colors.ERROR)
-
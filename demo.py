@@ -2,20 +2,38 @@
 """
 Fractured Keys Demo Script
 Demonstrates the complete workflow of encrypting and decrypting passwords
+
+With --load it becomes a load generator: N concurrent clients each run a weighted
+mix of the encrypt / embed / extract / decrypt stages on synthetic carriers, and
+throughput plus p50/p95/p99 latency per stage are reported.
+
+    python demo.py --load --clients 8 --duration 30 --mix encrypt=1,embed=2,extract=2,decrypt=1 \
+                   --sizes 200x200,1024x768 --json load.json
 """
 
 import sys
 import os
+import argparse
+import contextlib
+import json
+import math
+import random
+import shutil
 import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
+from typing import Dict, List, Tuple
 
 # Add current directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from colors import print_colored, Colors
 from crypto import encrypt_password_aes_gcm, decrypt_password_aes_gcm
-from sss import split_bytes_into_shares, recover_bytes_from_shares
+from sss import split_bytes_into_shares
+from session_key import recover_session_key, package_binary_blob, open_with_session_key
 from steganography import embed_data_into_image, extract_data_from_image
+from share_codec import wrap_share_payload, parse_share_payload, records_compatible
 from PIL import Image
 
 def create_demo_images():
@@ -110,57 +128,6 @@ def demo_encryption():
     
     return stego_images, master_password
 
-def wrap_share_payload(share_bytes, index, total, threshold, packaged_cipher):
-    """Wrap share payload with metadata"""
-    SHARE_MAGIC = b"FKSS01"
-    SHARE_VERSION = 1
-    
-    header = bytearray()
-    header += SHARE_MAGIC
-    header.append(SHARE_VERSION & 0xFF)
-    header.append(index & 0xFF)
-    header.append(total & 0xFF)
-    header.append(threshold & 0xFF)
-    header += len(share_bytes).to_bytes(4, 'big')
-    header += len(packaged_cipher).to_bytes(4, 'big')
-    return bytes(header) + share_bytes + packaged_cipher
-
-def parse_share_payload(payload):
-    """Parse wrapped share payload"""
-    SHARE_MAGIC = b"FKSS01"
-    SHARE_MAGIC_LEN = len(SHARE_MAGIC)
-    
-    min_header = SHARE_MAGIC_LEN + 1 + 1 + 1 + 1 + 4 + 4
-    if len(payload) < min_header:
-        raise ValueError("Share payload too short")
-    if payload[:SHARE_MAGIC_LEN] != SHARE_MAGIC:
-        raise ValueError("Share magic mismatch")
-        
-    pos = SHARE_MAGIC_LEN
-    version = payload[pos]; pos += 1
-    index = payload[pos]; pos += 1
-    total = payload[pos]; pos += 1
-    threshold = payload[pos]; pos += 1
-    share_len = int.from_bytes(payload[pos:pos+4], 'big'); pos += 4
-    packaged_cipher_len = int.from_bytes(payload[pos:pos+4], 'big'); pos += 4
-    
-    if pos + share_len + packaged_cipher_len > len(payload):
-        raise ValueError("Declared sizes exceed payload size")
-        
-    share_bytes = payload[pos:pos+share_len]; pos += share_len
-    packaged_cipher = payload[pos:pos+packaged_cipher_len]
-    
-    return {
-        "version": version,
-        "index": index,
-        "total": total,
-        "threshold": threshold,
-        "share_len": share_len,
-        "packaged_cipher_len": packaged_cipher_len,
-        "share_bytes": share_bytes,
-        "packaged_cipher": packaged_cipher
-    }
-
 def demo_decryption(stego_images, master_password):
     """Demonstrate decryption process"""
     print_colored("\n" + "="*60, Colors.INFO)
@@ -179,7 +146,7 @@ def demo_decryption(stego_images, master_password):
         payload = extract_data_from_image(image_path)
         meta = parse_share_payload(payload)
         parsed_shares.append(meta)
-        print_colored(f"Found share {meta['index']}/{meta['total']} (threshold={meta['threshold']})", Colors.SUCCESS)
+        print_colored(f"Found share {meta.index}/{meta.total} (threshold={meta.threshold})", Colors.SUCCESS)
     
     # Step 2: Validate shares
     print_colored("\n🔍 Step 2: Validating shares...", Colors.INFO)
@@ -188,16 +155,11 @@ def demo_decryption(stego_images, master_password):
         return
     
     # Check compatibility
-    vs = {s['version'] for s in parsed_shares}
-    totals = {s['total'] for s in parsed_shares}
-    thresholds = {s['threshold'] for s in parsed_shares}
-    pkg_hashes = {s['packaged_cipher'] for s in parsed_shares}
-    
-    if len(vs) != 1 or len(totals) != 1 or len(thresholds) != 1 or len(pkg_hashes) != 1:
+    if not records_compatible(parsed_shares):
         print_colored("❌ Shares are not compatible", Colors.ERROR)
         return
     
-    threshold = parsed_shares[0]['threshold']
+    threshold = parsed_shares[0].threshold
     if len(parsed_shares) < threshold:
         print_colored(f"❌ Need at least {threshold} shares", Colors.ERROR)
         return
@@ -206,14 +168,10 @@ def demo_decryption(stego_images, master_password):
     
     # Step 3: Recover ephemeral key
     print_colored("\n🔑 Step 3: Recovering ephemeral key from shares...", Colors.INFO)
-    share_bytes_list = [s['share_bytes'] for s in parsed_shares[:threshold]]
-    packaged_cipher = parsed_shares[0]['packaged_cipher']
+    share_bytes_list = [s.share_bytes for s in parsed_shares[:threshold]]
+    packaged_cipher = parsed_shares[0].packaged_cipher
     
-    recovered_k2 = recover_bytes_from_shares(share_bytes_list)
-    if len(recovered_k2) < 16:
-        recovered_k2 = (b'\x00' * (16 - len(recovered_k2))) + recovered_k2
-    elif len(recovered_k2) > 16:
-        recovered_k2 = recovered_k2[-16:]
+    recovered_k2 = recover_session_key(share_bytes_list)
     
     print_colored("✅ Ephemeral key recovered successfully", Colors.SUCCESS)
     
@@ -255,6 +213,161 @@ def cleanup_demo_files():
             os.remove(filename)
             print_colored(f"Removed: {filename}", Colors.SUCCESS)
 
+# --- Load generator ---
+
+STAGES = ("encrypt", "embed", "extract", "decrypt")
+LOAD_MASTER_PASSWORD = "LoadTest-Master-1"
+LOAD_PASSWORD = "LoadTest-Password-1"
+
+def _parse_mix(text: str) -> Dict[str, float]:
+    """'encrypt=1,embed=2' -> {'encrypt': 1.0, 'embed': 2.0}"""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in STAGES:
+            raise ValueError(f"Unknown stage '{name}' (choose from {', '.join(STAGES)})")
+        mix[name] = float(weight or 1)
+    if not any(w > 0 for w in mix.values()):
+        raise ValueError("Stage mix needs at least one positive weight")
+    return mix
+
+def _parse_sizes(text: str) -> List[Tuple[int, int]]:
+    """'200x200,1024x768' -> [(200, 200), (1024, 768)]"""
+    sizes = []
+    for part in text.split(","):
+        width, _, height = part.lower().partition("x")
+        sizes.append((int(width), int(height)))
+    return sizes
+
+def _synthetic_carrier(path: str, size: Tuple[int, int], rng: random.Random) -> str:
+    """Noise image: compresses like a photo, unlike the flat demo images."""
+    width, height = size
+    Image.frombytes('RGB', size, rng.randbytes(width * height * 3)).save(path)
+    return path
+
+def _run_client(client_id: int, mix: Dict[str, float], sizes: List[Tuple[int, int]],
+                requests: int, duration: float, workdir: str, quiet: bool = True) -> dict:
+    """
+    One simulated client. Returns its per-stage latencies (seconds) and active window.
+    quiet silences the library's progress output (process-wide, so threaded clients
+    leave it to run_load).
+    """
+    rng = random.Random(client_id)
+    folder = os.path.join(workdir, f"client_{client_id}")
+    os.makedirs(folder, exist_ok=True)
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    latencies = {name: [] for name in names}
+    errors = {name: 0 for name in names}
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull if quiet else sys.stdout):
+        carriers = [_synthetic_carrier(os.path.join(folder, f"carrier_{w}x{h}.png"), (w, h), rng)
+                    for w, h in sizes]
+        salt, nonce, ciphertext_with_tag = encrypt_password_aes_gcm(LOAD_PASSWORD, LOAD_MASTER_PASSWORD)
+        binary_blob = salt + nonce + ciphertext_with_tag
+        stego_path = os.path.join(folder, "stego.png")
+
+        spare_share = None
+
+        def stage_embed():
+            nonlocal spare_share
+            k2, packaged_cipher = package_binary_blob(binary_blob)
+            shares = split_bytes_into_shares(k2, n=3, k=2)
+            payload = wrap_share_payload(shares[0], 1, 3, 2, packaged_cipher)
+            embed_data_into_image(rng.choice(carriers), payload, output_path=stego_path)
+            spare_share = shares[1]
+
+        def stage_extract():
+            record = parse_share_payload(extract_data_from_image(stego_path))
+            k2 = recover_session_key([bytes(record.share_bytes), spare_share])
+            open_with_session_key(k2, record.packaged_cipher)
+
+        stages = {
+            "encrypt": lambda: encrypt_password_aes_gcm(LOAD_PASSWORD, LOAD_MASTER_PASSWORD),
+            "embed": stage_embed,
+            "extract": stage_extract,
+            "decrypt": lambda: decrypt_password_aes_gcm(salt, nonce, ciphertext_with_tag, LOAD_MASTER_PASSWORD),
+        }
+        stage_embed()   # every client starts with a stego image to extract from
+
+        started = time.perf_counter()
+        deadline = started + duration if duration else None
+        done = 0
+        while (not requests or done < requests) and (deadline is None or time.perf_counter() < deadline):
+            name = rng.choices(names, weights)[0]
+            t0 = time.perf_counter()
+            try:
+                stages[name]()
+            except Exception:
+                errors[name] += 1
+            latencies[name].append(time.perf_counter() - t0)
+            done += 1
+        finished = time.perf_counter()
+    return {"latencies": latencies, "errors": errors, "started": started, "finished": finished}
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def summarize_load(results: List[dict]) -> dict:
+    """Merge client results into per-stage throughput and latency percentiles (ms)."""
+    wall = max(r["finished"] for r in results) - min(r["started"] for r in results)
+    stages = {}
+    for name in STAGES:
+        values = sorted(v for r in results for v in r["latencies"].get(name, []))
+        if not values:
+            continue
+        stages[name] = {
+            "ops": len(values),
+            "errors": sum(r["errors"].get(name, 0) for r in results),
+            "ops_per_sec": len(values) / wall if wall > 0 else 0.0,
+            "p50_ms": _percentile(values, 50) * 1000,
+            "p95_ms": _percentile(values, 95) * 1000,
+            "p99_ms": _percentile(values, 99) * 1000,
+        }
+    total_ops = sum(s["ops"] for s in stages.values())
+    return {"clients": len(results), "wall_sec": wall, "total_ops": total_ops,
+            "ops_per_sec": total_ops / wall if wall > 0 else 0.0, "stages": stages}
+
+def run_load(clients: int = 4, mix: Dict[str, float] = None, sizes: List[Tuple[int, int]] = None,
+             requests: int = 20, duration: float = 0, use_threads: bool = False) -> dict:
+    """Run the load generator and return summarize_load() of all clients."""
+    mix = mix or {name: 1.0 for name in STAGES}
+    sizes = sizes or [(200, 200)]
+    workdir = tempfile.mkdtemp(prefix="fk_load_")
+    executor = ThreadPoolExecutor if use_threads else ProcessPoolExecutor
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            with executor(max_workers=clients) as pool:
+                futures = [pool.submit(_run_client, i, mix, sizes, requests, duration, workdir, not use_threads)
+                           for i in range(clients)]
+                results = [f.result() for f in futures]
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return summarize_load(results)
+
+def print_load_report(summary: dict):
+    print_colored(f"\n📈 {summary['clients']} clients, {summary['total_ops']} ops in "
+                  f"{summary['wall_sec']:.1f}s ({summary['ops_per_sec']:.1f} ops/s)", Colors.INFO, Colors.BOLD)
+    print_colored(f"{'stage':<9}{'ops':>7}{'err':>5}{'ops/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}", Colors.INFO)
+    for name, s in summary["stages"].items():
+        color = Colors.ERROR if s["errors"] else Colors.RESULT
+        print_colored(f"{name:<9}{s['ops']:>7}{s['errors']:>5}{s['ops_per_sec']:>9.1f}"
+                      f"{s['p50_ms']:>10.1f}{s['p95_ms']:>10.1f}{s['p99_ms']:>10.1f}", color)
+
+def load_main(args):
+    summary = run_load(clients=args.clients, mix=_parse_mix(args.mix), sizes=_parse_sizes(args.sizes),
+                       requests=args.requests, duration=args.duration, use_threads=args.threads)
+    print_load_report(summary)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        print_colored(f"Results written to {args.json}", Colors.SUCCESS)
+
 def main():
     """Main demo function"""
     print_colored("🔐 FRACTURED KEYS - COMPLETE DEMO", Colors.INFO, Colors.BOLD)
@@ -282,4 +395,25 @@ def main():
         print_colored("\n✨ Demo finished. All temporary files cleaned up.", Colors.INFO)
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Fractured Keys demo and load generator")
+    parser.add_argument("--load", action="store_true", help="run the load generator instead of the demo")
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=None,
+                        help="operations per client; with --duration too, whichever limit is hit first stops "
+                             "the client (default: 20, or 0 = no limit when --duration is given)")
+    parser.add_argument("--duration", type=float, default=0,
+                        help="seconds per client; with --requests too, whichever limit is hit first stops "
+                             "the client (0: no time limit)")
+    parser.add_argument("--mix", default="encrypt=1,embed=1,extract=1,decrypt=1", help="stage=weight,...")
+    parser.add_argument("--sizes", default="200x200", help="carrier sizes, e.g. 200x200,1024x768")
+    parser.add_argument("--threads", action="store_true", help="clients as threads instead of processes")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+    if args.requests is None:
+        args.requests = 0 if args.duration else 20
+    if args.load and not args.requests and not args.duration:
+        parser.error("--requests 0 needs a --duration, or the load never ends")
+    if args.load:
+        load_main(args)
+    else:
+        main()
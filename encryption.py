@@ -6,35 +6,13 @@ from colors import print_colored, Colors
 from crypto import encrypt_password_aes_gcm
 from file_utils import create_file_chooser, save_binary_file_manual
 from steganography import embed_data_into_image
+from progress import console_callback
 from sss import split_bytes_into_shares
+from share_codec import wrap_share_payload
+from bin_archive import append_entry, is_archive
+from blind_index import LABEL_WARNING, blind_tag, derive_index_key
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 
-# Share wrapper metadata
-SHARE_MAGIC = b"FKSS01"   # 6 bytes
-SHARE_VERSION = 1
-
-def _wrap_share_payload(share_bytes: bytes, index: int, total: int, threshold: int,
-                        packaged_cipher: bytes) -> bytes:
-    """
-    Build binary payload for embedding containing:
-    SHARE_MAGIC (6) | version (1) | index (1) | total (1) | threshold (1)
-      | share_len (4 BE) | packaged_cipher_len (4 BE) | share_bytes | packaged_cipher_bytes
-    """
-    if not isinstance(share_bytes, (bytes, bytearray)):
-        raise TypeError("share_bytes must be bytes")
-    if not isinstance(packaged_cipher, (bytes, bytearray)):
-        raise TypeError("packaged_cipher must be bytes")
-
-    header = bytearray()
-    header += SHARE_MAGIC
-    header.append(SHARE_VERSION & 0xFF)
-    header.append(index & 0xFF)
-    header.append(total & 0xFF)
-    header.append(threshold & 0xFF)
-    header += len(share_bytes).to_bytes(4, 'big')
-    header += len(packaged_cipher).to_bytes(4, 'big')
-    return bytes(header) + share_bytes + packaged_cipher
-
 def encryption_mode():
     print_colored("\n--- ENCRYPTION MODE (SSS shares -> images) ---", Colors.INFO, Colors.BOLD)
     password = getpass.getpass("Enter the password to encrypt: ").strip()
@@ -49,7 +27,8 @@ def encryption_mode():
 
     try:
         print_colored("Encrypting (master password) ...", Colors.INFO)
-        salt, nonce, ciphertext_with_tag = encrypt_password_aes_gcm(password, master_password)
+        salt, nonce, ciphertext_with_tag = encrypt_password_aes_gcm(password, master_password,
+                                                                    console_callback("Key derivation"))
 
         # show to user
         ciphertext = ciphertext_with_tag[:-16]
@@ -65,11 +44,25 @@ def encryption_mode():
         # Ask whether to split into shares + embed
         do_shares = input("\nSplit into 3 SSS shares (threshold 2) and embed into 3 images? (Y/n): ").strip().lower()
         if do_shares == 'n':
-            # fallback: save raw binary
+            # fallback: save raw binary, or append to an indexed archive
             filename = input("Enter filename for binary export (default: encrypted_output.bin): ").strip() or "encrypted_output.bin"
             if not filename.lower().endswith(".bin"):
                 filename += ".bin"
-            save_binary_file_manual(filename, binary_blob)
+            if is_archive(filename):
+                use_archive = True
+            elif os.path.exists(filename):
+                use_archive = False
+            else:
+                use_archive = input("Store as an indexed archive so more passwords can be appended later? (y/N): ").strip().lower() == 'y'
+            if not use_archive:
+                save_binary_file_manual(filename, binary_blob)
+                return
+            entry_id = input("Entry ID for this password (e.g. github): ").strip()
+            if not entry_id:
+                print_colored("Entry ID cannot be empty.", Colors.ERROR)
+                return
+            append_entry(filename, entry_id, binary_blob)
+            print_colored(f"Entry '{entry_id}' appended to archive {filename}", Colors.SUCCESS)
             return
 
         # Now: generate a random 16-byte session key K2, encrypt binary_blob with K2,
@@ -81,6 +74,14 @@ def encryption_mode():
         packaged_ct_and_tag = aes.encrypt(nonce2, binary_blob, None)  # ciphertext + tag
         packaged_cipher = nonce2 + packaged_ct_and_tag  # we'll store this in each image
 
+        # Optional blind-index label so the set can be found later without decrypting every set
+        blind_tags = []
+        print_colored(f"A blind-index label makes this set findable later. {LABEL_WARNING}", Colors.WARNING)
+        label = input("Label for later lookup (optional, e.g. github; Enter to skip): ").strip()
+        if label:
+            print_colored("Deriving blind-index key...", Colors.INFO)
+            blind_tags = [blind_tag(derive_index_key(master_password, create=True), label)]
+
         # Split K2 into shares
         n_shares = 3
         threshold = 2
@@ -97,7 +98,8 @@ def encryption_mode():
                 return
 
             # wrap share with metadata (include packaged_cipher duplicated in each share)
-            payload = _wrap_share_payload(share_bytes, index=i, total=n_shares, threshold=threshold, packaged_cipher=packaged_cipher)
+            payload = wrap_share_payload(share_bytes, index=i, total=n_shares, threshold=threshold, packaged_cipher=packaged_cipher,
+                                         blind_tags=blind_tags)
 
             # ask output
             choose_output = input(f"Choose output filename for stego image for share {i}? (Y/n): ").strip().lower()
@@ -110,7 +112,8 @@ def encryption_mode():
                     output_path = None
 
             try:
-                saved_path = embed_data_into_image(carrier_path, payload, output_path=output_path)
+                saved_path = embed_data_into_image(carrier_path, payload, output_path=output_path,
+                                                   progress=console_callback(f"Share {i}"))
                 print_colored(f"✓ Share {i} embedded into {saved_path}", Colors.SUCCESS)
             except Exception as e:
                 print_colored(f"Steganography embedding failed for share {i}: {e}", Colors.ERROR)
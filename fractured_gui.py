@@ -3,22 +3,106 @@
 Fractured Key - Premium Modern GUI
 A next-generation secure authentication system with a 2025 SaaS-style interface.
 Blue theme with glassmorphism, smooth animations, and premium typography.
+
+Startup: only the landing page (and status bar) is built before the first frame.
+The header, sidebar and each tab are built on first use, or ahead of time while
+the app is idle once the landing animation has finished; the crypto and imaging
+modules are imported on a background thread at the same point. Launch-to-first-
+paint and build times are kept in FracturedKeyApp.startup_timings and traced as
+"gui.first_paint", "gui.build_main" and "gui.build_tab".
+
+Output panes: _log_output() only puts a LogEvent on a queue, so workers may call
+it from any thread. The Tk loop drains the queue every LOG_PUMP_INTERVAL_MS with
+one insert per pane, and each pane keeps at most LOG_MAX_LINES lines.
+
+Crypto work (Argon2, AES, Shamir, stego) runs on one persistent pool of
+CRYPTO_WORKERS threads owned by the app, started and warmed up with the pipeline
+imports during the idle prewarm. Tabs hand it jobs with _submit(); completion
+callbacks come back through the same queue as the log lines, in order with them.
+Speculative work (carrier header reads, share reads and key recovery ahead of
+Start Decryption) goes to a separate pool of BACKGROUND_WORKERS threads instead,
+so it never queues in front of a job the user started.
+Encryption asks for all carriers (and optionally an output folder) before it
+starts; the shares are then embedded and saved concurrently, one thread per share,
+each with its own row in the progress list. Carrier dimensions are read from the
+image headers in the background as carriers are added, and the list shows at once
+whether each one can hold a share of the password typed so far; carriers that
+cannot are refused before the key derivation starts.
+
+Decryption works ahead of the user: each stego image added to the Decrypt tab is
+extracted and parsed on the background pool straight away, and as soon as the images
+hold a threshold of shares from one set, K2 is recovered and the packaged cipher
+opened, also in the background. Start Decryption then only has Argon2 and the
+final AES-GCM decrypt left. Only the still password-encrypted binary_blob is
+kept; K2 is dropped once it has been used.
+
+The Batch tab recovers every set under a folder (batch_recovery.py) and streams
+the results into a VirtualTable, which only draws the rows in view.
+
+Each running job has a CancelToken (cancel.py) in self._jobs; its Cancel button
+cancels the token, and the job stops at the pipeline's next check without leaving
+partial files behind.
 """
 
+import time
+_MODULE_START_NS = time.perf_counter_ns()   # launch time when run directly
+
 import customtkinter as ctk
-from tkinter import filedialog, messagebox
-import threading
+import tkinter as tk
+from tkinter import filedialog, messagebox, font as tkfont
 import os
+import queue
 import sys
-from PIL import Image, ImageDraw, ImageFilter
-import time
+from concurrent.futures import ThreadPoolExecutor
 
 # Add current directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from steganography import embed_data_into_image, extract_data_from_image
-from sss import split_bytes_into_shares, recover_bytes_from_shares
-from crypto import encrypt_password_aes_gcm, decrypt_password_aes_gcm
+from bin_archive import BinArchive, is_archive
+from share_codec import ShareRecord, wrap_share_payload, parse_share_payload, records_compatible, share_payload_size
+from memory import MemoryBudgetError, format_size, plan_embed
+import tracing
+from tracing import span, traced
+from profiling import profiled
+from cancel import CancelToken, Cancelled
+
+PREWARM_DELAY_MS = 150   # pause between idle-time build steps, so the UI keeps responding
+PIPELINE_MODULES = ("crypto", "sss", "session_key", "steganography")
+LOG_PUMP_INTERVAL_MS = 16   # about once per frame
+LOG_MAX_LINES = 2000        # per output pane; older lines are dropped
+LOG_BATCH_LIMIT = 1000      # events handled per pump, so a flood cannot stall a frame
+CRYPTO_WORKERS = 2          # each Argon2 derivation holds 64 MiB
+BACKGROUND_WORKERS = 1      # speculative reads, kept off the crypto pool
+ENCRYPT_SHARES = 3          # stego images written per encryption
+ENCRYPT_THRESHOLD = 2       # of which this many recover the key
+CARRIER_TYPES = [("Images", "*.png *.jpg *.jpeg *.bmp *.tiff"), ("All files", "*.*")]
+
+# Share of a per-share bar given to each progress stage (see progress.py)
+EMBED_STAGE_SPANS = {"decode": (0.0, 0.2), "embed": (0.2, 0.3), "save": (0.3, 1.0)}
+EXTRACT_STAGE_SPANS = {"decode": (0.0, 0.7), "extract": (0.7, 1.0)}
+
+
+def _preload_pipeline():
+    """Import the crypto/imaging modules so the first Encrypt or Decrypt does not wait for them."""
+    import importlib
+    for name in PIPELINE_MODULES:
+        importlib.import_module(name)
+
+
+class LogEvent:
+    """One line for an output pane; message None clears the pane."""
+    __slots__ = ("pane", "timestamp", "level", "message")
+
+    PREFIXES = {"success": "✓", "error": "✗", "warning": "⚠"}
+
+    def __init__(self, pane, level="info", message=None):
+        self.pane = pane
+        self.timestamp = time.strftime("%H:%M:%S")
+        self.level = level
+        self.message = message
+
+    def format(self):
+        return f"[{self.timestamp}] {self.PREFIXES.get(self.level, '▸')} {self.message}\n"
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # COLOR SCHEME - Attractive light blue (sky / cyan) theme
@@ -251,13 +335,168 @@ class AnimatedProgress(ctk.CTkProgressBar):
         self.set(0)
 
 
+class ShareProgressList(ctk.CTkFrame):
+    """One labelled progress bar per share or image, with stage and ETA text"""
+    def __init__(self, master, anchor_widget, **kwargs):
+        super().__init__(master, fg_color="transparent", **kwargs)
+        self._anchor_widget = anchor_widget   # packed right below this widget while it has rows
+        self.rows = []
+
+    def reset(self, labels):
+        for frame, _, _ in self.rows:
+            frame.destroy()
+        self.rows = []
+        for label in labels:
+            frame = ctk.CTkFrame(self, fg_color="transparent")
+            frame.pack(fill="x", pady=2)
+            ctk.CTkLabel(frame, text=label, font=Fonts.BODY_SM, text_color=Colors.TEXT_SECONDARY,
+                         width=150, anchor="w").pack(side="left")
+            detail = ctk.CTkLabel(frame, text="waiting", font=Fonts.CAPTION, text_color=Colors.TEXT_MUTED,
+                                  width=190, anchor="e")
+            detail.pack(side="right")
+            bar = ctk.CTkProgressBar(frame, fg_color=Colors.BG_LIGHT, progress_color=Colors.ACCENT_PRIMARY,
+                                     corner_radius=4, height=6)
+            bar.set(0)
+            bar.pack(side="left", fill="x", expand=True, padx=8)
+            self.rows.append((frame, bar, detail))
+        if self.rows:
+            self.pack(fill="x", pady=(0, 20), after=self._anchor_widget)
+        else:
+            self.pack_forget()
+
+    def set_progress(self, i, fraction, text):
+        _, bar, detail = self.rows[i]
+        bar.set(fraction)
+        detail.configure(text=text, text_color=Colors.TEXT_MUTED)
+
+    def set_done(self, i, ok, text):
+        _, bar, detail = self.rows[i]
+        bar.configure(progress_color=Colors.SUCCESS if ok else Colors.ERROR)
+        bar.set(1 if ok else bar.get())
+        detail.configure(text=text, text_color=Colors.SUCCESS if ok else Colors.ERROR)
+
+
+class VirtualTable(ctk.CTkFrame):
+    """
+    Read-only table on a canvas that only draws the rows in view: one text item per
+    visible cell, re-labelled on scroll, so thousands of rows scroll as fast as ten.
+    render(row) -> (cell texts, colour); on_activate(row) runs on double-click.
+    """
+    ROW_HEIGHT = 26
+
+    def __init__(self, master, columns, render, on_activate=None, height=320, **kwargs):
+        super().__init__(master, fg_color=Colors.BG_DARKEST, corner_radius=10, border_width=1,
+                         border_color=Colors.BORDER, **kwargs)
+        self.columns = columns   # [(title, share of the width)]
+        self.render = render
+        self.on_activate = on_activate
+        self.rows = []
+        self._top = 0             # index of the first visible row
+        self._cells = []          # per visible row: text item ids, one per column
+        self._char_limits = []    # per column: characters that fit
+        self._redraw_pending = False
+        self._font = tkfont.Font(family=Fonts.MONO_SM[0], size=Fonts.MONO_SM[1])
+
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y", padx=(0, 4), pady=4)
+        self.canvas = tk.Canvas(self, height=height, bg=Colors.BG_DARKEST, highlightthickness=0, bd=0)
+        self.canvas.pack(side="left", fill="both", expand=True, padx=(10, 0), pady=4)
+        self.canvas.bind("<Configure>", lambda event: self._layout())
+        self.canvas.bind("<MouseWheel>", self._on_wheel)
+        self.canvas.bind("<Button-4>", lambda event: self.scroll_rows(-3))
+        self.canvas.bind("<Button-5>", lambda event: self.scroll_rows(3))
+        self.canvas.bind("<Double-Button-1>", self._on_double_click)
+
+    @property
+    def visible_rows(self):
+        return len(self._cells)
+
+    def _layout(self):
+        """(Re)create the header and the cell items for the current canvas size."""
+        width, height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        self.canvas.delete("all")
+        weights = sum(share for _, share in self.columns)
+        char_width = self._font.measure("0") or 7
+        xs, x = [], 0
+        self._char_limits = []
+        for _, share in self.columns:
+            xs.append(x)
+            column_width = width * share / weights
+            self._char_limits.append(max(1, int(column_width / char_width) - 1))
+            x += column_width
+        for (title, _), x in zip(self.columns, xs):
+            self.canvas.create_text(x, self.ROW_HEIGHT // 2, text=title, anchor="w", font=self._font,
+                                    fill=Colors.TEXT_SECONDARY)
+        self.canvas.create_line(0, self.ROW_HEIGHT, width, self.ROW_HEIGHT, fill=Colors.BORDER)
+        count = max(0, (height - self.ROW_HEIGHT) // self.ROW_HEIGHT)
+        self._cells = [
+            [self.canvas.create_text(x, self.ROW_HEIGHT * (r + 1) + self.ROW_HEIGHT // 2, text="", anchor="w",
+                                     font=self._font, fill=Colors.TEXT_PRIMARY) for x in xs]
+            for r in range(count)
+        ]
+        self._draw()
+
+    def _draw(self):
+        self._redraw_pending = False
+        self._top = max(0, min(self._top, len(self.rows) - self.visible_rows))
+        blank = ("",) * len(self.columns)
+        for r, items in enumerate(self._cells):
+            i = self._top + r
+            texts, colour = self.render(self.rows[i]) if i < len(self.rows) else (blank, Colors.TEXT_PRIMARY)
+            for item, text, limit in zip(items, texts, self._char_limits):
+                if len(text) > limit:
+                    text = text[:limit - 1] + "…"
+                self.canvas.itemconfigure(item, text=text, fill=colour)
+        if self.rows:
+            self.scrollbar.set(self._top / len(self.rows), min(1.0, (self._top + self.visible_rows) / len(self.rows)))
+        else:
+            self.scrollbar.set(0, 1)
+
+    def refresh(self):
+        """Redraw the visible rows once the Tk loop is idle (repeated calls coalesce)."""
+        if not self._redraw_pending:
+            self._redraw_pending = True
+            self.after_idle(self._draw)
+
+    def set_rows(self, rows):
+        self.rows = list(rows)
+        self._top = 0
+        self.refresh()
+
+    def append_rows(self, rows):
+        self.rows.extend(rows)
+        self.refresh()
+
+    def scroll_rows(self, delta):
+        self._top += delta
+        self._draw()
+
+    def _on_wheel(self, event):
+        if event.delta:
+            self.scroll_rows(-3 if event.delta > 0 else 3)
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self._top = int(float(value) * len(self.rows))
+        elif action == "scroll":
+            self._top += int(value) * (self.visible_rows if unit == "pages" else 1)
+        self._draw()
+
+    def _on_double_click(self, event):
+        i = self._top + int(event.y // self.ROW_HEIGHT) - 1
+        if self.on_activate is not None and 0 <= i < len(self.rows) and event.y > self.ROW_HEIGHT:
+            self.on_activate(self.rows[i])
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # MAIN APPLICATION
 # ═══════════════════════════════════════════════════════════════════════════════
 
 class FracturedKeyApp(ctk.CTk):
-    def __init__(self):
+    def __init__(self, launched_ns=None):
         super().__init__()
+        self._launched_ns = launched_ns or _MODULE_START_NS
+        self.startup_timings = {}   # stage -> seconds: first_paint, main, tab.<id>
 
         ctk.set_appearance_mode("dark")
         ctk.set_default_color_theme("blue")
@@ -273,6 +512,16 @@ class FracturedKeyApp(ctk.CTk):
         self.geometry(f"1200x800+{x}+{y}")
 
         self.selected_images = []
+        self._image_shares = {}          # selected image -> ShareRecord, why it holds none, or None while reading
+        self._shares_cancel = CancelToken()   # cancels the reads for the current selection
+        self._prepared = None            # (image paths, binary_blob) recovered ahead of Start Decryption
+        self._preparing = False
+        self._batch_counts = {}          # status -> sets, for the batch summary
+        self._batch_summary_pending = False
+        self.encrypt_carriers = []       # one carrier image per share, in share order
+        self.encrypt_output_dir = None   # None: save each stego image next to its carrier
+        self._carrier_sizes = {}         # carrier path -> (width, height), or why it cannot be read
+        self._share_len = None           # bytes per Shamir share, known once sss is loaded
         self.current_tab = "encrypt"
         self._show_landing = True
 
@@ -286,15 +535,77 @@ class FracturedKeyApp(ctk.CTk):
 
         # Main app container (header + sidebar + content + status)
         self.main_container = ctk.CTkFrame(self.root_stack, fg_color="transparent")
-        # Don't pack yet — user must click Get Started / Login / Explore Features
+        # Don't pack yet — user must click Get Started / Login / Explore Features.
+        # Its contents are built by _build_main_app() and _get_tab() when needed.
+        self._main_built = False
+        self._prewarm_started = False
+        self.tabs = {}
+        self._tab_builders = {
+            "encrypt": self._create_encrypt_tab,
+            "decrypt": self._create_decrypt_tab,
+            "manual": self._create_manual_tab,
+            "batch": self._create_batch_tab,
+            "about": self._create_about_tab,
+        }
 
-        self._create_layout()
-        self._create_header()
-        self._create_sidebar()
-        self._create_main_content()
+        self._jobs = {}   # "encrypt" / "decrypt" / "manual" -> CancelToken of the running job
+        self._ui_queue = queue.SimpleQueue()   # LogEvents and callables for the Tk thread
+        self._crypto_pool = ThreadPoolExecutor(max_workers=CRYPTO_WORKERS, thread_name_prefix="gui-crypto")
+        self._background_pool = ThreadPoolExecutor(max_workers=BACKGROUND_WORKERS,
+                                                   thread_name_prefix="gui-background")
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
         self._create_status_bar()
+        self.after_idle(self._on_first_paint)
+        self.after(LOG_PUMP_INTERVAL_MS, self._pump_log)
+
+    def _on_first_paint(self):
+        """Runs once the first frame's pending redraws are done."""
+        now_ns = time.perf_counter_ns()
+        self.startup_timings["first_paint"] = (now_ns - self._launched_ns) / 1e9
+        tracing.record_span("gui.first_paint", self._launched_ns, now_ns)
+
+    def _timed_build(self, stage, span_name, build, **args):
+        started = time.perf_counter()
+        with span(span_name, **args):
+            result = build()
+        self.startup_timings[stage] = time.perf_counter() - started
+        return result
+
+    def _build_main_app(self):
+        """Build the header, sidebar and (empty) content area of the main app."""
+        if self._main_built:
+            return
+        def build():
+            self._create_layout()
+            self._create_header()
+            self._create_sidebar()
+            self._create_main_content()
+        self._timed_build("main", "gui.build_main", build)
+        self._main_built = True
+
+    def _get_tab(self, tab_id):
+        """The frame of tab_id, building it on first use."""
+        tab = self.tabs.get(tab_id)
+        if tab is None:
+            self._build_main_app()
+            tab = self.tabs[tab_id] = self._timed_build(f"tab.{tab_id}", "gui.build_tab",
+                                                        self._tab_builders[tab_id], tab=tab_id)
+        return tab
+
+    def _start_prewarm(self):
+        """Build the main app and the tabs one step per idle slot, after the landing page is shown."""
+        if self._prewarm_started:
+            return
+        self._prewarm_started = True
+        for _ in range(CRYPTO_WORKERS):   # starts the pool's threads; the imports run once
+            self._crypto_pool.submit(_preload_pipeline)
+        steps = [self._build_main_app] + [lambda t=tab_id: self._get_tab(t) for tab_id in self._tab_builders]
 
-        self._show_tab("encrypt")
+        def run_next():
+            if steps:
+                steps.pop(0)()
+                self.after(PREWARM_DELAY_MS, lambda: self.after_idle(run_next))
+        self.after(PREWARM_DELAY_MS, lambda: self.after_idle(run_next))
 
     def _create_landing_page(self):
         """Attractive, interactive Introduction / Landing Page"""
@@ -482,12 +793,15 @@ class FracturedKeyApp(ctk.CTk):
             widget, kwargs = self._landing_reveal[i]
             widget.pack(**kwargs)
             self.after(130, lambda: self._reveal_next_landing(i + 1))
+        else:
+            self._start_prewarm()
 
     def _enter_app(self, tab_id="encrypt"):
         """Switch from landing page to main app and optionally open a tab."""
         if not self._show_landing:
             return
         self._show_landing = False
+        self._build_main_app()
         self.landing_frame.pack_forget()
         self.main_container.pack(fill="both", expand=True)
         self._show_tab(tab_id)
@@ -596,6 +910,7 @@ class FracturedKeyApp(ctk.CTk):
             ("encrypt", "🔒", "Encrypt", "Hide your secrets"),
             ("decrypt", "🔓", "Decrypt", "Reveal your secrets"),
             ("manual", "📁", "Manual", "Direct file decrypt"),
+            ("batch", "🗂️", "Batch", "Recover a folder"),
             ("about", "ℹ️", "About", "Learn more"),
         ]
 
@@ -715,12 +1030,7 @@ class FracturedKeyApp(ctk.CTk):
         )
         self.content_frame.grid(row=1, column=1, sticky="nsew", padx=0, pady=0)
         
-        # Create all tab frames
-        self.tabs = {}
-        self.tabs["encrypt"] = self._create_encrypt_tab()
-        self.tabs["decrypt"] = self._create_decrypt_tab()
-        self.tabs["manual"] = self._create_manual_tab()
-        self.tabs["about"] = self._create_about_tab()
+        # Tab frames are created by _get_tab() on first use
         
     def _create_encrypt_tab(self):
         """Create the encryption tab"""
@@ -774,6 +1084,7 @@ class FracturedKeyApp(ctk.CTk):
             width=500
         )
         self.encrypt_password_entry.pack(fill="x", pady=(0, 20))
+        self.encrypt_password_entry.bind("<KeyRelease>", lambda event: self._update_carrier_list(), add="+")
         
         # Master password
         ctk.CTkLabel(
@@ -830,11 +1141,82 @@ class FracturedKeyApp(ctk.CTk):
         
         ctk.CTkLabel(
             options_content,
-            text="💡 Creates 3 stego images. You need at least 2 to decrypt.",
+            text=f"💡 Creates {ENCRYPT_SHARES} stego images. You need at least {ENCRYPT_THRESHOLD} to decrypt.",
             font=Fonts.BODY_SM,
             text_color=Colors.TEXT_MUTED
         ).pack(anchor="w", padx=(26, 0))
         
+        # Carrier selection card
+        carrier_card = GlowingCard(content)
+        carrier_card.pack(fill="x", pady=(0, 20))
+        
+        carrier_content = ctk.CTkFrame(carrier_card, fg_color="transparent")
+        carrier_content.pack(fill="x", padx=24, pady=24)
+        
+        ctk.CTkLabel(
+            carrier_content,
+            text=f"🖼️ Carrier Images (one per share, {ENCRYPT_SHARES} needed)",
+            font=Fonts.LABEL,
+            text_color=Colors.TEXT_PRIMARY
+        ).pack(anchor="w", pady=(0, 12))
+        
+        list_frame = ctk.CTkFrame(
+            carrier_content,
+            fg_color=Colors.BG_DARKEST,
+            corner_radius=10,
+            border_width=1,
+            border_color=Colors.BORDER
+        )
+        list_frame.pack(fill="x", pady=(0, 12))
+        
+        self.carrier_listbox = ctk.CTkTextbox(
+            list_frame,
+            height=90,
+            fg_color=Colors.BG_DARKEST,
+            text_color=Colors.TEXT_PRIMARY,
+            font=Fonts.MONO_MD,
+            state="disabled",
+            corner_radius=10,
+            border_width=0
+        )
+        self.carrier_listbox.pack(fill="x", padx=4, pady=4)
+        
+        btn_frame = ctk.CTkFrame(carrier_content, fg_color="transparent")
+        btn_frame.pack(fill="x")
+        
+        SuccessButton(
+            btn_frame,
+            text="📁 Add Carriers",
+            command=self._add_carrier_files,
+            width=150,
+            height=40
+        ).pack(side="left", padx=(0, 10))
+        
+        DangerButton(
+            btn_frame,
+            text="🗑️ Clear",
+            command=self._clear_carriers,
+            width=100,
+            height=40
+        ).pack(side="left", padx=(0, 10))
+        
+        SecondaryButton(
+            btn_frame,
+            text="📂 Output Folder",
+            command=self._choose_output_dir,
+            width=150,
+            height=40
+        ).pack(side="left")
+        
+        self.output_dir_label = ctk.CTkLabel(
+            carrier_content,
+            text="",
+            font=Fonts.CAPTION,
+            text_color=Colors.TEXT_MUTED
+        )
+        self.output_dir_label.pack(anchor="w", pady=(8, 0))
+        self._update_carrier_list()
+        
         # Action button
         button_frame = ctk.CTkFrame(content, fg_color="transparent")
         button_frame.pack(fill="x", pady=(0, 20))
@@ -845,11 +1227,20 @@ class FracturedKeyApp(ctk.CTk):
             command=self._start_encryption,
             width=220
         )
-        self.encrypt_btn.pack(anchor="w")
+        self.encrypt_btn.pack(side="left", padx=(0, 10))
+        self.encrypt_cancel_btn = DangerButton(
+            button_frame,
+            text="✖  Cancel",
+            command=lambda: self._cancel_job("encrypt"),
+            width=140,
+            state="disabled"
+        )
+        self.encrypt_cancel_btn.pack(side="left")
         
         # Progress
         self.encrypt_progress = AnimatedProgress(content)
         self.encrypt_progress.pack(fill="x", pady=(0, 20))
+        self.encrypt_share_progress = ShareProgressList(content, self.encrypt_progress)
         
         # Output card
         output_card = GlowingCard(content)
@@ -869,7 +1260,7 @@ class FracturedKeyApp(ctk.CTk):
         SecondaryButton(
             output_header,
             text="Clear",
-            command=lambda: self.encrypt_output.delete("1.0", "end"),
+            command=lambda: self._clear_output(self.encrypt_output),
             width=80,
             height=32
         ).pack(side="right")
@@ -1043,11 +1434,20 @@ class FracturedKeyApp(ctk.CTk):
             command=self._start_decryption,
             width=220
         )
-        self.decrypt_btn.pack(anchor="w")
+        self.decrypt_btn.pack(side="left", padx=(0, 10))
+        self.decrypt_cancel_btn = DangerButton(
+            button_frame,
+            text="✖  Cancel",
+            command=lambda: self._cancel_job("decrypt"),
+            width=140,
+            state="disabled"
+        )
+        self.decrypt_cancel_btn.pack(side="left")
         
         # Progress
         self.decrypt_progress = AnimatedProgress(content)
         self.decrypt_progress.pack(fill="x", pady=(0, 20))
+        self.decrypt_share_progress = ShareProgressList(content, self.decrypt_progress)
         
         # Output card
         output_card = GlowingCard(content)
@@ -1066,7 +1466,7 @@ class FracturedKeyApp(ctk.CTk):
         SecondaryButton(
             output_header,
             text="Clear",
-            command=lambda: self.decrypt_output.delete("1.0", "end"),
+            command=lambda: self._clear_output(self.decrypt_output),
             width=80,
             height=32
         ).pack(side="right")
@@ -1142,6 +1542,20 @@ class FracturedKeyApp(ctk.CTk):
             height=48
         ).pack(side="right")
         
+        ctk.CTkLabel(
+            file_content,
+            text="Entry ID (indexed archives only)",
+            font=Fonts.CAPTION,
+            text_color=Colors.TEXT_MUTED
+        ).pack(anchor="w", pady=(12, 4))
+        
+        self.manual_entry_id_entry = ModernEntry(
+            file_content,
+            placeholder="e.g. github",
+            width=400
+        )
+        self.manual_entry_id_entry.pack(fill="x")
+        
         # Master password card
         password_card = GlowingCard(content)
         password_card.pack(fill="x", pady=(0, 20))
@@ -1174,7 +1588,15 @@ class FracturedKeyApp(ctk.CTk):
             command=self._start_manual_decryption,
             width=180
         )
-        self.manual_decrypt_btn.pack(anchor="w")
+        self.manual_decrypt_btn.pack(side="left", padx=(0, 10))
+        self.manual_cancel_btn = DangerButton(
+            button_frame,
+            text="✖  Cancel",
+            command=lambda: self._cancel_job("manual"),
+            width=140,
+            state="disabled"
+        )
+        self.manual_cancel_btn.pack(side="left")
         
         # Output card
         output_card = GlowingCard(content)
@@ -1193,7 +1615,7 @@ class FracturedKeyApp(ctk.CTk):
         SecondaryButton(
             output_header,
             text="Clear",
-            command=lambda: self.manual_output.delete("1.0", "end"),
+            command=lambda: self._clear_output(self.manual_output),
             width=80,
             height=32
         ).pack(side="right")
@@ -1208,6 +1630,147 @@ class FracturedKeyApp(ctk.CTk):
         
         return tab
         
+    def _create_batch_tab(self):
+        """Create the batch recovery tab (not scrollable: the results table scrolls itself)"""
+        tab = ctk.CTkFrame(self.content_frame, fg_color="transparent")
+        
+        header_frame = ctk.CTkFrame(tab, fg_color="transparent")
+        header_frame.pack(fill="x", padx=44, pady=(36, 24))
+        
+        ctk.CTkLabel(
+            header_frame,
+            text="Batch Recovery",
+            font=Fonts.TITLE_LG,
+            text_color=Colors.TEXT_PRIMARY
+        ).pack(anchor="w")
+        
+        ctk.CTkLabel(
+            header_frame,
+            text="Recover every share set in a folder with one master password",
+            font=Fonts.BODY_MD,
+            text_color=Colors.TEXT_SECONDARY
+        ).pack(anchor="w", pady=(8, 0))
+        
+        content = ctk.CTkFrame(tab, fg_color="transparent")
+        content.pack(fill="both", expand=True, padx=44, pady=(0, 36))
+        
+        # Folder and master password card
+        input_card = GlowingCard(content)
+        input_card.pack(fill="x", pady=(0, 20))
+        
+        input_content = ctk.CTkFrame(input_card, fg_color="transparent")
+        input_content.pack(fill="x", padx=24, pady=24)
+        
+        ctk.CTkLabel(
+            input_content,
+            text="📂 Folder with Stego Images",
+            font=Fonts.LABEL,
+            text_color=Colors.TEXT_PRIMARY
+        ).pack(anchor="w", pady=(0, 8))
+        
+        folder_frame = ctk.CTkFrame(input_content, fg_color="transparent")
+        folder_frame.pack(fill="x", pady=(0, 16))
+        
+        self.batch_folder_entry = ModernEntry(
+            folder_frame,
+            placeholder="Select a folder...",
+            width=400
+        )
+        self.batch_folder_entry.pack(side="left", fill="x", expand=True, padx=(0, 12))
+        
+        SecondaryButton(
+            folder_frame,
+            text="📂 Browse",
+            command=self._browse_batch_folder,
+            width=100,
+            height=48
+        ).pack(side="right")
+        
+        ctk.CTkLabel(
+            input_content,
+            text="🔐 Master Password",
+            font=Fonts.LABEL,
+            text_color=Colors.TEXT_PRIMARY
+        ).pack(anchor="w", pady=(0, 8))
+        
+        self.batch_master_entry = ModernEntry(
+            input_content,
+            placeholder="Enter your master password...",
+            is_password=True,
+            width=500
+        )
+        self.batch_master_entry.pack(fill="x")
+        
+        # Action buttons
+        button_frame = ctk.CTkFrame(content, fg_color="transparent")
+        button_frame.pack(fill="x", pady=(0, 20))
+        
+        self.batch_btn = SuccessButton(
+            button_frame,
+            text="🗂️  Recover Folder",
+            command=self._start_batch_recovery,
+            width=220
+        )
+        self.batch_btn.pack(side="left", padx=(0, 10))
+        self.batch_cancel_btn = DangerButton(
+            button_frame,
+            text="✖  Cancel",
+            command=lambda: self._cancel_job("batch"),
+            width=140,
+            state="disabled"
+        )
+        self.batch_cancel_btn.pack(side="left")
+        
+        self.batch_show_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(
+            button_frame,
+            text="Show passwords",
+            variable=self.batch_show_var,
+            command=lambda: self.batch_table.refresh(),
+            font=Fonts.BODY_MD,
+            text_color=Colors.TEXT_PRIMARY,
+            fg_color=Colors.ACCENT_PRIMARY,
+            hover_color=Colors.ACCENT_GLOW,
+            border_color=Colors.BORDER,
+            checkmark_color=Colors.BG_DARKEST,
+            corner_radius=6
+        ).pack(side="right")
+        
+        self.batch_progress = AnimatedProgress(content)
+        self.batch_progress.pack(fill="x", pady=(0, 20))
+        
+        # Results card
+        results_card = GlowingCard(content)
+        results_card.pack(fill="both", expand=True)
+        
+        results_header = ctk.CTkFrame(results_card, fg_color="transparent")
+        results_header.pack(fill="x", padx=24, pady=(24, 12))
+        
+        ctk.CTkLabel(
+            results_header,
+            text="📋 Share Sets",
+            font=Fonts.LABEL,
+            text_color=Colors.TEXT_PRIMARY
+        ).pack(side="left")
+        
+        self.batch_summary = ctk.CTkLabel(
+            results_header,
+            text="Double-click a recovered set to copy its password",
+            font=Fonts.CAPTION,
+            text_color=Colors.TEXT_MUTED
+        )
+        self.batch_summary.pack(side="right")
+        
+        self.batch_table = VirtualTable(
+            results_card,
+            columns=[("Set", 2), ("Shares", 2), ("Status", 2), ("Password", 3), ("Images", 4)],
+            render=self._render_batch_row,
+            on_activate=self._copy_batch_password
+        )
+        self.batch_table.pack(fill="both", expand=True, padx=24, pady=(0, 24))
+        
+        return tab
+        
     def _create_about_tab(self):
         """Create the about tab"""
         tab = ctk.CTkScrollableFrame(
@@ -1442,13 +2005,14 @@ The result is a system that doesn't resemble a password manager in its raw form
         """Switch to a different tab"""
         # Update current tab
         self.current_tab = tab_id
+        selected = self._get_tab(tab_id)
         
-        # Hide all tabs
+        # Hide all (built) tabs
         for tab in self.tabs.values():
             tab.pack_forget()
             
         # Show selected tab
-        self.tabs[tab_id].pack(fill="both", expand=True)
+        selected.pack(fill="both", expand=True)
         
         # Update navigation styling (blue accent for active)
         for btn_id, btn_info in self.nav_buttons.items():
@@ -1477,34 +2041,203 @@ The result is a system that doesn't resemble a password manager in its raw form
             self.status_indicator.configure(text_color=Colors.ACCENT_PRIMARY)
             
     def _log_output(self, text_widget, message, msg_type="info"):
-        """Add message to output text widget"""
-        import datetime
-        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-        
-        # Format based on type
-        prefix = ""
-        if msg_type == "success":
-            prefix = "✓"
-        elif msg_type == "error":
-            prefix = "✗"
-        elif msg_type == "warning":
-            prefix = "⚠"
-        else:
-            prefix = "▸"
-            
-        formatted = f"[{timestamp}] {prefix} {message}\n"
-        text_widget.insert("end", formatted)
-        text_widget.see("end")
-        self.update_idletasks()
+        """Queue a message for an output text widget (safe from any thread)"""
+        self._ui_queue.put(LogEvent(text_widget, msg_type, str(message)))
+
+    def _clear_output(self, text_widget):
+        """Queue clearing an output text widget, after the messages already queued for it"""
+        self._ui_queue.put(LogEvent(text_widget))
+
+    def _call_in_ui(self, fn, *args):
+        """Run fn(*args) on the Tk thread, after the log lines queued so far"""
+        self._ui_queue.put(lambda: fn(*args))
+
+    def _submit(self, job, *args, done=None, background=False):
+        """
+        Run job(*args) on the crypto pool, or on the background pool if it is
+        speculative work; done() is then called on the Tk thread.
+        """
+        def run():
+            try:
+                job(*args)
+            finally:
+                if done is not None:
+                    self._ui_queue.put(done)
+        return (self._background_pool if background else self._crypto_pool).submit(run)
+
+    def _begin_job(self, name, cancel_btn):
+        """Create the CancelToken of a job that is about to be submitted and enable its Cancel button."""
+        token = self._jobs[name] = CancelToken()
+        cancel_btn.configure(state="normal")
+        return token
+
+    def _end_job(self, name, cancel_btn):
+        """Forget a finished job; returns whether it was cancelled."""
+        token = self._jobs.pop(name, None)
+        cancel_btn.configure(state="disabled")
+        return token is not None and token.cancelled
+
+    def _cancel_job(self, name):
+        token = self._jobs.get(name)
+        if token is not None and not token.cancelled:
+            token.cancel()
+            self._update_status("Cancelling...", "warning")
+
+    def _share_progress(self, share_list, i, spans):
+        """progress= callback (worker thread) driving row i of share_list, with an ETA for the row."""
+        started = time.perf_counter()
+
+        def on_event(event):
+            low, high = spans.get(event.stage, (0.0, 1.0))
+            fraction = low + (high - low) * event.fraction
+            text = f"{event.stage} {fraction:.0%}"
+            if 0 < fraction < 1:
+                elapsed = time.perf_counter() - started
+                text += f" · ETA {elapsed * (1 - fraction) / fraction:.1f}s"
+            self._call_in_ui(share_list.set_progress, i, fraction, text)
+        return on_event
+
+    def _kdf_progress(self, message):
+        """progress= callback (worker thread) showing the key derivation's expected time in the status bar."""
+        def on_event(event):
+            if event.done < event.total and event.eta is not None:
+                self._call_in_ui(self._update_status, f"{message} (about {event.eta:.1f}s)", "info")
+            elif event.done < event.total:
+                self._call_in_ui(self._update_status, message, "info")
+        return on_event
+
+    def _on_close(self):
+        self._shares_cancel.cancel()
+        for token in self._jobs.values():
+            token.cancel()
+        self._crypto_pool.shutdown(wait=False, cancel_futures=True)
+        self._background_pool.shutdown(wait=False, cancel_futures=True)
+        self.destroy()
+
+    def _pump_log(self):
+        """Drain the UI queue: one insert per pane (then trim and scroll), callables in order."""
+        pending = {}   # pane -> [cleared, lines]
+        try:
+            for _ in range(LOG_BATCH_LIMIT):
+                event = self._ui_queue.get_nowait()
+                if not isinstance(event, LogEvent):
+                    self._flush_log(pending)
+                    pending = {}
+                    event()
+                    continue
+                entry = pending.setdefault(event.pane, [False, []])
+                if event.message is None:
+                    entry[0], entry[1] = True, []
+                else:
+                    entry[1].append(event.format())
+        except queue.Empty:
+            pass
+        self._flush_log(pending)
+        self.after(LOG_PUMP_INTERVAL_MS, self._pump_log)
+
+    def _flush_log(self, pending):
+        for pane, (cleared, lines) in pending.items():
+            if cleared:
+                pane.delete("1.0", "end")
+            if lines:
+                pane.insert("end", "".join(lines[-LOG_MAX_LINES:]))
+                excess = int(pane.index("end-1c").split(".")[0]) - 1 - LOG_MAX_LINES
+                if excess > 0:
+                    pane.delete("1.0", f"{excess + 1}.0")
+                pane.see("end")
         
     # ═══════════════════════════════════════════════════════════════════════════
     # ENCRYPTION LOGIC
     # ═══════════════════════════════════════════════════════════════════════════
     
+    def _add_carrier_files(self):
+        """Add carrier images, up to one per share, and read their sizes in the background"""
+        paths = filedialog.askopenfilenames(title="Select carrier images", filetypes=CARRIER_TYPES)
+        for path in paths:
+            if path not in self.encrypt_carriers and len(self.encrypt_carriers) < ENCRYPT_SHARES:
+                self.encrypt_carriers.append(path)
+        unread = [path for path in self.encrypt_carriers if path not in self._carrier_sizes]
+        if unread:
+            self._submit(self._read_carrier_sizes, unread, done=self._update_carrier_list, background=True)
+        self._update_carrier_list()
+        
+    def _read_carrier_sizes(self, paths):
+        """Read carrier dimensions from the image headers (background pool, or the Tk thread at start)"""
+        from sss import share_length
+        from steganography import carrier_size
+        self._share_len = share_length()
+        for path in paths:
+            try:
+                self._carrier_sizes[path] = carrier_size(path)
+            except ValueError as e:
+                self._carrier_sizes[path] = str(e)
+                
+    def _share_embed_size(self, password):
+        """Bytes each stego image must hold for this password (see _create_shares_and_embed), None until known"""
+        if self._share_len is None:
+            return None
+        from steganography import embedded_size
+        blob_len = 16 + 12 + len(password.encode("utf-8")) + 16   # salt | nonce | ciphertext | tag
+        packaged_len = 12 + blob_len + 16                          # nonce2 | AES-GCM of the blob | tag
+        return embedded_size(share_payload_size(self._share_len, packaged_len))
+        
+    def _carrier_fit(self, path, needed):
+        """(fits, text) for one carrier: fits is None while its size is not known yet"""
+        size = self._carrier_sizes.get(path)
+        if size is None or needed is None:
+            return None, "reading size..."
+        if isinstance(size, str):
+            return False, "✗ unreadable"
+        from steganography import capacity_bytes
+        width, height = size
+        spare = capacity_bytes(width, height) - needed
+        if spare < 0:
+            return False, f"{width}x{height} ✗ too small by {format_size(-spare)}"
+        try:
+            plan_embed(width, height)
+        except MemoryBudgetError:
+            return False, f"{width}x{height} ✗ over the memory budget"
+        return True, f"{width}x{height} ✓ fits, {format_size(spare)} spare"
+        
+    def _clear_carriers(self):
+        """Remove all carrier images"""
+        self.encrypt_carriers = []
+        self._carrier_sizes = {}
+        self._update_carrier_list()
+        
+    def _choose_output_dir(self):
+        """Pick the folder for the stego images (cancel: next to each carrier)"""
+        folder = filedialog.askdirectory(title="Select output folder for the stego images")
+        self.encrypt_output_dir = folder or None
+        self._update_carrier_list()
+        
+    def _update_carrier_list(self):
+        """Update the carrier list (with fit for the current password) and output folder display"""
+        needed = self._share_embed_size(self.encrypt_password_entry.get().strip())
+        self.carrier_listbox.configure(state="normal")
+        self.carrier_listbox.delete("1.0", "end")
+        for i in range(1, ENCRYPT_SHARES + 1):
+            if i > len(self.encrypt_carriers):
+                self.carrier_listbox.insert("end", f"Share {i}: —\n")
+                continue
+            path = self.encrypt_carriers[i - 1]
+            name = os.path.basename(path)
+            if len(name) > 24:
+                name = name[:23] + "…"
+            _, fit = self._carrier_fit(path, needed)
+            self.carrier_listbox.insert("end", f"Share {i}: {name:<24}  {fit}\n")
+        self.carrier_listbox.configure(state="disabled")
+        where = f"in {self.encrypt_output_dir}" if self.encrypt_output_dir else "next to each carrier"
+        text = f"Stego images are saved {where}"
+        if needed is not None:
+            text = f"Each carrier must hold {format_size(needed)} · {text}"
+        self.output_dir_label.configure(text=text)
+        
     def _start_encryption(self):
         """Start the encryption process"""
         password = self.encrypt_password_entry.get().strip()
         master_password = self.encrypt_master_entry.get().strip()
+        use_shares = self.use_shares_var.get()
         
         if not password:
             messagebox.showerror("Error", "Please enter a password to encrypt")
@@ -1514,24 +2247,44 @@ The result is a system that doesn't resemble a password manager in its raw form
             messagebox.showerror("Error", "Please enter a master password")
             return
             
+        if use_shares and len(self.encrypt_carriers) != ENCRYPT_SHARES:
+            messagebox.showerror("Error", f"Please add {ENCRYPT_SHARES} carrier images, one per share")
+            return
+            
+        if use_shares:
+            # Header reads only; normally already done in the background when the carriers were added
+            unread = [path for path in self.encrypt_carriers if path not in self._carrier_sizes]
+            if unread or self._share_len is None:
+                self._read_carrier_sizes(unread)
+            self._update_carrier_list()
+            needed = self._share_embed_size(password)
+            problems = []
+            for i, path in enumerate(self.encrypt_carriers, start=1):
+                fits, text = self._carrier_fit(path, needed)
+                if not fits:
+                    problems.append(f"Share {i}: {os.path.basename(path)}  {text}")
+            if problems:
+                messagebox.showerror("Error", "These carriers cannot hold a share:\n\n" + "\n".join(problems))
+                return
+            
         # Clear output
-        self.encrypt_output.delete("1.0", "end")
+        self._clear_output(self.encrypt_output)
         
         # Start animation
         self.encrypt_progress.start_animation()
         self.encrypt_btn.configure(state="disabled")
         self._update_status("Encrypting...", "info")
+        cancel = self._begin_job("encrypt", self.encrypt_cancel_btn)
         
-        # Run in thread
-        thread = threading.Thread(
-            target=self._encrypt_worker,
-            args=(password, master_password)
-        )
-        thread.daemon = True
-        thread.start()
+        self._submit(self._encrypt_worker, password, master_password, use_shares,
+                     list(self.encrypt_carriers), self.encrypt_output_dir, cancel,
+                     done=self._encryption_finished)
         
-    def _encrypt_worker(self, password, master_password):
-        """Encryption worker thread"""
+    @profiled("gui-encrypt")
+    @traced("gui.encrypt")
+    def _encrypt_worker(self, password, master_password, use_shares, carriers, output_dir, cancel):
+        """Encryption job (crypto pool)"""
+        from crypto import encrypt_password_aes_gcm
         try:
             self._log_output(self.encrypt_output, "Starting encryption process...", "info")
             self._log_output(self.encrypt_output, "━" * 50, "info")
@@ -1540,7 +2293,8 @@ The result is a system that doesn't resemble a password manager in its raw form
             self._log_output(self.encrypt_output, f"Password length: {len(password)} characters", "info")
             self._log_output(self.encrypt_output, "Deriving key with Argon2id...", "info")
             
-            salt, nonce, ciphertext_with_tag = encrypt_password_aes_gcm(password, master_password)
+            salt, nonce, ciphertext_with_tag = encrypt_password_aes_gcm(
+                password, master_password, self._kdf_progress("Deriving key with Argon2id..."), cancel)
             
             import base64
             ciphertext = ciphertext_with_tag[:-16]
@@ -1555,128 +2309,231 @@ The result is a system that doesn't resemble a password manager in its raw form
             
             binary_blob = salt + nonce + ciphertext_with_tag
             
-            if self.use_shares_var.get():
+            if use_shares:
                 self._log_output(self.encrypt_output, "━" * 50, "info")
                 self._log_output(self.encrypt_output, "Splitting into SSS shares...", "info")
-                self._create_shares_and_embed(binary_blob)
+                self._create_shares_and_embed(binary_blob, carriers, output_dir, cancel)
             else:
                 filename = "encrypted_output.bin"
                 with open(filename, "wb") as f:
                     f.write(binary_blob)
                 self._log_output(self.encrypt_output, f"Binary file saved: {filename}", "success")
                 
+        except Cancelled:
+            self._log_output(self.encrypt_output, "Encryption cancelled", "warning")
         except Exception as e:
             self._log_output(self.encrypt_output, f"Encryption failed: {str(e)}", "error")
-        finally:
-            self.after(0, self._encryption_finished)
             
-    def _create_shares_and_embed(self, binary_blob):
-        """Create shares and embed into images"""
+    def _create_shares_and_embed(self, binary_blob, carriers, output_dir, cancel):
+        """Create shares and embed them into their carriers concurrently; a cancelled run removes the share images it wrote"""
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+        from sss import split_bytes_into_shares
         try:
-            from cryptography.hazmat.primitives.ciphers.aead import AESGCM
-            
             self._log_output(self.encrypt_output, "Generating ephemeral key...", "info")
             K2 = os.urandom(16)
             aes = AESGCM(K2)
             nonce2 = os.urandom(12)
-            packaged_ct_and_tag = aes.encrypt(nonce2, binary_blob, None)
+            with span("aes.package", bytes=len(binary_blob)):
+                packaged_ct_and_tag = aes.encrypt(nonce2, binary_blob, None)
             packaged_cipher = nonce2 + packaged_ct_and_tag
             
-            n_shares = 3
-            threshold = 2
+            n_shares = len(carriers)
+            threshold = ENCRYPT_THRESHOLD
             self._log_output(self.encrypt_output, f"Splitting key into {n_shares} shares (threshold: {threshold})...", "info")
             shares = split_bytes_into_shares(K2, n=n_shares, k=threshold)
-            
-            for i, share_bytes in enumerate(shares, start=1):
-                self._log_output(self.encrypt_output, f"━" * 50, "info")
-                self._log_output(self.encrypt_output, f"Processing share {i}/{n_shares}...", "info")
-                
-                file_types = [("Images", "*.png *.jpg *.jpeg *.bmp *.tiff"), ("All files", "*.*")]
-                carrier_path = filedialog.askopenfilename(
-                    title=f"Select carrier image for share {i}",
-                    filetypes=file_types
-                )
-                
-                if not carrier_path:
-                    self._log_output(self.encrypt_output, f"No carrier selected for share {i}. Skipping.", "warning")
-                    continue
-                    
-                self._log_output(self.encrypt_output, f"Carrier: {os.path.basename(carrier_path)}", "info")
-                
-                payload = self._wrap_share_payload(share_bytes, index=i, total=n_shares,
-                                                   threshold=threshold, packaged_cipher=packaged_cipher)
-                
-                output_path = filedialog.asksaveasfilename(
-                    title=f"Save stego image for share {i}",
-                    filetypes=[("PNG image", "*.png"), ("All files", "*.*")],
-                    defaultextension=".png"
-                )
-                
-                if not output_path:
-                    base = os.path.splitext(carrier_path)[0]
-                    output_path = f"{base}_stego_{i}.png"
-                    
-                saved_path = embed_data_into_image(carrier_path, payload, output_path=output_path)
-                self._log_output(self.encrypt_output, f"Share {i} embedded: {saved_path}", "success")
-                
-            self._log_output(self.encrypt_output, "━" * 50, "info")
+        except Exception as e:
+            self._log_output(self.encrypt_output, f"Share creation failed: {str(e)}", "error")
+            return
+        
+        outputs = []
+        for i, carrier_path in enumerate(carriers, start=1):
+            stem = os.path.splitext(carrier_path)[0]
+            if output_dir:
+                stem = os.path.join(output_dir, os.path.basename(stem))
+            outputs.append(f"{stem}_stego_{i}.png")
+        existed = [os.path.exists(path) for path in outputs]
+        
+        self._call_in_ui(self.encrypt_share_progress.reset,
+                         [f"Share {i}: {os.path.basename(path)}" for i, path in enumerate(carriers, start=1)])
+        self._call_in_ui(self._update_status, f"Embedding {n_shares} shares...", "info")
+        self._log_output(self.encrypt_output, "━" * 50, "info")
+        
+        with ThreadPoolExecutor(max_workers=n_shares, thread_name_prefix="gui-embed") as pool:
+            futures = [
+                pool.submit(self._embed_share, i, carrier_path, output_path,
+                            wrap_share_payload(share_bytes, index=i, total=n_shares,
+                                               threshold=threshold, packaged_cipher=packaged_cipher),
+                            cancel)
+                for i, (share_bytes, carrier_path, output_path) in enumerate(zip(shares, carriers, outputs), start=1)
+            ]
+        
+        if any(isinstance(f.exception(), Cancelled) for f in futures):
+            for path, was_there in zip(outputs, existed):
+                if not was_there and os.path.exists(path):
+                    os.remove(path)
+                    self._log_output(self.encrypt_output, f"Removed {path}", "warning")
+            cancel.check()   # raises Cancelled for _encrypt_worker
+        
+        embedded = sum(1 for f in futures if f.exception() is None and f.result())
+        self._log_output(self.encrypt_output, "━" * 50, "info")
+        if embedded == n_shares:
             self._log_output(self.encrypt_output, "All shares processed successfully!", "success")
-            self._log_output(self.encrypt_output, "Keep at least 2 stego images safe!", "warning")
+            self._log_output(self.encrypt_output, f"Keep at least {threshold} stego images safe!", "warning")
+        elif embedded >= threshold:
+            self._log_output(self.encrypt_output, f"{embedded}/{n_shares} shares embedded; keep all of them safe!", "warning")
+        else:
+            self._log_output(self.encrypt_output, f"Only {embedded}/{n_shares} shares embedded; "
+                                                  f"at least {threshold} are needed to decrypt", "error")
             
+    def _embed_share(self, i, carrier_path, output_path, payload, cancel):
+        """Embed share i into its carrier (embed thread); returns the saved path, or None on failure"""
+        from steganography import embed_data_into_image
+        try:
+            saved_path = embed_data_into_image(
+                carrier_path, payload, output_path=output_path,
+                progress=self._share_progress(self.encrypt_share_progress, i - 1, EMBED_STAGE_SPANS),
+                cancel=cancel)
+        except Cancelled:
+            self._call_in_ui(self.encrypt_share_progress.set_done, i - 1, False, "cancelled")
+            raise
         except Exception as e:
-            self._log_output(self.encrypt_output, f"Share creation failed: {str(e)}", "error")
+            self._call_in_ui(self.encrypt_share_progress.set_done, i - 1, False, "failed")
+            self._log_output(self.encrypt_output, f"Share {i} failed ({os.path.basename(carrier_path)}): {str(e)}", "error")
+            return None
+        self._call_in_ui(self.encrypt_share_progress.set_done, i - 1, True, "embedded")
+        self._log_output(self.encrypt_output, f"Share {i} embedded: {saved_path}", "success")
+        return saved_path
             
-    def _wrap_share_payload(self, share_bytes, index, total, threshold, packaged_cipher):
-        """Wrap share payload with metadata"""
-        SHARE_MAGIC = b"FKSS01"
-        SHARE_VERSION = 1
-        
-        header = bytearray()
-        header += SHARE_MAGIC
-        header.append(SHARE_VERSION & 0xFF)
-        header.append(index & 0xFF)
-        header.append(total & 0xFF)
-        header.append(threshold & 0xFF)
-        header += len(share_bytes).to_bytes(4, 'big')
-        header += len(packaged_cipher).to_bytes(4, 'big')
-        return bytes(header) + share_bytes + packaged_cipher
-        
     def _encryption_finished(self):
         """Called when encryption is finished — clear passwords so they are not shown."""
         self.encrypt_progress.stop_animation()
         self.encrypt_btn.configure(state="normal")
-        self._update_status("Encryption completed", "success")
+        if self._end_job("encrypt", self.encrypt_cancel_btn):
+            self._update_status("Encryption cancelled", "warning")
+        else:
+            self._update_status("Encryption completed", "success")
         self.encrypt_password_entry.delete(0, "end")
         self.encrypt_master_entry.delete(0, "end")
+        self._clear_carriers()
         
     # ═══════════════════════════════════════════════════════════════════════════
     # DECRYPTION LOGIC
     # ═══════════════════════════════════════════════════════════════════════════
     
     def _add_image_file(self):
-        """Add image file to decryption list"""
+        """Add image file to decryption list and start reading its share in the background"""
         file_types = [("Images", "*.png *.jpg *.jpeg *.bmp *.tiff"), ("All files", "*.*")]
         file_path = filedialog.askopenfilename(title="Select stego image", filetypes=file_types)
         
         if file_path and file_path not in self.selected_images:
             self.selected_images.append(file_path)
+            self._image_shares[file_path] = None
+            self._submit(self._read_share, file_path, self._shares_cancel, background=True)
             self._update_image_list()
             
     def _remove_all_images(self):
         """Remove all selected images"""
         self.selected_images = []
+        self._reset_shares()
+        self._update_image_list()
+        
+    def _reset_shares(self):
+        """Forget the shares read so far and stop the reads still running"""
+        self._shares_cancel.cancel()
+        self._shares_cancel = CancelToken()
+        self._image_shares = {}
+        self._prepared = None
+        self._preparing = False
+        
+    def _read_share(self, path, cancel):
+        """Extract and parse the share in one stego image (background pool)"""
+        from steganography import extract_data_from_image
+        try:
+            result = parse_share_payload(extract_data_from_image(path, cancel=cancel))
+        except Cancelled:
+            return
+        except Exception as e:
+            result = str(e)
+        self._call_in_ui(self._share_read, path, result, cancel)
+        
+    def _share_read(self, path, result, cancel):
+        if cancel is not self._shares_cancel:   # the selection was cleared meanwhile
+            return
+        self._image_shares[path] = result
+        self._speculate_recovery()
+        self._update_image_list()
+        
+    def _share_sets(self):
+        """The shares read so far grouped by set, in selection order: [[(path, record), ...], ...]"""
+        sets = []
+        for path in self.selected_images:
+            record = self._image_shares.get(path)
+            if not isinstance(record, ShareRecord):
+                continue
+            for group in sets:
+                if records_compatible([group[0][1], record]):
+                    group.append((path, record))
+                    break
+            else:
+                sets.append([(path, record)])
+        return sets
+        
+    def _speculate_recovery(self):
+        """Once a set has threshold distinct shares, recover K2 and open its packaged cipher in the background"""
+        if self._prepared is not None or self._preparing:
+            return
+        for group in self._share_sets():
+            by_index = {}
+            for path, record in group:
+                by_index.setdefault(record.index, (path, record))
+            threshold = group[0][1].threshold
+            if len(by_index) >= threshold and not group[0][1].is_vault:
+                self._preparing = True
+                self._submit(self._recover_blob, list(by_index.values())[:threshold], self._shares_cancel,
+                             background=True)
+                return
+                
+    def _recover_blob(self, chosen, cancel):
+        """Recover K2 from threshold shares and unpack binary_blob (background pool)"""
+        from session_key import open_with_session_key, recover_session_key
+        try:
+            recovered_k2 = recover_session_key([bytes(record.share_bytes) for _, record in chosen])
+            result = open_with_session_key(recovered_k2, chosen[0][1].packaged_cipher)
+        except Exception as e:
+            result = e
+        self._call_in_ui(self._blob_recovered, [path for path, _ in chosen], result, cancel)
+        
+    def _blob_recovered(self, paths, result, cancel):
+        if cancel is not self._shares_cancel:
+            return
+        self._preparing = False
+        if not isinstance(result, Exception):
+            self._prepared = (paths, result)
         self._update_image_list()
         
     def _update_image_list(self):
-        """Update the image list display"""
+        """Update the image list display, with what was found in each image"""
         self.image_listbox.configure(state="normal")
         self.image_listbox.delete("1.0", "end")
         
         if not self.selected_images:
             self.image_listbox.insert("1.0", "No images selected.\n")
         else:
+            set_of = {path: n for n, group in enumerate(self._share_sets(), 1) for path, _ in group}
             for i, path in enumerate(self.selected_images, 1):
-                self.image_listbox.insert("end", f"{i}. {os.path.basename(path)}\n")
+                record = self._image_shares.get(path)
+                if record is None:
+                    found = "reading..."
+                elif isinstance(record, str):
+                    found = f"✗ no share ({record})"
+                else:
+                    found = f"share {record.index}/{record.total} · set {set_of[path]}"
+                self.image_listbox.insert("end", f"{i}. {os.path.basename(path)}  —  {found}\n")
+            if self._prepared is not None:
+                used = ", ".join(os.path.basename(path) for path in self._prepared[0])
+                self.image_listbox.insert("end", f"✓ Shares recovered from {used}; only the master password is left\n")
+            elif self._preparing:
+                self.image_listbox.insert("end", "Recovering the shared key...\n")
                 
         self.image_listbox.configure(state="disabled")
         
@@ -1691,76 +2548,98 @@ The result is a system that doesn't resemble a password manager in its raw form
             messagebox.showerror("Error", "Please enter master password")
             return
             
-        self.decrypt_output.delete("1.0", "end")
+        self._clear_output(self.decrypt_output)
         self.decrypt_progress.start_animation()
         self.decrypt_btn.configure(state="disabled")
         self._update_status("Decrypting...", "info")
-        
-        thread = threading.Thread(
-            target=self._decrypt_worker,
-            args=(self.selected_images.copy(), master_password)
-        )
-        thread.daemon = True
-        thread.start()
-        
-    def _decrypt_worker(self, image_paths, master_password):
-        """Decryption worker thread"""
+        cancel = self._begin_job("decrypt", self.decrypt_cancel_btn)
+        
+        # Shares and binary_blob found while the images were being added are not read again
+        known = {path: record for path, record in self._image_shares.items() if isinstance(record, ShareRecord)}
+        prepared = self._prepared[1] if self._prepared is not None else None
+        self._submit(self._decrypt_worker, self.selected_images.copy(), master_password, known, prepared, cancel,
+                     done=self._decryption_finished)
+        
+    @profiled("gui-decrypt")
+    @traced("gui.decrypt")
+    def _decrypt_worker(self, image_paths, master_password, known, binary_blob, cancel):
+        """Decryption job (crypto pool); known: shares already read, binary_blob: already unpacked or None"""
+        from crypto import decrypt_password_aes_gcm
+        from session_key import recover_session_key
+        from steganography import extract_data_from_image
         try:
             self._log_output(self.decrypt_output, "Starting decryption process...", "info")
             self._log_output(self.decrypt_output, "━" * 50, "info")
             self._log_output(self.decrypt_output, f"Processing {len(image_paths)} stego images...", "info")
             
             parsed_shares = []
-            for i, path in enumerate(image_paths, 1):
+            rows = self.decrypt_share_progress
+            self._call_in_ui(rows.reset, [os.path.basename(path) for path in image_paths])
+            for i, path in enumerate(image_paths):
+                if path in known:
+                    meta = known[path]
+                    parsed_shares.append(meta)
+                    self._call_in_ui(rows.set_done, i, True, f"share {meta.index}/{meta.total}")
+                    self._log_output(self.decrypt_output, f"Share {meta.index}/{meta.total} already read from: {os.path.basename(path)}", "success")
+                    continue
                 self._log_output(self.decrypt_output, f"Extracting from: {os.path.basename(path)}", "info")
-                payload = extract_data_from_image(path)
-                meta = self._parse_share_payload(payload)
+                try:
+                    payload = extract_data_from_image(path, progress=self._share_progress(rows, i, EXTRACT_STAGE_SPANS),
+                                                      cancel=cancel)
+                    meta = parse_share_payload(payload)
+                except Cancelled:
+                    self._call_in_ui(rows.set_done, i, False, "cancelled")
+                    raise
+                except Exception:
+                    self._call_in_ui(rows.set_done, i, False, "no share")
+                    raise
                 parsed_shares.append(meta)
-                self._log_output(self.decrypt_output, f"Found share {meta['index']}/{meta['total']}", "success")
+                self._call_in_ui(rows.set_done, i, True, f"share {meta.index}/{meta.total}")
+                self._log_output(self.decrypt_output, f"Found share {meta.index}/{meta.total}", "success")
                 
             if len(parsed_shares) < 2:
                 self._log_output(self.decrypt_output, "Not enough valid shares found", "error")
                 return
                 
             # Validate compatibility
-            vs = {s['version'] for s in parsed_shares}
-            totals = {s['total'] for s in parsed_shares}
-            thresholds = {s['threshold'] for s in parsed_shares}
-            pkg_hashes = {s['packaged_cipher'] for s in parsed_shares}
-            
-            if len(vs) != 1 or len(totals) != 1 or len(thresholds) != 1 or len(pkg_hashes) != 1:
+            if not records_compatible(parsed_shares):
                 self._log_output(self.decrypt_output, "Selected shares do not match!", "error")
                 return
                 
-            threshold = parsed_shares[0]['threshold']
+            threshold = parsed_shares[0].threshold
             if len(parsed_shares) < threshold:
                 self._log_output(self.decrypt_output, f"Need at least {threshold} shares", "error")
                 return
                 
+            if parsed_shares[0].is_vault:
+                self._log_output(self.decrypt_output, "These images hold a password vault; use the CLI vault menu to look up entries", "warning")
+                return
+                
             self._log_output(self.decrypt_output, "━" * 50, "info")
-            self._log_output(self.decrypt_output, "Recovering ephemeral key...", "info")
-            
-            share_bytes_list = [s['share_bytes'] for s in parsed_shares[:threshold]]
-            packaged_cipher = parsed_shares[0]['packaged_cipher']
-            
-            recovered_k2 = recover_bytes_from_shares(share_bytes_list)
-            if len(recovered_k2) < 16:
-                recovered_k2 = (b'\x00' * (16 - len(recovered_k2))) + recovered_k2
-            elif len(recovered_k2) > 16:
-                recovered_k2 = recovered_k2[-16:]
+            if binary_blob is not None:
+                self._log_output(self.decrypt_output, "Ephemeral key already recovered while the images were added", "info")
+            else:
+                self._log_output(self.decrypt_output, "Recovering ephemeral key...", "info")
+                
+                share_bytes_list = [s.share_bytes for s in parsed_shares[:threshold]]
+                packaged_cipher = parsed_shares[0].packaged_cipher
                 
-            from cryptography.hazmat.primitives.ciphers.aead import AESGCM
-            aes = AESGCM(recovered_k2)
-            nonce2 = packaged_cipher[:12]
-            ct_and_tag = packaged_cipher[12:]
-            binary_blob = aes.decrypt(nonce2, ct_and_tag, None)
+                recovered_k2 = recover_session_key(share_bytes_list)
+                    
+                from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+                aes = AESGCM(recovered_k2)
+                nonce2 = packaged_cipher[:12]
+                ct_and_tag = packaged_cipher[12:]
+                with span("aes.open", bytes=len(packaged_cipher)):
+                    binary_blob = aes.decrypt(nonce2, ct_and_tag, None)
             
             salt = binary_blob[:16]
             nonce = binary_blob[16:28]
             ciphertext_with_tag = binary_blob[28:]
             
             self._log_output(self.decrypt_output, "Decrypting with master password...", "info")
-            plaintext = decrypt_password_aes_gcm(salt, nonce, ciphertext_with_tag, master_password)
+            plaintext = decrypt_password_aes_gcm(salt, nonce, ciphertext_with_tag, master_password,
+                                                 self._kdf_progress("Decrypting with master password..."), cancel)
             
             self._log_output(self.decrypt_output, "━" * 50, "info")
             self._log_output(self.decrypt_output, "DECRYPTION SUCCESSFUL!", "success")
@@ -1768,54 +2647,22 @@ The result is a system that doesn't resemble a password manager in its raw form
             self._log_output(self.decrypt_output, f"🔑 Password: {plaintext}", "success")
             self._log_output(self.decrypt_output, f"Length: {len(plaintext)} characters", "info")
             
+        except Cancelled:
+            self._log_output(self.decrypt_output, "Decryption cancelled", "warning")
         except Exception as e:
             self._log_output(self.decrypt_output, f"Decryption failed: {str(e)}", "error")
-        finally:
-            self.after(0, self._decryption_finished)
-            
-    def _parse_share_payload(self, payload):
-        """Parse wrapped share payload"""
-        SHARE_MAGIC = b"FKSS01"
-        SHARE_MAGIC_LEN = len(SHARE_MAGIC)
-        
-        min_header = SHARE_MAGIC_LEN + 1 + 1 + 1 + 1 + 4 + 4
-        if len(payload) < min_header:
-            raise ValueError("Share payload too short")
-        if payload[:SHARE_MAGIC_LEN] != SHARE_MAGIC:
-            raise ValueError("Share magic mismatch")
-            
-        pos = SHARE_MAGIC_LEN
-        version = payload[pos]; pos += 1
-        index = payload[pos]; pos += 1
-        total = payload[pos]; pos += 1
-        threshold = payload[pos]; pos += 1
-        share_len = int.from_bytes(payload[pos:pos+4], 'big'); pos += 4
-        packaged_cipher_len = int.from_bytes(payload[pos:pos+4], 'big'); pos += 4
-        
-        if pos + share_len + packaged_cipher_len > len(payload):
-            raise ValueError("Declared sizes exceed payload size")
             
-        share_bytes = payload[pos:pos+share_len]; pos += share_len
-        packaged_cipher = payload[pos:pos+packaged_cipher_len]
-        
-        return {
-            "version": version,
-            "index": index,
-            "total": total,
-            "threshold": threshold,
-            "share_len": share_len,
-            "packaged_cipher_len": packaged_cipher_len,
-            "share_bytes": share_bytes,
-            "packaged_cipher": packaged_cipher
-        }
-        
     def _decryption_finished(self):
         """Called when decryption is finished — clear password and selected images."""
         self.decrypt_progress.stop_animation()
         self.decrypt_btn.configure(state="normal")
-        self._update_status("Decryption completed", "success")
+        if self._end_job("decrypt", self.decrypt_cancel_btn):
+            self._update_status("Decryption cancelled", "warning")
+        else:
+            self._update_status("Decryption completed", "success")
         self.decrypt_master_entry.delete(0, "end")
         self.selected_images = []
+        self._reset_shares()
         self._update_image_list()
         
     # ═══════════════════════════════════════════════════════════════════════════
@@ -1845,20 +2692,41 @@ The result is a system that doesn't resemble a password manager in its raw form
             messagebox.showerror("Error", "Please enter master password")
             return
             
-        self.manual_output.delete("1.0", "end")
-        
+        self._clear_output(self.manual_output)
+        self.manual_decrypt_btn.configure(state="disabled")
+        self._update_status("Decrypting...", "info")
+        cancel = self._begin_job("manual", self.manual_cancel_btn)
+        self._submit(self._manual_decrypt_worker, file_path, master_password,
+                     self.manual_entry_id_entry.get().strip(), cancel, done=self._manual_decryption_finished)
+        
+    @profiled("gui-manual-decrypt")
+    @traced("gui.manual_decrypt")
+    def _manual_decrypt_worker(self, file_path, master_password, entry_id, cancel):
+        """Manual decryption job (crypto pool)"""
+        from crypto import decrypt_password_aes_gcm
         try:
             self._log_output(self.manual_output, "Starting manual decryption...", "info")
             self._log_output(self.manual_output, "━" * 50, "info")
             self._log_output(self.manual_output, f"File: {os.path.basename(file_path)}", "info")
             
-            with open(file_path, "rb") as f:
-                binary_blob = f.read()
+            if is_archive(file_path):
+                with BinArchive(file_path) as archive:
+                    self._log_output(self.manual_output, f"Indexed archive with {len(archive.entries)} entries", "info")
+                    if entry_id not in archive.entries:
+                        self._log_output(self.manual_output, f"Enter one of the entry IDs: {', '.join(sorted(archive.entries))}", "error")
+                        self._call_in_ui(self._update_status, "Manual decryption failed", "error")
+                        return
+                    binary_blob = archive.read(entry_id)
+                self._log_output(self.manual_output, f"Entry: {entry_id}", "info")
+            else:
+                with open(file_path, "rb") as f:
+                    binary_blob = f.read()
                 
             self._log_output(self.manual_output, f"File size: {len(binary_blob)} bytes", "info")
                 
             if len(binary_blob) < 28:
                 self._log_output(self.manual_output, "File too small to be valid", "error")
+                self._call_in_ui(self._update_status, "Manual decryption failed", "error")
                 return
                 
             salt = binary_blob[:16]
@@ -1866,7 +2734,8 @@ The result is a system that doesn't resemble a password manager in its raw form
             ciphertext_with_tag = binary_blob[28:]
             
             self._log_output(self.manual_output, "Decrypting with master password...", "info")
-            plaintext = decrypt_password_aes_gcm(salt, nonce, ciphertext_with_tag, master_password)
+            plaintext = decrypt_password_aes_gcm(salt, nonce, ciphertext_with_tag, master_password,
+                                                 self._kdf_progress("Decrypting with master password..."), cancel)
             
             self._log_output(self.manual_output, "━" * 50, "info")
             self._log_output(self.manual_output, "DECRYPTION SUCCESSFUL!", "success")
@@ -1874,24 +2743,133 @@ The result is a system that doesn't resemble a password manager in its raw form
             self._log_output(self.manual_output, f"🔑 Password: {plaintext}", "success")
             self._log_output(self.manual_output, f"Length: {len(plaintext)} characters", "info")
             
-            self._update_status("Manual decryption completed", "success")
+            self._call_in_ui(self._update_status, "Manual decryption completed", "success")
             
+        except Cancelled:
+            self._log_output(self.manual_output, "Manual decryption cancelled", "warning")
+            self._call_in_ui(self._update_status, "Manual decryption cancelled", "warning")
         except Exception as e:
             self._log_output(self.manual_output, f"Manual decryption failed: {str(e)}", "error")
-            self._update_status("Manual decryption failed", "error")
-        finally:
-            # Clear file path and password so they are not left visible
-            self.manual_file_entry.delete(0, "end")
-            self.manual_master_entry.delete(0, "end")
+            self._call_in_ui(self._update_status, "Manual decryption failed", "error")
+            
+    def _manual_decryption_finished(self):
+        """Called when manual decryption is finished — clear file path and password so they are not left visible."""
+        self.manual_decrypt_btn.configure(state="normal")
+        self._end_job("manual", self.manual_cancel_btn)
+        self.manual_file_entry.delete(0, "end")
+        self.manual_master_entry.delete(0, "end")
+
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # BATCH RECOVERY LOGIC
+    # ═══════════════════════════════════════════════════════════════════════════
+    
+    def _browse_batch_folder(self):
+        """Browse for the folder to recover"""
+        folder = filedialog.askdirectory(title="Select folder with stego images")
+        if folder:
+            self.batch_folder_entry.delete(0, "end")
+            self.batch_folder_entry.insert(0, folder)
+            
+    def _start_batch_recovery(self):
+        """Start recovering every set in the folder"""
+        folder = self.batch_folder_entry.get().strip()
+        master_password = self.batch_master_entry.get().strip()
+        
+        if not folder or not os.path.isdir(folder):
+            messagebox.showerror("Error", "Please select a folder")
+            return
+            
+        if not master_password:
+            messagebox.showerror("Error", "Please enter master password")
+            return
+            
+        self.batch_table.set_rows([])
+        self._batch_counts = {}
+        self._update_batch_summary()
+        self.batch_progress.start_animation()
+        self.batch_btn.configure(state="disabled")
+        self._update_status("Scanning folder...", "info")
+        cancel = self._begin_job("batch", self.batch_cancel_btn)
+        self._submit(self._batch_worker, folder, master_password, cancel, done=self._batch_finished)
+        
+    @profiled("gui-batch")
+    @traced("gui.batch")
+    def _batch_worker(self, folder, master_password, cancel):
+        """Batch recovery job (crypto pool); results stream into the table as sets are settled"""
+        from batch_recovery import STATUS_RECOVERED, recover_folder
+        kdf_progress = self._kdf_progress("Deriving key with Argon2id...")
+        
+        def on_progress(event):
+            if event.stage == "read":
+                self._call_in_ui(self._update_status, f"Reading shares {event.done}/{event.total}...", "info")
+            else:
+                kdf_progress(event)
+                
+        try:
+            results = recover_folder(folder, master_password, progress=on_progress, cancel=cancel,
+                                     on_result=lambda result: self._call_in_ui(self._batch_result, result))
+            recovered = sum(1 for result in results if result.status == STATUS_RECOVERED)
+            self._call_in_ui(self._update_status, f"Recovered {recovered} of {len(results)} share sets",
+                             "success" if recovered == len(results) else "warning")
+        except Cancelled:
+            pass   # _batch_finished reports it
+        except Exception as e:
+            self._call_in_ui(self._update_status, f"Batch recovery failed: {str(e)}", "error")
+            
+    def _batch_result(self, result):
+        self.batch_table.append_rows([result])
+        self._batch_counts[result.status] = self._batch_counts.get(result.status, 0) + 1
+        if not self._batch_summary_pending:
+            self._batch_summary_pending = True
+            self.after_idle(self._update_batch_summary)
+            
+    def _update_batch_summary(self):
+        self._batch_summary_pending = False
+        total = sum(self._batch_counts.values())
+        parts = [f"{total} sets"] + [f"{count} {status}" for status, count in sorted(self._batch_counts.items())]
+        self.batch_summary.configure(text=" · ".join(parts))
+        
+    def _render_batch_row(self, result):
+        """Cell texts and colour of one RecoveryResult in the batch table"""
+        from batch_recovery import STATUS_BAD_SHARES, STATUS_RECOVERED, STATUS_WRONG_PASSWORD
+        password = ""
+        if result.password is not None:
+            password = result.password if self.batch_show_var.get() else "●" * 8
+        texts = (result.digest, f"{result.shares}/{result.total} (need {result.threshold})", result.status,
+                 password, ", ".join(os.path.basename(path) for path in result.paths))
+        if result.status == STATUS_RECOVERED:
+            colour = Colors.SUCCESS
+        elif result.status in (STATUS_WRONG_PASSWORD, STATUS_BAD_SHARES):
+            colour = Colors.ERROR
+        else:
+            colour = Colors.WARNING
+        return texts, colour
+        
+    def _copy_batch_password(self, result):
+        """Copy the password of a recovered set to the clipboard"""
+        if result.password is None:
+            return
+        self.clipboard_clear()
+        self.clipboard_append(result.password)
+        self._update_status(f"Password of set {result.digest} copied to the clipboard", "success")
+        
+    def _batch_finished(self):
+        """Called when batch recovery is finished — clear the master password."""
+        self.batch_progress.stop_animation()
+        self.batch_btn.configure(state="normal")
+        if self._end_job("batch", self.batch_cancel_btn):
+            self._update_status("Batch recovery cancelled", "warning")
+        self.batch_master_entry.delete(0, "end")
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # ENTRY POINT
 # ═══════════════════════════════════════════════════════════════════════════════
 
-def main():
-    """Main entry point"""
-    app = FracturedKeyApp()
+def main(launched_ns=None):
+    """Main entry point (launched_ns: perf_counter_ns() at launch, for the first-paint time)"""
+    app = FracturedKeyApp(launched_ns)
     app.mainloop()
 
 if __name__ == "__main__":
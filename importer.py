@@ -0,0 +1,316 @@
+"""
+Bulk import of credentials from a password-manager export into stego share sets.
+
+Records are streamed from the export by a generator:
+    - CSV with a header row (name/title/url, username, password columns, as written by
+      browsers, Bitwarden, KeePass and most other managers)
+    - JSON lines, a JSON array of objects, or a Bitwarden JSON export ({"items": [...]})
+
+All records are encrypted under one Argon2id derivation of the master password (one
+random salt for the batch, a fresh nonce per record; see crypto.encrypt_password_with_key),
+so the resulting blobs decrypt exactly like ones made by encryption_mode. Packaging,
+splitting and embedding of each record run on a process pool. At most max_pending
+records are in flight at once, so memory stays flat however large the export is.
+
+Carriers are assigned round-robin from a pool; the shares of one record always go
+into distinct carriers and each stego image gets its own output name.
+
+With a JobJournal (journal.py), each record is a unit of work: records finished in
+an earlier, interrupted run are skipped and the ones that were in flight are redone.
+
+With cancel=CancelToken (cancel.py), queued records are dropped and the worker
+processes, which share a multiprocessing.Event with the token, stop at their next
+check and remove the image they were writing; then Cancelled is raised. Workers
+ignore SIGINT: on Ctrl-C the parent decides.
+
+Metrics updated in a worker process would stay there, so each worker result carries
+the record's share and byte counts and its traced stage durations, and the parent
+adds them to its own metrics (metrics.py) as the record completes.
+"""
+
+import contextlib
+import csv
+import json
+import multiprocessing
+import os
+import re
+import signal
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Iterable, Iterator, List, Optional
+import tracing
+from crypto import derive_key_argon2id, encrypt_password_with_key
+from sss import split_bytes_into_shares
+from steganography import embed_data_into_image
+from share_codec import wrap_share_payload
+from session_key import package_binary_blob
+from share_index import set_digest
+from blind_index import blind_tag, derive_index_key
+from journal import JobJournal
+from cancel import CancelToken, Cancelled, check
+from metrics import BYTES_EMBEDDED, SHARES_EMBEDDED, SSS_OPERATIONS, STAGE_DURATION
+
+LABEL_FIELDS = ("label", "name", "title", "url", "login_uri", "origin")
+USERNAME_FIELDS = ("username", "login_username", "user", "email")
+PASSWORD_FIELDS = ("password", "login_password")
+CARRIER_EXTENSIONS = (".png", ".bmp", ".tif", ".tiff", ".jpg", ".jpeg")
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9._-]+")
+CANCEL_POLL = 0.05   # seconds between cancellation checks while waiting on workers
+
+_worker_cancel: Optional[CancelToken] = None   # set in each worker process
+_worker_stages: Optional["_StageLog"] = None
+
+
+class ImportRecord:
+    __slots__ = ("label", "username", "password")
+
+    def __init__(self, label: str, username: str, password: str):
+        self.label = label
+        self.username = username
+        self.password = password
+
+
+def _pick(row: dict, fields) -> str:
+    for field in fields:
+        value = row.get(field)
+        if value:
+            return str(value).strip()
+    return ""
+
+
+def _to_record(row: dict) -> ImportRecord:
+    row = {str(k).strip().lower(): v for k, v in row.items() if k is not None}
+    login = row.get("login")
+    if isinstance(login, dict):   # Bitwarden JSON item
+        row.update({f"login_{k.lower()}": v for k, v in login.items() if isinstance(v, str)})
+        uris = login.get("uris") or []
+        if uris and isinstance(uris[0], dict):
+            row.setdefault("login_uri", uris[0].get("uri"))
+    return ImportRecord(_pick(row, LABEL_FIELDS), _pick(row, USERNAME_FIELDS), _pick(row, PASSWORD_FIELDS))
+
+
+def _iter_json_array(f, chunk_size: int = 65536) -> Iterator[dict]:
+    """Decode the objects of a top-level JSON array one at a time."""
+    decoder = json.JSONDecoder()
+    buf = f.read(chunk_size).lstrip()
+    if not buf.startswith("["):
+        raise ValueError("Expected a JSON array")
+    buf = buf[1:]
+    eof = False
+    while True:
+        buf = buf.lstrip().lstrip(",").lstrip()
+        if buf.startswith("]"):
+            return
+        try:
+            obj, end = decoder.raw_decode(buf)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            more = f.read(chunk_size)
+            eof = not more
+            buf += more
+            continue
+        yield obj
+        buf = buf[end:]
+
+
+def iter_json_records(path: str) -> Iterator[ImportRecord]:
+    with open(path, "r", encoding="utf-8-sig") as f:
+        head = f.read(1)
+        while head.isspace():
+            head = f.read(1)
+        f.seek(0)
+        if path.lower().endswith((".jsonl", ".ndjson")):
+            rows = (json.loads(line) for line in f if line.strip())
+        elif head == "[":
+            rows = _iter_json_array(f)
+        else:
+            data = json.load(f)
+            rows = data.get("items", []) if isinstance(data, dict) else data
+        for row in rows:
+            if not isinstance(row, dict):
+                continue
+            if isinstance(row.get("type"), int) and row["type"] != 1:   # Bitwarden note/card/identity
+                continue
+            yield _to_record(row)
+
+
+def iter_csv_records(path: str) -> Iterator[ImportRecord]:
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        for row in csv.DictReader(f):
+            yield _to_record(row)
+
+
+def iter_records(path: str) -> Iterator[ImportRecord]:
+    """Stream ImportRecords from a CSV or JSON export, chosen by file extension."""
+    if path.lower().endswith((".json", ".jsonl", ".ndjson")):
+        return iter_json_records(path)
+    return iter_csv_records(path)
+
+
+def list_carriers(paths: Iterable[str]) -> List[str]:
+    """Expand directories into the carrier images they contain."""
+    carriers = []
+    for path in paths:
+        if os.path.isdir(path):
+            carriers.extend(os.path.join(path, name) for name in sorted(os.listdir(path))
+                            if name.lower().endswith(CARRIER_EXTENSIONS))
+        else:
+            carriers.append(path)
+    return carriers
+
+
+class CarrierPool:
+    """Hands out n distinct carriers per record, cycling through the pool."""
+
+    def __init__(self, carriers: List[str], per_record: int):
+        if len(carriers) < per_record:
+            raise ValueError(f"Need at least {per_record} carrier images; got {len(carriers)}")
+        self.carriers = carriers
+        self.per_record = per_record
+        self._next = 0
+
+    def take(self) -> List[str]:
+        count = len(self.carriers)
+        picked = [self.carriers[(self._next + i) % count] for i in range(self.per_record)]
+        self._next = (self._next + self.per_record) % count
+        return picked
+
+
+class _StageLog:
+    """tracing listener in a worker: (stage, seconds) of the spans of the current record."""
+
+    def __init__(self):
+        self.stages = []
+
+    def span_enter(self, name: str):
+        return time.perf_counter()
+
+    def span_exit(self, name: str, start: float, args: dict):
+        self.stages.append((name, time.perf_counter() - start))
+
+    def take(self) -> list:
+        stages, self.stages = self.stages, []
+        return stages
+
+
+def _init_worker(stop_event):
+    global _worker_cancel, _worker_stages
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _worker_cancel = CancelToken(event=stop_event) if stop_event is not None else None
+    _worker_stages = _StageLog()
+    tracing.add_listener(_worker_stages)
+
+
+def _record_metrics(counts: dict):
+    """Add the counts a worker returned for one record to this process's metrics."""
+    SSS_OPERATIONS.inc(op="split")
+    SHARES_EMBEDDED.inc(counts["shares"])
+    BYTES_EMBEDDED.inc(counts["bytes"])
+    for stage, seconds in counts["stages"]:
+        STAGE_DURATION.observe(seconds, stage=stage)
+
+
+def _split_and_embed(task) -> dict:
+    """Worker: package one blob, split K2 and embed every share. Runs in a child process."""
+    binary_blob, carriers, outputs, threshold, blind_tags = task
+    k2, packaged_cipher = package_binary_blob(binary_blob)
+    total = len(carriers)
+    shares = split_bytes_into_shares(k2, n=total, k=threshold)
+    images = []
+    embedded = 0
+    if _worker_stages is not None:
+        _worker_stages.take()   # drop spans left over from a record that failed
+    with contextlib.redirect_stdout(sys.stderr):   # keep stdout free for the caller's output
+        for i, (share_bytes, carrier, out) in enumerate(zip(shares, carriers, outputs), start=1):
+            payload = wrap_share_payload(share_bytes, i, total, threshold, packaged_cipher, blind_tags=blind_tags)
+            images.append(embed_data_into_image(carrier, payload, output_path=out, cancel=_worker_cancel))
+            embedded += len(payload)
+    stages = _worker_stages.take() if _worker_stages is not None else []
+    return {"set": set_digest(packaged_cipher), "images": images,
+            "metrics": {"shares": len(images), "bytes": embedded, "stages": stages}}
+
+
+def import_records(records: Iterable[ImportRecord], master_password: str, carriers: List[str], out_dir: str,
+                   total: int = 3, threshold: int = 2, workers: Optional[int] = None,
+                   max_pending: Optional[int] = None, with_blind_index: bool = False,
+                   journal: Optional[JobJournal] = None,
+                   cancel: Optional[CancelToken] = None) -> Iterator[dict]:
+    """
+    Encrypt and embed every record. Yields one result dict per record as it completes
+    (not necessarily in input order): {"record", "label", "set", "images"},
+    {"record", "label", "error"} or, for units a journal already has as finished,
+    {"record", "label", "skipped": True, "images"}.
+    """
+    pool_carriers = CarrierPool(carriers, total)
+    os.makedirs(out_dir, exist_ok=True)
+    salt = os.urandom(16)
+    key = derive_key_argon2id(master_password, salt, cancel=cancel)
+    index_key = derive_index_key(master_password, create=True) if with_blind_index else None
+
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or 2 * workers
+    stop_event = multiprocessing.Event() if cancel is not None else None
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(stop_event,)) as pool:
+        pending = {}
+
+        def check_cancel():
+            try:
+                check(cancel)
+            except Cancelled:
+                stop_event.set()   # running workers stop at their next check
+                for future in pending:
+                    future.cancel()
+                raise
+
+        def wait_some():
+            """Wait for at least one pending record, watching the token meanwhile."""
+            while True:
+                done, _ = wait(pending, timeout=CANCEL_POLL if cancel else None, return_when=FIRST_COMPLETED)
+                check_cancel()
+                if done:
+                    return done
+
+        def finished(futures):
+            for future in futures:
+                number, label, unit = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    error = str(e) or type(e).__name__
+                    if journal is not None:
+                        journal.fail(unit, error)
+                    yield {"record": number, "label": label, "error": error}
+                    continue
+                _record_metrics(result.pop("metrics"))
+                if journal is not None:
+                    journal.finish(unit, result["images"])
+                yield dict(record=number, label=label, **result)
+
+        for number, record in enumerate(records, start=1):
+            check_cancel()
+            stem = f"{number:05d}_{_UNSAFE.sub('_', record.label)[:40] or 'entry'}"
+            outputs = [os.path.join(out_dir, f"{stem}_share{i}.png") for i in range(1, total + 1)]
+            unit = f"{number}:{record.label}"
+            if journal is not None and journal.is_done(unit):
+                yield {"record": number, "label": record.label, "skipped": True, "images": outputs}
+                continue
+            try:
+                if not record.password:
+                    raise ValueError("Record has no password")
+                _, nonce, ciphertext_with_tag = encrypt_password_with_key(record.password, key, salt)
+                blind_tags = [blind_tag(index_key, record.label)] if index_key and record.label else []
+                task = (salt + nonce + ciphertext_with_tag, pool_carriers.take(), outputs, threshold, blind_tags)
+                if journal is not None:
+                    journal.begin(unit, outputs)
+                pending[pool.submit(_split_and_embed, task)] = (number, record.label, unit)
+            except Exception as e:
+                yield {"record": number, "label": record.label, "error": str(e) or type(e).__name__}
+                continue
+            if len(pending) >= max_pending:
+                yield from finished(wait_some())
+        while pending:
+            yield from finished(wait_some())
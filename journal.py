@@ -0,0 +1,129 @@
+"""
+Append-only job journal that lets long bulk operations resume after a crash.
+
+A journal is a JSON-lines file; every line is fsynced before the call returns:
+    {"event": "job",   "params": {...}}                    first line, identifies the job
+    {"event": "begin", "unit": id, "outputs": [paths]}     unit of work started
+    {"event": "done",  "unit": id, "outputs": {path: sha256}}
+    {"event": "fail",  "unit": id, "error": "..."}
+
+Outputs are written with steganography.save_png_atomic, so a path either holds the
+old file or the complete new one. On reopen the journal is replayed: a unit is
+finished if it has a "done" record and its outputs still match their digests; a
+unit that began but never finished is in flight and is simply redone (leftover
+partial files are removed first). A torn last line from a crash is dropped.
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, Iterable, List, Optional
+from steganography import PARTIAL_SUFFIX
+
+
+def file_digest(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class JobJournal:
+    """Replays an existing journal (or starts a new one) and records progress. Use as a context manager."""
+
+    def __init__(self, path: str, params: Optional[dict] = None):
+        self.path = path
+        self.done: Dict[str, Dict[str, str]] = {}
+        self.begun: Dict[str, List[str]] = {}
+        self.failed: Dict[str, str] = {}
+        existing = self._replay()
+        if existing is not None and params is not None and existing != params:
+            raise ValueError(f"Journal {path} belongs to a different job: {existing}")
+        self._file = open(path, "a", encoding="utf-8")
+        if existing is None:
+            self._append({"event": "job", "params": params or {}})
+
+    def _replay(self) -> Optional[dict]:
+        """Load the journal. Returns the job params, or None for a new journal."""
+        if not os.path.exists(self.path):
+            return None
+        params = None
+        valid_end = 0
+        with open(self.path, "rb") as f:
+            for raw in f:
+                try:
+                    entry = json.loads(raw)
+                except ValueError:
+                    break   # torn write: everything from here on is discarded
+                if not raw.endswith(b"\n"):
+                    break
+                valid_end += len(raw)
+                event, unit = entry.get("event"), entry.get("unit")
+                if event == "job":
+                    params = entry.get("params", {})
+                elif event == "begin":
+                    self.begun[unit] = entry.get("outputs", [])
+                    self.done.pop(unit, None)
+                    self.failed.pop(unit, None)
+                elif event == "done":
+                    self.done[unit] = entry.get("outputs", {})
+                    self.begun.pop(unit, None)
+                elif event == "fail":
+                    self.failed[unit] = entry.get("error", "")
+                    self.begun.pop(unit, None)
+        if valid_end != os.path.getsize(self.path):
+            with open(self.path, "r+b") as f:
+                f.truncate(valid_end)
+        return params
+
+    def _append(self, entry: dict):
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    @property
+    def in_flight(self) -> List[str]:
+        """Units that began but neither finished nor failed (the previous run was interrupted)."""
+        return list(self.begun)
+
+    def is_done(self, unit: str, verify: bool = True) -> bool:
+        """True if unit finished and (with verify) all of its outputs are unchanged."""
+        outputs = self.done.get(unit)
+        if outputs is None:
+            return False
+        if not verify:
+            return True
+        try:
+            return all(file_digest(path) == digest for path, digest in outputs.items())
+        except OSError:
+            return False
+
+    def begin(self, unit: str, outputs: Iterable[str]):
+        outputs = [os.path.abspath(path) for path in outputs]
+        for path in outputs:
+            partial = path + PARTIAL_SUFFIX
+            if os.path.exists(partial):
+                os.remove(partial)
+        self.begun[unit] = outputs
+        self._append({"event": "begin", "unit": unit, "outputs": outputs})
+
+    def finish(self, unit: str, outputs: Iterable[str]):
+        digests = {os.path.abspath(path): file_digest(path) for path in outputs}
+        self.begun.pop(unit, None)
+        self.done[unit] = digests
+        self._append({"event": "done", "unit": unit, "outputs": digests})
+
+    def fail(self, unit: str, error: str):
+        self.begun.pop(unit, None)
+        self.failed[unit] = error
+        self._append({"event": "fail", "unit": unit, "error": error})
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
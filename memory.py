@@ -0,0 +1,210 @@
+"""
+Per-stage memory accounting and memory budgets.
+
+Accounting hooks into the tracing spans (tracing.add_listener), so every stage
+("kdf.argon2id", "stego.decode", "stego.lsb_embed", "stego.png_save", ...) records
+    peak_bytes      - tracemalloc peak above the stage's starting point
+    rss_peak_bytes  - process peak RSS when the stage ended
+tracemalloc only sees the Python heap (the per-pixel lists); Pillow's image
+buffers and Argon2's 64 MiB show up in the RSS figure. tracemalloc slows
+allocation-heavy code, so accounting is opt-in: start_accounting() or the CLI
+--memory flag. Figures from stages running concurrently on other threads overlap.
+
+Budgets come from FK_MEMORY_BUDGET (e.g. 512M, 2G), set_budget() or the CLI
+--memory-budget. Operations estimate their footprint before allocating: an embed
+or extract over budget switches to the tiled path, which skips the per-pixel
+lists, and anything still over budget raises MemoryBudgetError with the estimate.
+A tiled extract from a (non-interlaced) PNG decodes only the rows that hold the
+payload; a tiled embed still decodes the whole carrier once, since the PNG it
+writes needs every row.
+"""
+
+import os
+import re
+import threading
+import tracemalloc
+from typing import Dict, Optional, Union
+import tracing
+
+BUDGET_ENV = "FK_MEMORY_BUDGET"
+
+# Estimates, calibrated with tracemalloc plus the RGB image buffers on a 1 MP carrier.
+IMAGE_BYTES_PER_PIXEL = 4            # one decoded Pillow image
+PIXEL_LIST_EMBED_BYTES = 100         # list(getdata()) + new pixel list, per pixel
+PIXEL_LIST_EXTRACT_BYTES = 80        # list(getdata()) + bit generator, per pixel
+FIXED_OVERHEAD = 16 * 1024 * 1024    # interpreter, libraries, PNG codec buffers
+
+_UNITS = {"": 1, "k": 1 << 10, "m": 1 << 20, "g": 1 << 30, "t": 1 << 40}
+_SIZE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([kmgt]?)(?:i?b)?\s*$", re.IGNORECASE)
+
+
+class MemoryBudgetError(MemoryError):
+    """An operation was refused because its estimated footprint exceeds the budget."""
+
+    def __init__(self, operation: str, estimate: int, budget: int):
+        super().__init__(f"{operation} needs about {format_size(estimate)}, "
+                         f"over the memory budget of {format_size(budget)}")
+        self.operation = operation
+        self.estimate = estimate
+        self.budget = budget
+
+
+def parse_size(text: str) -> int:
+    """'512M', '2G', '1.5GiB' or a plain byte count -> bytes."""
+    match = _SIZE.match(str(text))
+    if not match:
+        raise ValueError(f"Invalid size: {text!r}")
+    return int(float(match.group(1)) * _UNITS[match.group(2).lower()])
+
+
+def format_size(n: int) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if n < 1024 or unit == "GiB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+
+_budget: Optional[int] = parse_size(os.environ[BUDGET_ENV]) if os.environ.get(BUDGET_ENV) else None
+
+
+def get_budget() -> Optional[int]:
+    return _budget
+
+
+def set_budget(budget: Union[int, str, None]):
+    """Set the budget in bytes (or as a size string); None removes it."""
+    global _budget
+    _budget = parse_size(budget) if isinstance(budget, str) else budget
+
+
+def check_budget(operation: str, estimate: int):
+    if _budget is not None and estimate > _budget:
+        raise MemoryBudgetError(operation, estimate, _budget)
+
+
+def estimate_embed(width: int, height: int, tiled: bool = False) -> int:
+    # tiled: the decoded carrier plus its RGB conversion; otherwise also the output image
+    pixels = width * height
+    per_pixel = 2 * IMAGE_BYTES_PER_PIXEL if tiled else 3 * IMAGE_BYTES_PER_PIXEL + PIXEL_LIST_EMBED_BYTES
+    return FIXED_OVERHEAD + pixels * per_pixel
+
+
+def estimate_extract(width: int, height: int, tiled: bool = False) -> int:
+    # tiled: the decoded rows, their RGB conversion and tobytes() copy
+    pixels = width * height
+    per_pixel = 3 * IMAGE_BYTES_PER_PIXEL if tiled else 2 * IMAGE_BYTES_PER_PIXEL + PIXEL_LIST_EXTRACT_BYTES
+    return FIXED_OVERHEAD + pixels * per_pixel
+
+
+def plan_embed(width: int, height: int) -> bool:
+    """True if an embed into a width x height carrier has to take the tiled path."""
+    if _budget is None or estimate_embed(width, height) <= _budget:
+        return False
+    check_budget(f"Embedding into a {width}x{height} carrier", estimate_embed(width, height, tiled=True))
+    return True
+
+
+def plan_extract(width: int, height: int, rows: Optional[int] = None) -> bool:
+    """
+    True if an extract from a width x height image has to take the tiled path.
+    rows: how many rows the tiled path decodes (all of them by default).
+    """
+    if _budget is None or estimate_extract(width, height) <= _budget:
+        return False
+    check_budget(f"Extracting from a {width}x{height} image",
+                 estimate_extract(width, height if rows is None else rows, tiled=True))
+    return True
+
+
+def current_rss_bytes() -> Optional[int]:
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def peak_rss_bytes() -> Optional[int]:
+    try:   # Linux: this process's own high-water mark (ru_maxrss carries over from the parent across exec)
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    try:
+        import resource
+    except ImportError:   # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+
+class _Accounting:
+    """tracing listener that keeps the tracemalloc peak of every stage."""
+
+    def __init__(self):
+        self.stages: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self) -> list:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def span_enter(self, name: str):
+        current, peak = tracemalloc.get_traced_memory()
+        stack = self._stack()
+        if stack:   # reset_peak below would lose the enclosing stage's peak so far
+            stack[-1][1] = max(stack[-1][1], peak)
+        tracemalloc.reset_peak()
+        frame = [current, current]   # start, highest traced total seen
+        stack.append(frame)
+        return frame
+
+    def span_exit(self, name: str, frame: list, args: dict):
+        frame[1] = max(frame[1], tracemalloc.get_traced_memory()[1])
+        stack = self._stack()
+        if stack and stack[-1] is frame:
+            stack.pop()
+        if stack:
+            stack[-1][1] = max(stack[-1][1], frame[1])
+        used = frame[1] - frame[0]
+        rss = peak_rss_bytes()
+        args["mem_peak_kib"] = used // 1024
+        with self._lock:
+            entry = self.stages.setdefault(name, {"calls": 0, "peak_bytes": 0, "rss_peak_bytes": None})
+            entry["calls"] += 1
+            entry["peak_bytes"] = max(entry["peak_bytes"], used)
+            entry["rss_peak_bytes"] = rss
+
+
+_accounting: Optional[_Accounting] = None
+_started_tracemalloc = False
+
+
+def start_accounting():
+    """Begin recording per-stage memory use (starts tracemalloc if needed)."""
+    global _accounting, _started_tracemalloc
+    if _accounting is not None:
+        return
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _started_tracemalloc = True
+    _accounting = _Accounting()
+    tracing.add_listener(_accounting)
+
+
+def stop_accounting() -> Dict[str, dict]:
+    """Stop recording and return {stage: {"calls", "peak_bytes", "rss_peak_bytes"}}."""
+    global _accounting, _started_tracemalloc
+    if _accounting is None:
+        return {}
+    tracing.remove_listener(_accounting)
+    stages, _accounting = _accounting.stages, None
+    if _started_tracemalloc:
+        tracemalloc.stop()
+        _started_tracemalloc = False
+    return stages
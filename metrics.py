@@ -0,0 +1,247 @@
+"""
+Process-wide counters and latency histograms, exported as a metrics text file.
+
+    FK_METRICS_FILE=/var/lib/node_exporter/textfile/fractured_keys.prom python . import ...
+    python . --metrics-file fk.prom scrub backups/
+
+The crypto, sss and steganography modules update the metrics below as they run.
+A TextfileExporter rewrites the file every FK_METRICS_INTERVAL seconds (default
+15) and once more on exit; each write goes to a temporary file that is renamed
+into place, so the node-exporter textfile collector never reads a partial file.
+There is no network listener. While an exporter runs, every tracing span also
+feeds fk_stage_duration_seconds{stage=...}.
+
+The file uses the text exposition format the textfile collector parses (the
+OpenMetrics subset with full sample names on the TYPE lines and no "# EOF").
+Process-pool workers have registries of their own: the bulk importer's workers send
+their counts and stage durations back with each record, and the parent adds them
+here (importer._record_metrics).
+"""
+
+import atexit
+import bisect
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+import tracing
+
+METRICS_FILE_ENV = "FK_METRICS_FILE"
+METRICS_INTERVAL_ENV = "FK_METRICS_INTERVAL"
+_OWNER_ENV = "FK_METRICS_PID"   # child processes must not overwrite the parent's file
+DEFAULT_INTERVAL = 15.0
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+_INF_LABEL = 'le="+Inf"'
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    __slots__ = ("name", "help", "labelnames", "_values", "_lock")
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels[n]) for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(str(labels[n]) for n in self.labelnames), 0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_label_text(self.labelnames, key)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    __slots__ = ("name", "help", "labelnames", "buckets", "_series", "_lock")
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = (), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[tuple, list] = {}   # labels -> [bucket counts..., count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels[n]) for n in self.labelnames)
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            if slot < len(self.buckets):
+                series[slot] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def count(self, **labels) -> int:
+        series = self._series.get(tuple(str(labels[n]) for n in self.labelnames))
+        return series[-2] if series else 0
+
+    def mean(self, **labels) -> Optional[float]:
+        """Mean of the observed values, or None before the first observation."""
+        series = self._series.get(tuple(str(labels[n]) for n in self.labelnames))
+        return series[-1] / series[-2] if series else None
+
+    def time(self, **labels):
+        """Context manager observing the duration of the enclosed block in seconds."""
+        return _Timer(self, labels)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        for key, series in items:
+            cumulative = 0
+            for bound, hits in zip(self.buckets, series):
+                cumulative += hits
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_label_text(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_bucket{_label_text(self.labelnames, key, _INF_LABEL)} {series[-2]}")
+            lines.append(f"{self.name}_count{_label_text(self.labelnames, key)} {series[-2]}")
+            lines.append(f"{self.name}_sum{_label_text(self.labelnames, key)} {_number(series[-1])}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram: Histogram, labels: dict):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: Dict[str, object] = {}
+
+    def _add(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._add(Counter(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Iterable[str] = (), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help, labelnames, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str):
+        """Write render() to path atomically (temporary file, then rename)."""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+
+
+REGISTRY = Registry()
+
+SHARES_EMBEDDED = REGISTRY.counter("fk_shares_embedded_total", "Stego images written.")
+BYTES_EMBEDDED = REGISTRY.counter("fk_embedded_bytes_total", "Payload bytes embedded into carriers.")
+EXTRACTIONS = REGISTRY.counter("fk_extractions_total", "Payloads read back from stego images.")
+EXTRACTION_FAILURES = REGISTRY.counter("fk_extraction_failures_total",
+                                       "Images whose payload could not be read, by reason.", ["reason"])
+SSS_OPERATIONS = REGISTRY.counter("fk_sss_operations_total", "Shamir split and recover calls.", ["op"])
+DECRYPTIONS = REGISTRY.counter("fk_decryptions_total", "Master-password decryptions, by result.", ["result"])
+KDF_DURATION = REGISTRY.histogram("fk_kdf_duration_seconds", "Argon2id key derivation latency.")
+STAGE_DURATION = REGISTRY.histogram("fk_stage_duration_seconds",
+                                    "Duration of traced pipeline stages (while an exporter runs).", ["stage"])
+
+
+class _StageTimer:
+    """tracing listener feeding STAGE_DURATION."""
+
+    def span_enter(self, name: str):
+        return time.perf_counter()
+
+    def span_exit(self, name: str, start: float, args: dict):
+        STAGE_DURATION.observe(time.perf_counter() - start, stage=name)
+
+
+class TextfileExporter:
+    """Rewrites the metrics file every interval seconds on a daemon thread, and on stop()."""
+
+    def __init__(self, path: str, interval: float = DEFAULT_INTERVAL, registry: Registry = REGISTRY):
+        self.path = path
+        self.interval = interval
+        self.registry = registry
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stage_timer = _StageTimer()
+
+    def start(self):
+        tracing.add_listener(self._stage_timer)
+        self._thread = threading.Thread(target=self._run, name="metrics-exporter", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.registry.write_textfile(self.path)
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        tracing.remove_listener(self._stage_timer)
+        self.registry.write_textfile(self.path)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def start_exporter(path: str, interval: Optional[float] = None) -> TextfileExporter:
+    """Start a TextfileExporter for REGISTRY that also writes once more at exit."""
+    exporter = TextfileExporter(path, interval or float(os.environ.get(METRICS_INTERVAL_ENV, DEFAULT_INTERVAL)))
+    atexit.register(exporter.stop)
+    return exporter.start()
+
+
+if os.environ.get(METRICS_FILE_ENV) and os.environ.get(_OWNER_ENV, str(os.getpid())) == str(os.getpid()):
+    os.environ[_OWNER_ENV] = str(os.getpid())
+    start_exporter(os.environ[METRICS_FILE_ENV])
@@ -0,0 +1,144 @@
+"""
+Function-level profiles of real runs, for sending to the developers.
+
+    python . --profile                           # interactive menu, every entry profiled
+    python . --profile decrypt blobs/*.bin       # one CLI command
+    python run_gui.py --profile                  # GUI encrypt/decrypt workers
+    FK_PROFILE=/tmp/profiles python run_gui.py   # same, choosing the output folder
+
+Each profiled operation runs under cProfile and leaves two files in the profile
+folder (default ./profiles), named <operation>-<timestamp>:
+    .pstats     - python -m pstats FILE, snakeviz, or any pstats viewer
+    .collapsed  - folded stacks for flamegraph.pl, speedscope or Perfetto
+
+cProfile records caller -> callee edges rather than whole stacks, so the folded
+stacks are rebuilt from the roots down, splitting a function's time among its
+callers in proportion to each caller's share. Profiling is per thread: only the
+thread that runs the operation is measured. cProfile and pstats are imported only
+when a profile is taken.
+"""
+
+import contextlib
+import functools
+import os
+import time
+from typing import Dict, Optional, Tuple
+from colors import print_colored, Colors
+
+PROFILE_ENV = "FK_PROFILE"
+DEFAULT_PROFILE_DIR = "profiles"
+MAX_STACK_DEPTH = 128
+
+_profile_dir: Optional[str] = None
+
+
+def enable(directory: Optional[str] = None):
+    """Profile every operation from now on, writing into directory."""
+    global _profile_dir
+    _profile_dir = directory or os.environ.get(PROFILE_ENV) or DEFAULT_PROFILE_DIR
+
+
+def disable():
+    global _profile_dir
+    _profile_dir = None
+
+
+def is_enabled() -> bool:
+    return _profile_dir is not None
+
+
+def _frame_label(func: Tuple[str, int, str]) -> str:
+    filename, line, name = func
+    if filename == "~":   # built-in
+        label = name
+    else:
+        label = f"{name} ({os.path.basename(filename)}:{line})"
+    return label.replace(";", ",")
+
+
+def collapsed_stacks(stats) -> Dict[str, int]:
+    """Folded stacks ("root;...;leaf" -> microseconds of own time) rebuilt from a profile."""
+    raw = stats.stats
+    callees: Dict[tuple, list] = {}
+    for func, (_, _, _, _, callers) in raw.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+
+    folded: Dict[str, int] = {}
+
+    def walk(func, funcs, frames, share):
+        _, _, own_time, _, _ = raw[func]
+        funcs = funcs + (func,)
+        frames = frames + (_frame_label(func),)
+        own = int(own_time * share * 1e6)
+        if own:
+            key = ";".join(frames)
+            folded[key] = folded.get(key, 0) + own
+        if len(frames) >= MAX_STACK_DEPTH:
+            return
+        for callee, edge_time in callees.get(func, ()):
+            callee_time = raw[callee][3]
+            if callee in funcs or not callee_time or edge_time * share < 1e-6:
+                continue
+            walk(callee, funcs, frames, share * edge_time / callee_time)
+
+    for func, (_, _, _, _, callers) in raw.items():
+        if not callers:
+            walk(func, (), (), 1.0)
+    return folded
+
+
+def write_profile(profiler, name: str, directory: str) -> Tuple[str, str]:
+    """Write <name>-<timestamp>.pstats and .collapsed into directory. Returns both paths."""
+    import pstats
+    os.makedirs(directory, exist_ok=True)
+    now = time.time()
+    stem = os.path.join(directory, f"{name}-{time.strftime('%Y%m%d-%H%M%S', time.localtime(now))}"
+                                   f"-{int(now * 1000) % 1000:03d}")
+    stats_path, collapsed_path = stem + ".pstats", stem + ".collapsed"
+    profiler.dump_stats(stats_path)
+    folded = collapsed_stacks(pstats.Stats(profiler))
+    with open(collapsed_path, "w", encoding="utf-8") as f:
+        for stack, micros in sorted(folded.items()):
+            f.write(f"{stack} {micros}\n")
+    return stats_path, collapsed_path
+
+
+@contextlib.contextmanager
+def profile_operation(name: str, directory: Optional[str] = None):
+    """Run the enclosed block under cProfile if profiling is on (or directory is given)."""
+    directory = directory or _profile_dir
+    if directory is None:
+        yield None
+        return
+    import cProfile
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError as e:   # another profiler is already active
+        print_colored(f"Not profiling {name}: {e}", Colors.WARNING)
+        yield None
+        return
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        paths = write_profile(profiler, name, directory)
+        print_colored(f"Profile written: {paths[0]} / {os.path.basename(paths[1])}", Colors.INFO)
+
+
+def profiled(name: str):
+    """Decorator form of profile_operation()."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _profile_dir is None:
+                return fn(*args, **kwargs)
+            with profile_operation(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+if os.environ.get(PROFILE_ENV):
+    enable(os.environ[PROFILE_ENV])
@@ -0,0 +1,159 @@
+"""
+Progress reports from the long stages of embedding, extracting and key derivation.
+
+embed_data_into_image, extract_data_from_image, save_png_atomic and the Argon2id
+functions in crypto.py take progress=callback. The callback gets a ProgressEvent:
+
+    stage   "decode", "embed", "save", "extract" or "kdf"
+    done    units processed so far, out of total (unit: "bytes", "pixels" or "steps")
+    rate    units per second so far, eta the estimated seconds left (None if unknown)
+
+Decoding and Argon2 run inside C code, so they only report their start and end; the
+"kdf" events carry an expected duration (the mean of fk_kdf_duration_seconds so far)
+to estimate from instead. Save reports bytes written against the size of the carrier
+file, which a PNG re-encode of the same pixels comes close to.
+
+Reporting is rate-limited: hot loops call update() once per chunk, and updates less
+than MIN_INTERVAL after the previous one are dropped (the first and last never are).
+A Reporter also checks the operation's CancelToken (cancel.py) on every update(),
+which is how the chunked loops notice cancellation. Without a callback or token the
+stages get a shared no-op reporter.
+"""
+
+import time
+from typing import Callable, Optional
+
+MIN_INTERVAL = 0.1   # seconds between reported updates of one stage
+CHUNK_BYTES = 4096   # payload bytes between update() calls in the LSB loops
+
+
+class ProgressEvent:
+    __slots__ = ("stage", "done", "total", "unit", "elapsed", "expected")
+
+    def __init__(self, stage: str, done: int, total: int, unit: str, elapsed: float,
+                 expected: Optional[float] = None):
+        self.stage = stage
+        self.done = done
+        self.total = total
+        self.unit = unit
+        self.elapsed = elapsed
+        self.expected = expected   # expected duration of the stage in seconds, if known
+
+    @property
+    def fraction(self) -> float:
+        return min(1.0, self.done / self.total) if self.total else 1.0
+
+    @property
+    def rate(self) -> Optional[float]:
+        return self.done / self.elapsed if self.elapsed > 0 and self.done else None
+
+    @property
+    def eta(self) -> Optional[float]:
+        if self.done >= self.total:
+            return 0.0
+        if self.done and self.elapsed > 0:
+            return self.elapsed * (self.total - self.done) / self.done
+        if self.expected is not None:
+            return max(0.0, self.expected - self.elapsed)
+        return None
+
+    def __repr__(self):
+        return f"ProgressEvent({self.stage!r}, {self.done}/{self.total} {self.unit})"
+
+
+class Reporter:
+    """
+    Calls callback(ProgressEvent) for one stage, at most every MIN_INTERVAL seconds,
+    and raises cancel.Cancelled from update() once the stage's token is cancelled.
+    """
+    __slots__ = ("callback", "stage", "total", "unit", "expected", "cancel", "start", "last")
+
+    def __init__(self, callback: Optional[Callable], stage: str, total: int, unit: str = "bytes",
+                 expected: Optional[float] = None, cancel=None):
+        self.callback = callback
+        self.stage = stage
+        self.total = total
+        self.unit = unit
+        self.expected = expected
+        self.cancel = cancel
+        self.start = self.last = time.perf_counter()
+        self._emit(0, self.start)
+
+    def _emit(self, done: int, now: float):
+        self.last = now
+        if self.callback is not None:
+            self.callback(ProgressEvent(self.stage, done, self.total, self.unit, now - self.start, self.expected))
+
+    def update(self, done: int):
+        if self.cancel is not None:
+            self.cancel.check()
+        now = time.perf_counter()
+        if now - self.last >= MIN_INTERVAL:
+            self._emit(min(done, self.total), now)
+
+    def finish(self, done: Optional[int] = None):
+        """Report the end of the stage; done (default total) also becomes the new total."""
+        if done is not None:
+            self.total = done
+        self._emit(self.total, time.perf_counter())
+
+
+class _NoReporter:
+    __slots__ = ()
+
+    def update(self, done: int):
+        pass
+
+    def finish(self, done: Optional[int] = None):
+        pass
+
+
+_NO_REPORTER = _NoReporter()
+
+
+def reporter(callback: Optional[Callable], stage: str, total: int, unit: str = "bytes",
+             expected: Optional[float] = None, cancel=None):
+    """A Reporter for callback and cancel token, or the shared no-op one when there is neither."""
+    if callback is None and cancel is None:
+        return _NO_REPORTER
+    return Reporter(callback, stage, total, unit, expected, cancel)
+
+
+def _rate_text(rate: float, unit: str) -> str:
+    if unit != "bytes":
+        return f"{rate:.1f} {unit}/s"
+    for suffix in ("B", "KiB", "MiB"):
+        if rate < 1024 or suffix == "MiB":
+            return f"{rate:.1f} {suffix}/s"
+        rate /= 1024
+
+
+def describe(event: ProgressEvent) -> str:
+    """One-line summary, e.g. 'save  62%  18.4 MiB/s  ETA 0.3s'."""
+    parts = [event.stage, f"{event.fraction:4.0%}"]
+    if event.rate is not None and event.unit == "bytes":
+        parts.append(_rate_text(event.rate, event.unit))
+    if event.eta is not None and event.done < event.total:
+        parts.append(f"ETA {event.eta:.1f}s")
+    return "  ".join(parts)
+
+
+def console_callback(label: str, stream=None) -> Callable:
+    """
+    Callback printing events as '<label>: <describe(event)>' to stream (default stderr).
+    On a terminal each stage rewrites its own line; otherwise every event gets a line.
+    """
+    import sys
+    stream = stream or sys.stderr
+    isatty = getattr(stream, "isatty", None)
+    overwrite = bool(isatty and isatty())
+
+    def show(event: ProgressEvent):
+        line = f"{label}: {describe(event)}"
+        if overwrite:
+            end = "\n" if event.done >= event.total else ""
+            stream.write(f"\r\033[K{line}{end}")
+        else:
+            stream.write(line + "\n")
+        stream.flush()
+    return show
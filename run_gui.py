@@ -4,6 +4,9 @@ Fractured Key - GUI Launcher
 Run this file to start the modern GUI application
 """
 
+import time
+_LAUNCHED_NS = time.perf_counter_ns()   # first-paint time is measured from here
+
 import sys
 import os
 
@@ -25,8 +28,11 @@ except ImportError:
 from fractured_gui import main
 
 if __name__ == "__main__":
+    if "--profile" in sys.argv[1:]:   # profile the encrypt/decrypt workers (see profiling.py)
+        import profiling
+        profiling.enable()
     print("=" * 60)
     print("  FRACTURED KEY - Modern Password Manager")
     print("  Starting GUI...")
     print("=" * 60)
-    main()
+    main(_LAUNCHED_NS)
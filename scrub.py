@@ -0,0 +1,149 @@
+"""
+Offline scrub of stego backups: checks that every share set is still recoverable
+without the master password.
+
+For each set found by the share index (or by a plain walk of the folder), every
+share is re-read from its image and K2 is recovered from threshold shares. The
+AES-GCM tag of packaged_cipher under K2 proves that those shares are intact (for a
+vault set the sealed index is opened instead). Shares that fail to combine with
+known-good ones are reported as invalid.
+
+Argon2 never runs and nothing is decrypted with the master password: the only
+thing opened is the K2 layer, whose content is still the master-encrypted blob and
+is discarded immediately.
+
+A set is
+    ok        - all n shares present and valid
+    degraded  - at least k but fewer than n valid shares
+    broken    - fewer than k valid shares (no longer recoverable)
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from itertools import combinations
+from typing import Dict, List, Optional
+from steganography import peek_data_from_image
+from share_codec import parse_share_payload
+from session_key import recover_session_key, open_with_session_key
+from share_index import DEFAULT_INDEX_PATH, ShareIndex, folder_prefix, set_digest
+from vault import read_index
+from cancel import check
+
+MAX_COMBINATIONS = 256   # bound on threshold-sized subsets tried to find a good one
+
+STATUS_OK = "ok"
+STATUS_DEGRADED = "degraded"
+STATUS_BROKEN = "broken"
+
+
+class SetReport:
+    __slots__ = ("digest", "total", "threshold", "vault", "valid", "invalid", "paths")
+
+    def __init__(self, digest: str, total: int, threshold: int, vault: bool):
+        self.digest = digest
+        self.total = total
+        self.threshold = threshold
+        self.vault = vault
+        self.valid: Dict[int, str] = {}      # share index -> image path
+        self.invalid: List[str] = []         # images whose share is unreadable or bad
+        self.paths: List[str] = []
+
+    @property
+    def missing(self) -> List[int]:
+        return [i for i in range(1, self.total + 1) if i not in self.valid]
+
+    @property
+    def status(self) -> str:
+        if len(self.valid) < self.threshold:
+            return STATUS_BROKEN
+        if len(self.valid) < self.total:
+            return STATUS_DEGRADED
+        return STATUS_OK
+
+    def as_dict(self) -> dict:
+        return {"set": self.digest, "status": self.status, "vault": self.vault, "total": self.total,
+                "threshold": self.threshold, "valid": sorted(self.valid), "missing": self.missing,
+                "invalid": self.invalid, "images": self.paths}
+
+
+def read_share(path: str, cancel=None):
+    """The share record in one image (payload rows only), or None if it holds none."""
+    check(cancel)
+    try:
+        return parse_share_payload(peek_data_from_image(path, 0xFFFFFFFF))
+    except Exception:
+        return None
+
+
+def _key_opens(record, k2: bytes) -> bool:
+    try:
+        if record.is_vault:
+            read_index(record.packaged_cipher, k2)
+        else:
+            open_with_session_key(k2, record.packaged_cipher)
+        return True
+    except Exception:
+        return False
+
+
+def _verify(report: SetReport, members: list):
+    """members: (path, record) pairs of one set, record None if unreadable."""
+    candidates: Dict[int, list] = {}
+    for path, record in members:
+        if record is None or set_digest(record.packaged_cipher) != report.digest:
+            report.invalid.append(path)
+        else:
+            candidates.setdefault(record.index, []).append((path, record))
+
+    # Find threshold shares (one copy per index) whose K2 opens packaged_cipher ...
+    firsts = [copies[0][1] for _, copies in sorted(candidates.items())]
+    good = None
+    for tried, subset in enumerate(combinations(firsts, report.threshold)):
+        if tried >= MAX_COMBINATIONS:
+            break
+        if _key_opens(subset[0], recover_session_key([r.share_bytes for r in subset])):
+            good = subset
+            break
+    if good is None:
+        if len(firsts) >= report.threshold:   # enough shares, but no subset combines
+            report.invalid.extend(path for copies in candidates.values() for path, _ in copies)
+        return
+
+    # ... then check every share against threshold - 1 of those known-good ones.
+    for index, copies in sorted(candidates.items()):
+        helpers = [r.share_bytes for r in good if r.index != index][:report.threshold - 1]
+        for path, record in copies:
+            if _key_opens(record, recover_session_key(helpers + [record.share_bytes])):
+                report.valid.setdefault(index, path)
+            else:
+                report.invalid.append(path)
+
+
+def scrub_folder(folder: str, index_path: Optional[str] = DEFAULT_INDEX_PATH,
+                 workers: Optional[int] = None, cancel=None) -> List[SetReport]:
+    """
+    Update the share index for folder (index_path None: walk only, nothing persisted),
+    re-read every share in parallel and verify each set. Returns one report per set.
+    cancel: a cancel.CancelToken, checked per file and per set.
+    """
+    with ShareIndex(index_path or ":memory:") as index:
+        index.scan(folder, workers=workers, cancel=cancel)
+        prefix = folder_prefix(folder)
+        sets = [(s, [p for p in s.paths if p.startswith(prefix)]) for s in index.sets()]
+    sets = [(s, members) for s, members in sets if members]
+
+    paths = [p for _, members in sets for p in members]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        try:
+            records = dict(zip(paths, pool.map(read_share, paths, [cancel] * len(paths))))
+        except BaseException:
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    reports = []
+    for share_set, members in sets:
+        check(cancel)
+        report = SetReport(share_set.digest, share_set.total, share_set.threshold, share_set.is_vault)
+        report.paths = members
+        _verify(report, [(p, records[p]) for p in members])
+        reports.append(report)
+    return reports
@@ -0,0 +1,60 @@
+"""
+Ephemeral session key (K2) packaging shared by every share set.
+
+A set stores packaged_cipher = nonce2 (12) | AES-GCM(K2, content) in each share,
+and K2 itself is split with Shamir. These helpers keep the K2 handling in one place.
+"""
+
+import os
+from typing import List, Tuple
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+import sss
+from tracing import span
+
+SESSION_KEY_LEN = 16   # fits PyCryptodome Shamir
+NONCE_LEN = 12
+TAG_LEN = 16
+
+
+def new_session_key() -> bytes:
+    return os.urandom(SESSION_KEY_LEN)
+
+
+def seal_with_session_key(k2: bytes, content: bytes, aad: bytes = None) -> bytes:
+    """Return nonce2 + AES-GCM(K2, content)."""
+    nonce2 = os.urandom(NONCE_LEN)
+    with span("aes.package", bytes=len(content)):
+        return nonce2 + AESGCM(k2).encrypt(nonce2, content, aad)
+
+
+def open_with_session_key(k2: bytes, sealed, aad: bytes = None) -> bytes:
+    """Inverse of seal_with_session_key. Raises InvalidTag if K2 or data is wrong."""
+    if len(sealed) < NONCE_LEN + TAG_LEN:
+        raise ValueError("Packaged cipher too small to be valid.")
+    with span("aes.open", bytes=len(sealed)):
+        return AESGCM(k2).decrypt(sealed[:NONCE_LEN], sealed[NONCE_LEN:], aad)
+
+
+def package_binary_blob(binary_blob: bytes) -> Tuple[bytes, bytes]:
+    """Generate K2 and package binary_blob with it. Returns (K2, packaged_cipher)."""
+    k2 = new_session_key()
+    return k2, seal_with_session_key(k2, binary_blob)
+
+
+def recover_session_key(share_bytes_list: List[bytes]) -> bytes:
+    """Recover K2 from raw SSS shares, normalised to SESSION_KEY_LEN bytes."""
+    recovered = sss.recover_bytes_from_shares(share_bytes_list)
+    if len(recovered) < SESSION_KEY_LEN:
+        # The PyCryptodome backend strips trailing zero bytes, the integer backend leading ones.
+        padding = b'\x00' * (SESSION_KEY_LEN - len(recovered))
+        recovered = recovered + padding if sss._USE_PYCRYPTO else padding + recovered
+    elif len(recovered) > SESSION_KEY_LEN:
+        recovered = recovered[-SESSION_KEY_LEN:]
+    return recovered
+
+
+def split_binary_blob(binary_blob) -> Tuple[bytes, bytes, bytes]:
+    """binary_blob = salt(16) | nonce(12) | ciphertext_with_tag -> (salt, nonce, ciphertext_with_tag)"""
+    if len(binary_blob) < 28:
+        raise ValueError("Binary blob too small to be valid (need >=28 bytes).")
+    return bytes(binary_blob[:16]), bytes(binary_blob[16:28]), bytes(binary_blob[28:])
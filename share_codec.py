@@ -0,0 +1,249 @@
+"""
+Share payload codec (FKSS01).
+
+Binary layout of a wrapped share, version 1:
+    SHARE_MAGIC (6) | version (1) | index (1) | total (1) | threshold (1)
+      | share_len (4 BE) | packaged_cipher_len (4 BE) | share_bytes | packaged_cipher_bytes
+
+Version 2 adds a flags byte after threshold (FLAG_VAULT: packaged_cipher holds a
+vault container, see vault.py).
+Version 3 adds tag_count (2 BE) after flags and tag_count blind-index tags of
+BLIND_TAG_LEN bytes between the fixed header and share_bytes (see blind_index.py).
+Shares are written with the lowest version that can express them.
+
+Public API:
+- wrap_share_payload(share_bytes, index, total, threshold, packaged_cipher, flags=0, blind_tags=()) -> bytes
+- parse_share_payload(payload) -> ShareRecord
+    Parses over a memoryview: share_bytes, packaged_cipher and blind_tags on the
+    returned record are views into the caller's buffer, not copies.
+- share_header_length(prefix) -> int / payload_length(prefix) -> int
+  / parse_share_header(prefix) -> ShareRecord
+    Header-only parsing for scanners that read just the start of a payload.
+- records_compatible(records) -> bool
+- share_payload_size(share_len, packaged_cipher_len, flags=0, tag_count=0) -> int
+    Size wrap_share_payload would produce, without building the payload.
+
+New header variants are added by registering their layout in _LAYOUTS; the
+version byte right after the magic selects which one is used.
+"""
+
+import struct
+from typing import Callable, Dict, List, Sequence, Tuple, Union
+
+SHARE_MAGIC = b"FKSS01"   # 6 bytes
+SHARE_MAGIC_LEN = len(SHARE_MAGIC)
+SHARE_VERSION = 1
+SHARE_VERSION_FLAGS = 2
+SHARE_VERSION_TAGS = 3
+
+FLAG_VAULT = 0x01
+BLIND_TAG_LEN = 16
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+_V1 = struct.Struct(">BBBII")     # index, total, threshold, share_len, packaged_cipher_len
+_V2 = struct.Struct(">BBBBII")    # index, total, threshold, flags, share_len, packaged_cipher_len
+_V3 = struct.Struct(">BBBBHII")   # index, total, threshold, flags, tag_count, share_len, packaged_cipher_len
+
+
+def _unpack_v1(buf, offset):
+    index, total, threshold, share_len, packaged_cipher_len = _V1.unpack_from(buf, offset)
+    return index, total, threshold, 0, 0, share_len, packaged_cipher_len
+
+
+def _pack_v1(buf, offset, index, total, threshold, flags, tag_count, share_len, packaged_cipher_len):
+    _V1.pack_into(buf, offset, index, total, threshold, share_len, packaged_cipher_len)
+
+
+def _unpack_v2(buf, offset):
+    index, total, threshold, flags, share_len, packaged_cipher_len = _V2.unpack_from(buf, offset)
+    return index, total, threshold, flags, 0, share_len, packaged_cipher_len
+
+
+def _pack_v2(buf, offset, index, total, threshold, flags, tag_count, share_len, packaged_cipher_len):
+    _V2.pack_into(buf, offset, index, total, threshold, flags, share_len, packaged_cipher_len)
+
+
+# Fields that follow MAGIC + version, per header version: (struct, unpack, pack).
+# unpack returns (index, total, threshold, flags, tag_count, share_len, packaged_cipher_len).
+_LAYOUTS: Dict[int, Tuple[struct.Struct, Callable, Callable]] = {
+    SHARE_VERSION: (_V1, _unpack_v1, _pack_v1),
+    SHARE_VERSION_FLAGS: (_V2, _unpack_v2, _pack_v2),
+    SHARE_VERSION_TAGS: (_V3, _V3.unpack_from, _V3.pack_into),
+}
+_PREFIX_LEN = SHARE_MAGIC_LEN + 1
+MAX_FIXED_HEADER_LEN = _PREFIX_LEN + max(layout.size for layout, _, _ in _LAYOUTS.values())
+
+_EMPTY = memoryview(b"")
+
+
+class ShareRecord:
+    """Parsed share header plus zero-copy views of the share and packaged cipher."""
+    __slots__ = ("version", "index", "total", "threshold", "flags", "blind_tags",
+                 "share_bytes", "packaged_cipher")
+
+    def __init__(self, version: int, index: int, total: int, threshold: int, flags: int,
+                 blind_tags: memoryview, share_bytes: memoryview, packaged_cipher: memoryview):
+        self.version = version
+        self.index = index
+        self.total = total
+        self.threshold = threshold
+        self.flags = flags
+        self.blind_tags = blind_tags
+        self.share_bytes = share_bytes
+        self.packaged_cipher = packaged_cipher
+
+    @property
+    def is_vault(self) -> bool:
+        return bool(self.flags & FLAG_VAULT)
+
+    @property
+    def share_len(self) -> int:
+        return len(self.share_bytes)
+
+    @property
+    def packaged_cipher_len(self) -> int:
+        return len(self.packaged_cipher)
+
+    def iter_blind_tags(self):
+        for pos in range(0, len(self.blind_tags), BLIND_TAG_LEN):
+            yield bytes(self.blind_tags[pos:pos + BLIND_TAG_LEN])
+
+    def __repr__(self):
+        return (f"ShareRecord(version={self.version}, index={self.index}, total={self.total}, "
+                f"threshold={self.threshold}, flags={self.flags}, "
+                f"blind_tags={len(self.blind_tags) // BLIND_TAG_LEN}, share_len={self.share_len}, "
+                f"packaged_cipher_len={self.packaged_cipher_len})")
+
+
+def header_size(version: int = SHARE_VERSION) -> int:
+    """Size in bytes of the fixed header (magic included) for a header version."""
+    return _PREFIX_LEN + _LAYOUTS[version][0].size
+
+
+def _version_for(flags: int, tag_count: int) -> int:
+    """Lowest header version that can express flags and tag_count blind tags."""
+    if tag_count:
+        return SHARE_VERSION_TAGS
+    if flags:
+        return SHARE_VERSION_FLAGS
+    return SHARE_VERSION
+
+
+def share_payload_size(share_len: int, packaged_cipher_len: int, flags: int = 0, tag_count: int = 0) -> int:
+    """Length of wrap_share_payload() output for shares and ciphers of these sizes."""
+    return header_size(_version_for(flags, tag_count)) + tag_count * BLIND_TAG_LEN + share_len + packaged_cipher_len
+
+
+def wrap_share_payload(share_bytes: BytesLike, index: int, total: int, threshold: int,
+                       packaged_cipher: BytesLike, flags: int = 0,
+                       blind_tags: Sequence[bytes] = ()) -> bytes:
+    """Build the binary payload for embedding (see module docstring for layout)."""
+    if not isinstance(share_bytes, (bytes, bytearray, memoryview)):
+        raise TypeError("share_bytes must be bytes")
+    if not isinstance(packaged_cipher, (bytes, bytearray, memoryview)):
+        raise TypeError("packaged_cipher must be bytes")
+    if len(blind_tags) > 0xFFFF:
+        raise ValueError("At most 65535 blind-index tags fit in a share header")
+    if any(len(tag) != BLIND_TAG_LEN for tag in blind_tags):
+        raise ValueError(f"Blind-index tags must be {BLIND_TAG_LEN} bytes")
+
+    version = _version_for(flags, len(blind_tags))
+    layout, _, pack = _LAYOUTS[version]
+    pos = _PREFIX_LEN + layout.size
+    share_len = len(share_bytes)
+    out = bytearray(pos + len(blind_tags) * BLIND_TAG_LEN + share_len + len(packaged_cipher))
+    out[:SHARE_MAGIC_LEN] = SHARE_MAGIC
+    out[SHARE_MAGIC_LEN] = version
+    pack(out, _PREFIX_LEN, index & 0xFF, total & 0xFF, threshold & 0xFF, flags & 0xFF,
+         len(blind_tags), share_len, len(packaged_cipher))
+    for tag in blind_tags:
+        out[pos:pos + BLIND_TAG_LEN] = tag
+        pos += BLIND_TAG_LEN
+    out[pos:pos + share_len] = share_bytes
+    out[pos + share_len:] = packaged_cipher
+    return bytes(out)
+
+
+def _parse_fixed(view: memoryview):
+    """Parse magic, version and the fixed fields. Returns (version, fields, fixed_len)."""
+    if len(view) < _PREFIX_LEN:
+        raise ValueError("Share payload too short / malformed")
+    if view[:SHARE_MAGIC_LEN] != SHARE_MAGIC:
+        raise ValueError("Share magic mismatch")
+
+    version = view[SHARE_MAGIC_LEN]
+    entry = _LAYOUTS.get(version)
+    if entry is None:
+        raise ValueError(f"Unsupported share header version: {version}")
+    layout, unpack, _ = entry
+    if len(view) < _PREFIX_LEN + layout.size:
+        raise ValueError("Share payload too short / malformed")
+    return version, unpack(view, _PREFIX_LEN), _PREFIX_LEN + layout.size
+
+
+def share_header_length(prefix: BytesLike) -> int:
+    """
+    Total header length (fixed fields plus blind-index tags) given at least the fixed
+    header; MAX_FIXED_HEADER_LEN bytes are always enough to call this.
+    """
+    view = prefix if isinstance(prefix, memoryview) else memoryview(prefix)
+    _, fields, fixed_len = _parse_fixed(view)
+    return fixed_len + fields[4] * BLIND_TAG_LEN
+
+
+def parse_share_header(prefix: BytesLike) -> ShareRecord:
+    """
+    Parse just the header of a payload (share_header_length(prefix) bytes are enough).
+    share_bytes and packaged_cipher on the result are empty; use the *_len fields of
+    parse_share_payload when the whole payload is available.
+    """
+    view = prefix if isinstance(prefix, memoryview) else memoryview(prefix)
+    version, fields, pos = _parse_fixed(view)
+    index, total, threshold, flags, tag_count, _, _ = fields
+    tags_end = pos + tag_count * BLIND_TAG_LEN
+    if tags_end > len(view):
+        raise ValueError("Share payload too short / malformed")
+    return ShareRecord(version, index, total, threshold, flags, view[pos:tags_end], _EMPTY, _EMPTY)
+
+
+def payload_length(prefix: BytesLike) -> int:
+    """Total payload length declared by a header (header + tags + share + packaged_cipher)."""
+    view = prefix if isinstance(prefix, memoryview) else memoryview(prefix)
+    _, fields, fixed_len = _parse_fixed(view)
+    return fixed_len + fields[4] * BLIND_TAG_LEN + fields[5] + fields[6]
+
+
+def parse_share_payload(payload: BytesLike) -> ShareRecord:
+    """
+    Parse a wrapped share payload without copying it.
+    Raises ValueError on malformed input or an unknown header version.
+    """
+    view = payload if isinstance(payload, memoryview) else memoryview(payload)
+    version, fields, pos = _parse_fixed(view)
+    index, total, threshold, flags, tag_count, share_len, packaged_cipher_len = fields
+    tags_end = pos + tag_count * BLIND_TAG_LEN
+    if tags_end + share_len + packaged_cipher_len > len(view):
+        raise ValueError("Declared sizes exceed payload size")
+
+    blind_tags = view[pos:tags_end]
+    pos = tags_end
+    share_bytes = view[pos:pos + share_len]
+    pos += share_len
+    packaged_cipher = view[pos:pos + packaged_cipher_len]
+    return ShareRecord(version, index, total, threshold, flags, blind_tags, share_bytes, packaged_cipher)
+
+
+def records_compatible(records: List[ShareRecord]) -> bool:
+    """True if all records come from the same set (version/total/threshold/flags/packaged_cipher)."""
+    if not records:
+        return False
+    first = records[0]
+    return all(
+        r.version == first.version
+        and r.total == first.total
+        and r.threshold == first.threshold
+        and r.flags == first.flags
+        and r.packaged_cipher == first.packaged_cipher
+        for r in records[1:]
+    )
@@ -0,0 +1,308 @@
+"""
+Persistent, incremental index of the shares found in a directory tree of images.
+
+Each image is probed by decoding only the rows that hold its payload (FKSV1 magic,
+length, FKSS01 share header and the payload itself), never the whole image. Shares
+are grouped into sets by a digest of packaged_cipher, which every share of a set
+carries unchanged.
+
+Results live in SQLite, keyed by (path, size, mtime_ns): a rescan only probes files
+that are new or changed and drops rows of files that disappeared. Images without a
+share are recorded too (set_digest NULL) so they are not probed again; images that
+cannot be read (e.g. still being written) are skipped and probed on the next scan.
+
+Schema:
+    images(path PK, size, mtime_ns, set_digest, share_index, total, threshold, flags)
+    tags(path, tag)   -- blind-index tags of the share header, see blind_index.py
+"""
+
+import hashlib
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+from tracing import span, traced
+from cancel import check
+from share_codec import MAX_FIXED_HEADER_LEN, FLAG_VAULT, payload_length, parse_share_payload
+
+DEFAULT_INDEX_PATH = "fk_share_index.db"
+SCHEMA_VERSION = 1
+IMAGE_EXTENSIONS = (".png", ".bmp", ".tif", ".tiff")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS images (
+    path        TEXT PRIMARY KEY,
+    size        INTEGER NOT NULL,
+    mtime_ns    INTEGER NOT NULL,
+    set_digest  TEXT,
+    share_index INTEGER,
+    total       INTEGER,
+    threshold   INTEGER,
+    flags       INTEGER
+);
+CREATE INDEX IF NOT EXISTS images_set ON images(set_digest);
+CREATE TABLE IF NOT EXISTS tags (
+    path TEXT NOT NULL,
+    tag  BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tags_tag ON tags(tag);
+CREATE INDEX IF NOT EXISTS tags_path ON tags(path);
+"""
+
+
+def set_digest(packaged_cipher) -> str:
+    """Short identifier of a share set (all shares of a set carry the same packaged_cipher)."""
+    return hashlib.sha256(packaged_cipher).hexdigest()[:16]
+
+
+def read_share_info(image_path: str) -> dict:
+    """
+    Decode just the share payload of one image and return its parsed record, header
+    fields, tags and set digest. Raises ValueError if the image holds no share, OSError if it
+    cannot be read.
+    """
+    from steganography import read_payload_prefix   # imported on first probe; the CLI starts without Pillow
+    prefix = read_payload_prefix(image_path, MAX_FIXED_HEADER_LEN)
+    payload = read_payload_prefix(image_path, payload_length(prefix))
+    record = parse_share_payload(payload)
+    return {
+        "record": record,
+        "set": set_digest(record.packaged_cipher),
+        "index": record.index,
+        "total": record.total,
+        "threshold": record.threshold,
+        "flags": record.flags,
+        "tags": list(record.iter_blind_tags()),
+    }
+
+
+def folder_prefix(folder: str) -> str:
+    """Prefix shared by the indexed paths of every image under folder."""
+    return os.path.join(os.path.abspath(folder), "")
+
+
+def iter_image_files(root: str) -> Iterable[str]:
+    for dirpath, _, filenames in os.walk(root):
+        for name in sorted(filenames):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                yield os.path.abspath(os.path.join(dirpath, name))
+
+
+def _probe(item: Tuple[str, int, int], cancel=None):
+    path, size, mtime_ns = item
+    check(cancel)
+    try:
+        with span("index.probe", path=os.path.basename(path)):
+            info = read_share_info(path)
+    except ValueError:
+        info = None   # no share: remembered so it is not probed again
+    except Exception:
+        return None   # unreadable for now (partly written, locked, ...): left for the next scan
+    return path, size, mtime_ns, info
+
+
+class ShareSet:
+    """Images of one share set found by the index, ordered by share index."""
+    __slots__ = ("digest", "total", "threshold", "flags", "indices", "paths")
+
+    def __init__(self, digest: str, total: int, threshold: int, flags: int):
+        self.digest = digest
+        self.total = total
+        self.threshold = threshold
+        self.flags = flags
+        self.indices: List[int] = []
+        self.paths: List[str] = []
+
+    @property
+    def is_vault(self) -> bool:
+        return bool(self.flags & FLAG_VAULT)
+
+    @property
+    def recoverable(self) -> bool:
+        return len(set(self.indices)) >= self.threshold
+
+    def within(self, prefix: str) -> "ShareSet":
+        """The images of this set whose paths start with prefix (see folder_prefix)."""
+        subset = ShareSet(self.digest, self.total, self.threshold, self.flags)
+        for share_index, path in zip(self.indices, self.paths):
+            if path.startswith(prefix):
+                subset.indices.append(share_index)
+                subset.paths.append(path)
+        return subset
+
+    def distinct_paths(self) -> List[str]:
+        """One image per share index (copies of the same share add nothing to recovery)."""
+        seen = {}
+        for share_index, path in zip(self.indices, self.paths):
+            seen.setdefault(share_index, path)
+        return list(seen.values())
+
+    def __repr__(self):
+        return (f"ShareSet(digest={self.digest!r}, shares={len(self.paths)}/{self.total}, "
+                f"threshold={self.threshold}, flags={self.flags})")
+
+
+class ScanStats:
+    __slots__ = ("seen", "probed", "removed", "shares", "skipped")
+
+    def __init__(self, seen: int = 0, probed: int = 0, removed: int = 0, shares: int = 0,
+                 skipped: int = 0):
+        self.seen = seen
+        self.probed = probed
+        self.removed = removed
+        self.shares = shares
+        self.skipped = skipped
+
+    def __repr__(self):
+        return (f"ScanStats(seen={self.seen}, probed={self.probed}, "
+                f"removed={self.removed}, shares={self.shares}, skipped={self.skipped})")
+
+
+class ShareIndex:
+    """SQLite-backed share index. Use as a context manager."""
+
+    def __init__(self, db_path: str = DEFAULT_INDEX_PATH):
+        self.db_path = db_path
+        import sqlite3   # deferred with the rest of the probe machinery: the CLI imports this module at start
+        self._db = sqlite3.connect(db_path)
+        version = self._db.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, SCHEMA_VERSION):
+            self._db.close()
+            raise ValueError(f"Unsupported share index version: {version}")
+        with self._db:
+            self._db.executescript(_SCHEMA)
+            self._db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @traced("index.scan")
+    def scan(self, root: str, workers: Optional[int] = None, cancel=None,
+             records: Optional[dict] = None) -> ScanStats:
+        """
+        Bring the index up to date for every image under root. Only new or changed
+        files are probed, in parallel on a thread pool (Pillow decodes and zlib
+        inflates with the GIL released). If cancel (a cancel.CancelToken) is
+        cancelled, Cancelled is raised and the index is left as it was. records, if
+        given, receives the parsed share record of every share probed, by path.
+        """
+        prefix = folder_prefix(root)
+        known: Dict[str, Tuple[int, int]] = {
+            path: (size, mtime_ns)
+            for path, size, mtime_ns in self._db.execute("SELECT path, size, mtime_ns FROM images")
+            if path.startswith(prefix)
+        }
+
+        stats = ScanStats()
+        pending = []
+        for path in iter_image_files(root):
+            check(cancel)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            stats.seen += 1
+            if known.pop(path, None) != (st.st_size, st.st_mtime_ns):
+                pending.append((path, st.st_size, st.st_mtime_ns))
+
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            try:
+                results = list(pool.map(_probe, pending, [cancel] * len(pending)))
+            except BaseException:
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise
+
+        with self._db:
+            for path in known:   # left over: no longer on disk
+                self._forget(path)
+            for path, size, mtime_ns, info in filter(None, results):
+                self._forget(path)
+                if info is None:
+                    self._db.execute("INSERT INTO images (path, size, mtime_ns) VALUES (?, ?, ?)",
+                                     (path, size, mtime_ns))
+                    continue
+                self._db.execute(
+                    "INSERT INTO images VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (path, size, mtime_ns, info["set"], info["index"], info["total"],
+                     info["threshold"], info["flags"]))
+                self._db.executemany("INSERT INTO tags (path, tag) VALUES (?, ?)",
+                                     [(path, tag) for tag in info["tags"]])
+                if records is not None:
+                    records[path] = info["record"]
+        stats.skipped = results.count(None)
+        stats.probed = len(results) - stats.skipped
+        stats.removed = len(known)
+        stats.shares = self._db.execute(
+            "SELECT COUNT(*) FROM images WHERE set_digest IS NOT NULL AND path LIKE ? ESCAPE '\\'",
+            (_like_prefix(prefix),)).fetchone()[0]
+        return stats
+
+    def _forget(self, path: str):
+        self._db.execute("DELETE FROM tags WHERE path = ?", (path,))
+        self._db.execute("DELETE FROM images WHERE path = ?", (path,))
+
+    def _group(self, rows) -> List[ShareSet]:
+        sets: Dict[str, ShareSet] = {}
+        for path, digest, share_index, total, threshold, flags in rows:
+            share_set = sets.get(digest)
+            if share_set is None:
+                share_set = sets[digest] = ShareSet(digest, total, threshold, flags)
+            share_set.indices.append(share_index)
+            share_set.paths.append(path)
+        return list(sets.values())
+
+    def sets(self) -> List[ShareSet]:
+        """Every share set in the index."""
+        return self._group(self._db.execute(
+            "SELECT path, set_digest, share_index, total, threshold, flags FROM images "
+            "WHERE set_digest IS NOT NULL ORDER BY set_digest, share_index, path"))
+
+    def find_tag(self, tag: bytes) -> List[ShareSet]:
+        """Share sets with at least one image whose header carries the blind-index tag."""
+        return self._group(self._db.execute(
+            "SELECT path, set_digest, share_index, total, threshold, flags FROM images "
+            "WHERE set_digest IN (SELECT i.set_digest FROM tags t JOIN images i ON i.path = t.path "
+            "WHERE t.tag = ?) ORDER BY set_digest, share_index, path", (tag,)))
+
+
+def _like_prefix(prefix: str) -> str:
+    return prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def main(argv=None):
+    import argparse
+    from colors import print_colored, Colors
+
+    parser = argparse.ArgumentParser(description="Index the Fractured Keys shares found under a folder")
+    parser.add_argument("folder")
+    parser.add_argument("--index", default=DEFAULT_INDEX_PATH, help="SQLite index file")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    with ShareIndex(args.index) as index:
+        stats = index.scan(args.folder, workers=args.workers)
+        print_colored(f"Scanned {stats.seen} images: probed {stats.probed}, "
+                      f"dropped {stats.removed}, {stats.shares} shares indexed.", Colors.SUCCESS)
+        if stats.skipped:
+            print_colored(f"Skipped {stats.skipped} unreadable images; they are probed again next scan.",
+                          Colors.WARNING)
+        prefix = folder_prefix(args.folder)
+        for share_set in index.sets():
+            share_set = share_set.within(prefix)
+            if not share_set.paths:
+                continue
+            kind = "vault" if share_set.is_vault else "password"
+            state = "recoverable" if share_set.recoverable else "incomplete"
+            print_colored(f"Set {share_set.digest} ({kind}, {len(share_set.paths)}/{share_set.total} shares, "
+                          f"threshold {share_set.threshold}, {state})", Colors.INFO, Colors.BOLD)
+            for path in share_set.paths:
+                print_colored(f"  {path}", Colors.INFO)
+
+
+if __name__ == "__main__":
+    main()
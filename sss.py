@@ -10,18 +10,35 @@ Public API:
 
 - recover_bytes_from_shares(share_bytes_list: List[bytes]) -> bytes
     Accepts a list of shares in the format above and returns the recovered secret bytes.
+
+- share_length(secret_len: int = 16) -> int
+    Size of each share split_bytes_into_shares returns for a secret of secret_len bytes.
 """
 
 from typing import List
 import os
+from tracing import traced
+from metrics import SSS_OPERATIONS
+
+# PyCryptodome's Shamir is used if available. It is probed on first use rather than at
+# import, so entry points that never split or recover do not pay for loading it;
+# sss._USE_PYCRYPTO is resolved the same way (see __getattr__ below).
+_shamir = None   # the Shamir class, False if PyCryptodome is missing, None until probed
+
+def _pycrypto_shamir():
+    global _shamir
+    if _shamir is None:
+        try:
+            from Crypto.Protocol.SecretSharing import Shamir
+            _shamir = Shamir
+        except Exception:
+            _shamir = False
+    return _shamir or None
 
-# Try to use PyCryptodome's Shamir if available
-_USE_PYCRYPTO = False
-try:
-    from Crypto.Protocol.SecretSharing import Shamir as _PyCrypto_Shamir
-    _USE_PYCRYPTO = True
-except Exception:
-    _USE_PYCRYPTO = False
+def __getattr__(name):
+    if name == "_USE_PYCRYPTO":
+        return _pycrypto_shamir() is not None
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # --- Fallback pure-Python (simple but correct) implementation (only used if pycryptodome missing) ---
 # We'll reuse the big-prime integer-based approach for reliability.
@@ -93,61 +110,72 @@ def _recover_bytes_pure(share_blobs: List[bytes]) -> bytes:
 
 
 # --- PyCryptodome-backed implementation ---
-# If pycryptodome is available, use it for splitting/combining bytes
-if _USE_PYCRYPTO:
-    def split_bytes_into_shares(secret_bytes: bytes, n: int = 3, k: int = 2) -> List[bytes]:
-        """
-        Use PyCryptodome Shamir.split
-        PyCryptodome's Shamir.split(k, n, secret_bytes) returns list of (index, share_bytes).
-        We normalize to bytes: index_byte + share_bytes
-        """
-        if not isinstance(secret_bytes, (bytes, bytearray)):
-            raise TypeError("secret_bytes must be bytes")
-        if not (1 < k <= n <= 255):
-            raise ValueError("Require 1 < k <= n <= 255")
-        
-        # PyCryptodome requires exactly 16 bytes for the secret
-        if len(secret_bytes) != 16:
-            # Pad or truncate to 16 bytes
-            if len(secret_bytes) < 16:
-                secret_bytes = secret_bytes + b'\x00' * (16 - len(secret_bytes))
-            else:
-                secret_bytes = secret_bytes[:16]
-        
-        # PyCryptodome's API: Shamir.split(k, n, secret)
-        shares = _PyCrypto_Shamir.split(k, n, secret_bytes)
-        out = []
-        for idx, sh in shares:
-            if isinstance(idx, int):
-                out.append(bytes([idx]) + sh)
-            else:
-                # some versions return idx as bytes; normalize
-                out.append(bytes([int.from_bytes(idx, 'big')]) + sh)
-        return out
-
-    def recover_bytes_from_shares(share_bytes_list: List[bytes]) -> bytes:
-        """
-        Accept list of bytes of form index_byte + share_payload and call Shamir.combine
-        """
-        if not share_bytes_list:
-            raise ValueError("No shares provided")
-        shares = []
-        for b in share_bytes_list:
-            if len(b) < 2:
-                raise ValueError("Invalid share format")
-            idx = b[0]
-            payload = b[1:]
-            shares.append((idx, payload))
-        # PyCryptodome's combine expects list of (index, share)
-        secret = _PyCrypto_Shamir.combine(shares)
-        # Remove padding if it was added
-        return secret.rstrip(b'\x00') if secret.endswith(b'\x00') else secret
-
-else:
-    # fallback: use pure implementations above
-    def split_bytes_into_shares(secret_bytes: bytes, n: int = 3, k: int = 2) -> List[bytes]:
-        return _split_bytes_pure(secret_bytes, n=n, k=k)
-
-    def recover_bytes_from_shares(share_bytes_list: List[bytes]) -> bytes:
-        return _recover_bytes_pure(share_bytes_list)
+def _split_bytes_pycrypto(secret_bytes: bytes, n: int = 3, k: int = 2) -> List[bytes]:
+    """
+    Use PyCryptodome Shamir.split
+    PyCryptodome's Shamir.split(k, n, secret_bytes) returns list of (index, share_bytes).
+    We normalize to bytes: index_byte + share_bytes
+    """
+    if not isinstance(secret_bytes, (bytes, bytearray)):
+        raise TypeError("secret_bytes must be bytes")
+    if not (1 < k <= n <= 255):
+        raise ValueError("Require 1 < k <= n <= 255")
+
+    # PyCryptodome requires exactly 16 bytes for the secret
+    if len(secret_bytes) != 16:
+        # Pad or truncate to 16 bytes
+        if len(secret_bytes) < 16:
+            secret_bytes = secret_bytes + b'\x00' * (16 - len(secret_bytes))
+        else:
+            secret_bytes = secret_bytes[:16]
+
+    # PyCryptodome's API: Shamir.split(k, n, secret)
+    shares = _pycrypto_shamir().split(k, n, secret_bytes)
+    out = []
+    for idx, sh in shares:
+        if isinstance(idx, int):
+            out.append(bytes([idx]) + sh)
+        else:
+            # some versions return idx as bytes; normalize
+            out.append(bytes([int.from_bytes(idx, 'big')]) + sh)
+    return out
+
+def _recover_bytes_pycrypto(share_bytes_list: List[bytes]) -> bytes:
+    """
+    Accept list of bytes of form index_byte + share_payload and call Shamir.combine
+    """
+    if not share_bytes_list:
+        raise ValueError("No shares provided")
+    shares = []
+    for b in share_bytes_list:
+        if len(b) < 2:
+            raise ValueError("Invalid share format")
+        idx = b[0]
+        payload = b[1:]
+        shares.append((idx, payload))
+    # PyCryptodome's combine expects list of (index, share)
+    secret = _pycrypto_shamir().combine(shares)
+    # Remove padding if it was added
+    return secret.rstrip(b'\x00') if secret.endswith(b'\x00') else secret
+
+
+# --- Public API: PyCryptodome if available, else the pure implementation ---
+@traced("sss.split")
+def split_bytes_into_shares(secret_bytes: bytes, n: int = 3, k: int = 2) -> List[bytes]:
+    SSS_OPERATIONS.inc(op="split")
+    if _pycrypto_shamir() is not None:
+        return _split_bytes_pycrypto(secret_bytes, n=n, k=k)
+    return _split_bytes_pure(secret_bytes, n=n, k=k)
+
+def share_length(secret_len: int = 16) -> int:
+    """Size of the shares of a secret_len-byte secret with the active backend."""
+    if _pycrypto_shamir() is not None:
+        return 1 + 16   # PyCryptodome pads or truncates the secret to 16 bytes
+    return 1 + (_PRIME.bit_length() + 7) // 8
 
+@traced("sss.recover")
+def recover_bytes_from_shares(share_bytes_list: List[bytes]) -> bytes:
+    SSS_OPERATIONS.inc(op="recover")
+    if _pycrypto_shamir() is not None:
+        return _recover_bytes_pycrypto(share_bytes_list)
+    return _recover_bytes_pure(share_bytes_list)
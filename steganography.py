@@ -1,57 +1,212 @@
 # steganography.py
+import os
+import struct
+import zlib
 from PIL import Image
 from colors import print_colored, Colors
+from tracing import span
+from memory import get_budget, plan_embed, plan_extract
+from metrics import BYTES_EMBEDDED, EXTRACTION_FAILURES, EXTRACTIONS, SHARES_EMBEDDED
+from progress import _NO_REPORTER, CHUNK_BYTES, reporter
+from cancel import check
 
 MAGIC = b"FKSV1"   # 5 bytes
 MAGIC_LEN = len(MAGIC)
+PARTIAL_SUFFIX = ".part"   # stego images are written here first, then renamed into place
 
-def _bits_from_bytes(data: bytes):
-    for byte in data:
-        for i in range(7, -1, -1):
-            yield (byte >> i) & 1
+def _bits_from_bytes(data: bytes, report=_NO_REPORTER):
+    for start in range(0, len(data), CHUNK_BYTES):
+        report.update(start)
+        for byte in data[start:start + CHUNK_BYTES]:
+            for i in range(7, -1, -1):
+                yield (byte >> i) & 1
 
-def _read_n_bytes_from_bits(bit_iter, n):
+def _read_n_bytes_from_bits(bit_iter, n, report=_NO_REPORTER):
     """Read n bytes (n*8 bits) from bit iterator; raise if not enough bits."""
     out = bytearray()
-    for _ in range(n):
-        b = 0
-        for _ in range(8):
-            try:
-                bit = next(bit_iter)
-            except StopIteration:
-                raise ValueError("Not enough bits in image while reading payload.")
-            b = (b << 1) | bit
-        out.append(b)
+    for start in range(0, n, CHUNK_BYTES):
+        report.update(start)
+        for _ in range(min(CHUNK_BYTES, n - start)):
+            b = 0
+            for _ in range(8):
+                try:
+                    bit = next(bit_iter)
+                except StopIteration:
+                    raise ValueError("Not enough bits in image while reading payload.")
+                b = (b << 1) | bit
+            out.append(b)
+    return bytes(out)
+
+def _bytes_from_lsbs(channels: bytes, n_bytes: int, report=_NO_REPORTER) -> bytes:
+    """Pack the LSB of each channel value (8 per byte, MSB first) into n_bytes."""
+    out = bytearray(n_bytes)
+    for start in range(0, n_bytes, CHUNK_BYTES):
+        report.update(start)
+        for i in range(start, min(start + CHUNK_BYTES, n_bytes)):
+            b = 0
+            for c in channels[i * 8:i * 8 + 8]:
+                b = (b << 1) | (c & 1)
+            out[i] = b
+    return bytes(out)
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_PNG_MODES = {0: ("L", 1), 2: ("RGB", 3), 3: ("P", 1), 4: ("LA", 2), 6: ("RGBA", 4)}   # colour type -> mode, channels
+
+def _png_layout(path: str):
+    """(width, height, colour type) of an 8-bit, non-interlaced PNG at path, else None."""
+    try:
+        with open(path, "rb") as f:
+            head = f.read(len(_PNG_SIGNATURE) + 8 + 13)
+    except OSError:
+        return None
+    if len(head) < len(_PNG_SIGNATURE) + 21 or not head.startswith(_PNG_SIGNATURE) or head[12:16] != b"IHDR":
+        return None
+    width, height, depth, colour, _, _, interlace = struct.unpack(">IIBBBBB", head[16:29])
+    if depth != 8 or interlace or colour not in _PNG_MODES:
+        return None
+    return width, height, colour
+
+def _decodes_rows(img) -> bool:
+    """True if just the top rows of img can be decoded (an 8-bit, non-interlaced PNG file)."""
+    return img.format == "PNG" and bool(getattr(img, "filename", "")) and _png_layout(img.filename) is not None
+
+def _unfilter_rows(raw, rows: int, stride: int, bpp: int) -> bytes:
+    """Undo the per-scanline PNG filters (None/Sub/Up/Average/Paeth) of the first rows."""
+    out = bytearray(stride * rows)
+    prev = bytes(stride)
+    for r in range(rows):
+        start = r * (stride + 1)
+        kind = raw[start]
+        line = bytearray(raw[start + 1:start + 1 + stride])
+        if kind == 1:
+            for i in range(bpp, stride):
+                line[i] = (line[i] + line[i - bpp]) & 0xFF
+        elif kind == 2:
+            for i in range(stride):
+                line[i] = (line[i] + prev[i]) & 0xFF
+        elif kind == 3:
+            for i in range(stride):
+                left = line[i - bpp] if i >= bpp else 0
+                line[i] = (line[i] + ((left + prev[i]) >> 1)) & 0xFF
+        elif kind == 4:
+            for i in range(stride):
+                a = line[i - bpp] if i >= bpp else 0
+                b = prev[i]
+                c = prev[i - bpp] if i >= bpp else 0
+                pa, pb, pc = abs(b - c), abs(a - c), abs(a + b - 2 * c)
+                line[i] = (line[i] + (a if pa <= pb and pa <= pc else b if pb <= pc else c)) & 0xFF
+        elif kind != 0:
+            raise OSError(f"Unknown PNG filter type {kind}")
+        out[r * stride:(r + 1) * stride] = line
+        prev = line
     return bytes(out)
 
-def embed_data_into_image(image_path: str, data_bytes: bytes, output_path: str = None) -> str:
+def _inflate_png_rows(path: str, rows: int):
     """
-    Embed data_bytes into the LSB of RGB channels of the image.
-    Saves as PNG. Returns output_path.
+    The top rows of an 8-bit, non-interlaced PNG as an image of its own mode. IDAT
+    data is inflated only until those rows are out, then the filters are undone.
     """
-    try:
-        img = Image.open(image_path)
-    except Exception as e:
-        raise ValueError(f"Cannot open carrier image: {e}")
+    width, height, colour = _png_layout(path)
+    mode, channels = _PNG_MODES[colour]
+    stride = width * channels
+    needed = rows * (stride + 1)   # each scanline starts with its filter type byte
+    raw, palette = bytearray(), None
+    inflate = zlib.decompressobj()
+    with open(path, "rb") as f:
+        f.seek(len(_PNG_SIGNATURE))
+        while len(raw) < needed:
+            head = f.read(8)
+            if len(head) < 8:
+                raise OSError("image file is truncated")
+            length, kind = struct.unpack(">I4s", head)
+            data = f.read(length)
+            crc = f.read(4)
+            if len(data) < length or len(crc) < 4:
+                raise OSError("image file is truncated")
+            if struct.unpack(">I", crc)[0] != zlib.crc32(kind + data):
+                raise OSError(f"Broken PNG file: bad CRC in {kind!r} chunk")
+            if kind == b"PLTE":
+                palette = data
+            elif kind == b"IDAT":
+                raw += inflate.decompress(data, needed - len(raw))
+            elif kind == b"IEND":
+                raise OSError("image file is truncated")
+    band = Image.frombytes(mode, (width, rows), _unfilter_rows(raw, rows, stride, channels))
+    if mode == "P":
+        band.putpalette(palette or b"")
+    return band
 
-    img = img.convert('RGB')  # always use 3 channels
+def _decode_rows(img, rows: int):
+    """
+    The top rows of an opened, not yet loaded image, as an RGB image. A PNG's
+    scanlines are stored top to bottom, so only the IDAT data holding those rows
+    is read and inflated (see _inflate_png_rows); other formats (and interlaced or
+    16-bit PNGs) are decoded whole by Pillow and cropped.
+    """
     width, height = img.size
-    capacity_bits = width * height * 3  # 3 bits per pixel
-    payload = MAGIC + len(data_bytes).to_bytes(4, 'big') + data_bytes
-    required_bits = len(payload) * 8
+    if rows < height and _decodes_rows(img):
+        band = _inflate_png_rows(img.filename, rows)
+    else:
+        band = img.crop((0, 0, width, rows))
+    return band if band.mode == 'RGB' else band.convert('RGB')
 
-    print_colored(f"Carrier image: {image_path} ({width}x{height}, RGB)", Colors.INFO)
-    print_colored(f"Payload size: {len(data_bytes)} bytes -> requires {required_bits} bits", Colors.INFO)
-    print_colored(f"Image capacity: {capacity_bits} bits ({capacity_bits//8} bytes)", Colors.INFO)
+def _channel_prefix(image_path: str, n_channels: int) -> bytes:
+    """First n_channels RGB channel values of an image, decoding only the rows that hold them."""
+    with Image.open(image_path) as img:
+        width, height = img.size
+        if n_channels > width * height * 3:
+            raise ValueError("Not enough bits in image while reading payload.")
+        return _decode_rows(img, -(-n_channels // (width * 3))).tobytes()[:n_channels]
 
-    if required_bits > capacity_bits:
-        raise ValueError(
-            f"Carrier image too small: need {required_bits} bits ({required_bits//8} bytes). "
-            f"Image capacity: {capacity_bits} bits ({capacity_bits//8} bytes)."
-        )
+def _payload_rows(image_path: str, width: int, height: int) -> int:
+    """Rows of the image that hold the header and payload, read from the header."""
+    header_len = MAGIC_LEN + 4
+    header = _bytes_from_lsbs(_channel_prefix(image_path, header_len * 8), header_len)
+    if header[:MAGIC_LEN] != MAGIC:
+        return 1   # nothing to read past the header; the extract reports it
+    length = int.from_bytes(header[MAGIC_LEN:], 'big')
+    return min(height, -(-(header_len + length) * 8 // (width * 3)))
+
+def read_payload_prefix(image_path: str, n_bytes: int, progress=None, cancel=None) -> bytes:
+    """
+    Return up to n_bytes from the start of the embedded data of an image (fewer if
+    the payload is shorter). Verifies MAGIC. Only the rows holding the header and
+    the bytes returned are decoded. Raises ValueError if there is no payload and
+    OSError if the image cannot be read.
+    """
+    header_len = MAGIC_LEN + 4
+    header = _bytes_from_lsbs(_channel_prefix(image_path, header_len * 8), header_len)
+    if header[:MAGIC_LEN] != MAGIC:
+        raise ValueError("Magic header mismatch - image does not appear to contain Fractured Keys payload.")
+    n_bytes = min(n_bytes, int.from_bytes(header[MAGIC_LEN:], 'big'))
+    channels = _channel_prefix(image_path, (header_len + n_bytes) * 8)
+    report = reporter(progress, "extract", n_bytes, cancel=cancel)
+    data = _bytes_from_lsbs(channels[header_len * 8:], n_bytes, report)
+    report.finish()
+    return data
+
+def _count_failure(exc: ValueError):
+    """Record a failed read of an opened image in the metrics, by reason."""
+    EXTRACTION_FAILURES.inc(reason="no_payload" if str(exc).startswith("Magic") else "truncated")
+
+def peek_data_from_image(image_path: str, n_bytes: int) -> bytes:
+    """Read only the first n_bytes of the embedded data (e.g. a share header)."""
+    with span("stego.peek", bytes=n_bytes):
+        try:
+            data = read_payload_prefix(image_path, n_bytes)
+        except ValueError as e:
+            _count_failure(e)
+            raise
+        except OSError as e:
+            EXTRACTION_FAILURES.inc(reason="unreadable")
+            raise ValueError(f"Cannot open image: {e}")
+    EXTRACTIONS.inc()
+    return data
 
+def _embed_pixels(img, payload: bytes, report=_NO_REPORTER):
+    """In-memory embed over per-pixel tuples. Returns a new RGB image."""
     pixels = list(img.getdata())  # list of (R,G,B) tuples
-    bit_iter = _bits_from_bytes(payload)
+    bit_iter = _bits_from_bytes(payload, report)
 
     new_pixels = []
     exhausted = False
@@ -73,27 +228,136 @@ def embed_data_into_image(image_path: str, data_bytes: bytes, output_path: str =
 
     out_img = Image.new('RGB', img.size)
     out_img.putdata(new_pixels)
+    return out_img
+
+def _embed_rows(img, payload: bytes, report=_NO_REPORTER):
+    """Tiled embed: rewrite only the rows of an RGB image that hold payload, in place."""
+    width = img.size[0]
+    rows = -(-len(payload) * 8 // (width * 3))
+    band = bytearray(img.crop((0, 0, width, rows)).tobytes())
+    for i, bit in enumerate(_bits_from_bytes(payload, report)):
+        band[i] = (band[i] & 0xFE) | bit
+    img.paste(Image.frombytes('RGB', (width, rows), bytes(band)), (0, 0))
+    return img
+
+class _CountingWriter:
+    """File wrapper reporting bytes written. Having no fileno() makes Pillow write through it."""
+    __slots__ = ("f", "report", "written")
+
+    def __init__(self, f, report):
+        self.f = f
+        self.report = report
+        self.written = 0
+
+    def write(self, data):
+        self.written += len(data)
+        self.report.update(self.written)
+        return self.f.write(data)
+
+    def flush(self):
+        self.f.flush()
+
+def save_png_atomic(img, output_path: str, progress=None, expected_size: int = None, cancel=None):
+    """
+    Write img as PNG so that output_path is either the old file or the complete new one.
+    Progress is reported in bytes written out of expected_size (default: the raw pixel size).
+    If cancel is cancelled while writing, the partial file is removed and Cancelled raised.
+    """
+    partial_path = output_path + PARTIAL_SUFFIX
+    try:
+        with open(partial_path, "wb") as f, span("stego.png_save", pixels=img.size[0] * img.size[1]):
+            if progress is None and cancel is None:
+                img.save(f, format='PNG')
+            else:
+                report = reporter(progress, "save", expected_size or img.size[0] * img.size[1] * 3,
+                                  cancel=cancel)
+                writer = _CountingWriter(f, report)
+                img.save(writer, format='PNG')
+                report.finish(writer.written)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(partial_path, output_path)
+    except BaseException:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
+
+def carrier_size(image_path: str) -> tuple:
+    """(width, height) of an image, read from its header without decoding the pixels."""
+    try:
+        with Image.open(image_path) as img:
+            return img.size
+    except Exception as e:
+        raise ValueError(f"Cannot open carrier image: {e}")
+
+def capacity_bytes(width: int, height: int) -> int:
+    """Bytes of embedded payload a width x height carrier holds (one bit per RGB channel)."""
+    return width * height * 3 // 8
+
+def embedded_size(data_len: int) -> int:
+    """Bytes embed_data_into_image writes into a carrier for data_len bytes of data."""
+    return MAGIC_LEN + 4 + data_len
+
+def embed_data_into_image(image_path: str, data_bytes: bytes, output_path: str = None, progress=None,
+                          cancel=None) -> str:
+    """
+    Embed data_bytes into the LSB of RGB channels of the image.
+    Saves as PNG. Returns output_path. Raises memory.MemoryBudgetError if the
+    carrier cannot be processed within the memory budget. progress: see progress.py;
+    cancel: a cancel.CancelToken, checked between stages and while embedding and saving.
+    """
+    check(cancel)
+    with span("stego.decode", path=os.path.basename(image_path)):
+        try:
+            img = Image.open(image_path)
+        except Exception as e:
+            raise ValueError(f"Cannot open carrier image: {e}")
+
+        tiled = plan_embed(*img.size)   # checked before the image is decoded
+        carrier_format = img.format
+        decode = reporter(progress, "decode", img.size[0] * img.size[1], "pixels")
+        img.load()
+        if img.mode != 'RGB':   # always use 3 channels; convert() would copy an RGB image too
+            img = img.convert('RGB')
+        decode.finish()
+    width, height = img.size
+    capacity_bits = width * height * 3  # 3 bits per pixel
+    payload = MAGIC + len(data_bytes).to_bytes(4, 'big') + data_bytes
+    required_bits = len(payload) * 8
+
+    print_colored(f"Carrier image: {image_path} ({width}x{height}, RGB)", Colors.INFO)
+    print_colored(f"Payload size: {len(data_bytes)} bytes -> requires {required_bits} bits", Colors.INFO)
+    print_colored(f"Image capacity: {capacity_bits} bits ({capacity_bits//8} bytes)", Colors.INFO)
+
+    if required_bits > capacity_bits:
+        raise ValueError(
+            f"Carrier image too small: need {required_bits} bits ({required_bits//8} bytes). "
+            f"Image capacity: {capacity_bits} bits ({capacity_bits//8} bytes)."
+        )
+
+    if tiled:
+        print_colored("Carrier exceeds the memory budget for the in-memory path; rewriting only the payload rows.", Colors.INFO)
+    with span("stego.lsb_embed", bytes=len(data_bytes), pixels=width * height, tiled=tiled):
+        check(cancel)
+        report = reporter(progress, "embed", len(payload), cancel=cancel)
+        out_img = _embed_rows(img, payload, report) if tiled else _embed_pixels(img, payload, report)
+        report.finish()
 
     if output_path is None:
         # generate default filename
         base, _ = image_path.rsplit('.', 1) if '.' in image_path else (image_path, '')
         output_path = f"{base}_stego.png"
 
-    out_img.save(output_path, format='PNG')
+    # A PNG carrier re-encodes to about its own size; otherwise estimate from the pixels
+    expected_size = os.path.getsize(image_path) if carrier_format == "PNG" else None
+    save_png_atomic(out_img, output_path, progress, expected_size, cancel)
+    SHARES_EMBEDDED.inc()
+    BYTES_EMBEDDED.inc(len(data_bytes))
     print_colored(f"Stego image saved: {output_path}", Colors.SUCCESS, Colors.BOLD)
     return output_path
 
-def extract_data_from_image(image_path: str) -> bytes:
-    """
-    Extract embedded data and return data_bytes (the original binary blob).
-    Verifies MAGIC and reads length.
-    """
-    try:
-        img = Image.open(image_path)
-    except Exception as e:
-        raise ValueError(f"Cannot open image: {e}")
-
-    img = img.convert('RGB')
+def _extract_pixels(img, progress=None, cancel=None) -> bytes:
+    """In-memory extract over the channel values of a whole RGB image."""
     pixels = list(img.getdata())
     bit_iter = (channel & 1 for (r, g, b) in pixels for channel in (r, g, b))
 
@@ -108,9 +372,46 @@ def extract_data_from_image(image_path: str) -> bytes:
     if length < 0:
         raise ValueError("Invalid payload length in header.")
 
-    print_colored(f"Found payload header. Expecting {length} bytes of data.", Colors.INFO)
+    report = reporter(progress, "extract", length, cancel=cancel)
+    data = _read_n_bytes_from_bits(bit_iter, length, report)
+    report.finish()
+    return data
+
+def extract_data_from_image(image_path: str, progress=None, cancel=None) -> bytes:
+    """
+    Extract embedded data and return data_bytes (the original binary blob).
+    Verifies MAGIC and reads length. Over the memory budget only the rows holding
+    the payload are decoded, for a PNG; other formats are decoded whole (see
+    memory.py). progress: see progress.py; cancel: a cancel.CancelToken.
+    """
+    check(cancel)
+    with span("stego.decode", path=os.path.basename(image_path)):
+        try:
+            img = Image.open(image_path)
+        except Exception as e:
+            EXTRACTION_FAILURES.inc(reason="unreadable")
+            raise ValueError(f"Cannot open image: {e}")
+
+        width, height = img.size
+        rows = _payload_rows(image_path, width, height) if get_budget() and _decodes_rows(img) else height
+        tiled = plan_extract(width, height, rows)
+        if not tiled:
+            decode = reporter(progress, "decode", img.size[0] * img.size[1], "pixels")
+            img = img.convert('RGB')
+            decode.finish()
+
+    check(cancel)
+    with span("stego.lsb_extract", tiled=tiled) as lsb_span:
+        try:
+            data_bytes = (read_payload_prefix(image_path, 0xFFFFFFFF, progress, cancel) if tiled
+                          else _extract_pixels(img, progress, cancel))
+        except ValueError as e:
+            _count_failure(e)
+            raise
+        lsb_span.set(bytes=len(data_bytes))
+    EXTRACTIONS.inc()
 
-    data_bytes = _read_n_bytes_from_bits(bit_iter, length)
+    print_colored(f"Found payload header. Expecting {len(data_bytes)} bytes of data.", Colors.INFO)
     print_colored(f"Extracted {len(data_bytes)} bytes from image.", Colors.SUCCESS)
     return data_bytes
 
@@ -5,6 +5,7 @@ Basic test script to verify Fractured Keys functionality
 
 import sys
 import os
+import shutil
 import tempfile
 from pathlib import Path
 
@@ -143,6 +144,1206 @@ def test_steganography():
         print(f"❌ Steganography test failed: {e}")
         return False
 
+def test_share_codec():
+    """Test share payload wrap/parse round trip"""
+    print("\n📦 Testing share codec...")
+    
+    try:
+        from share_codec import wrap_share_payload, parse_share_payload, records_compatible
+        
+        share = bytes([1]) + b"s" * 16
+        packaged = b"p" * 4096
+        payload = wrap_share_payload(share, index=1, total=3, threshold=2, packaged_cipher=packaged)
+        
+        record = parse_share_payload(payload)
+        print("✅ Payload parsed")
+        
+        if (record.index, record.total, record.threshold) != (1, 3, 2):
+            print("❌ Header fields mismatch")
+            return False
+        if record.share_bytes != share or record.packaged_cipher != packaged:
+            print("❌ Share or packaged cipher mismatch")
+            return False
+        if record.packaged_cipher.obj is not payload:
+            print("❌ Packaged cipher was copied")
+            return False
+        
+        other = parse_share_payload(wrap_share_payload(share, index=2, total=3, threshold=2, packaged_cipher=packaged))
+        if not records_compatible([record, other]):
+            print("❌ Shares from the same set reported incompatible")
+            return False
+        
+        try:
+            parse_share_payload(payload[:-1])
+            print("❌ Truncated payload accepted")
+            return False
+        except ValueError:
+            print("✅ Truncated payload rejected")
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Share codec test failed: {e}")
+        return False
+
+def test_vault():
+    """Test multi-entry vault stored in one stego set"""
+    print("\n🗄️ Testing vault container...")
+    
+    paths = []
+    try:
+        from PIL import Image
+        from cryptography.exceptions import InvalidTag
+        from vault import create_vault_set, add_entry_to_set, lookup_in_set, load_vault_set, read_index
+        
+        for i in range(3):
+            path = f"test_vault_{i}.png"
+            Image.new('RGB', (120, 120), color='white').save(path)
+            paths.append(path)
+        
+        entries = {"github": "gh-secret", "email": "mail-secret"}
+        stego = create_vault_set(entries, "vault_master", paths)
+        paths.extend(stego)
+        print("✅ Vault set created")
+        
+        add_entry_to_set(stego, "vault_master", "bank", "bank-secret")
+        print("✅ Entry added in place")
+        
+        records, _, k2 = load_vault_set(stego[:2])
+        labels = read_index(records[0].packaged_cipher, k2).labels
+        if labels != ["bank", "email", "github"]:
+            print(f"❌ Unexpected labels: {labels}")
+            return False
+        
+        if lookup_in_set(stego[1:], "vault_master", "github") != "gh-secret":
+            print("❌ Looked-up entry mismatch")
+            return False
+        if lookup_in_set(stego[:2], "vault_master", "bank") != "bank-secret":
+            print("❌ Added entry mismatch")
+            return False
+        print("✅ Entries looked up successfully")
+        
+        try:
+            add_entry_to_set([p[:-4] + ".jpg" for p in stego], "vault_master", "bank", "other")
+            print("❌ Non-PNG images updated in place")
+            return False
+        except ValueError:
+            pass
+        
+        # A crash while moving the updated images into place is completed on the next load
+        import vault
+        real_replace = os.replace
+        swapped = []
+        def crash_midway(src, dst):
+            if src.endswith(vault.UPDATE_SUFFIX):
+                if swapped:
+                    raise OSError("simulated crash")
+                swapped.append(dst)
+            real_replace(src, dst)
+        os.replace = crash_midway
+        try:
+            add_entry_to_set(stego, "vault_master", "forum", "forum-secret")
+            print("❌ Simulated crash did not happen")
+            return False
+        except OSError:
+            pass
+        finally:
+            os.replace = real_replace
+        if lookup_in_set(stego[1:], "vault_master", "forum") != "forum-secret":
+            print("❌ Interrupted update not completed")
+            return False
+        if any(os.path.exists(p + vault.UPDATE_SUFFIX) for p in stego) or os.path.exists(vault.SWAP_JOURNAL):
+            print("❌ Interrupted update left files behind")
+            return False
+        print("✅ Interrupted in-place update completed on load")
+        
+        # Even an empty vault refuses a wrong master password
+        empty = create_vault_set({}, "vault_master", paths[:3], [f"test_vault_empty_{i}.png" for i in range(3)])
+        paths.extend(empty)
+        try:
+            add_entry_to_set(empty, "not_the_master", "bank", "bank-secret")
+            print("❌ Wrong master password accepted by an empty vault")
+            return False
+        except InvalidTag:
+            pass
+        add_entry_to_set(empty, "vault_master", "bank", "bank-secret")
+        if lookup_in_set(empty[:2], "vault_master", "bank") != "bank-secret":
+            print("❌ Entry added to an empty vault mismatch")
+            return False
+        print("✅ Master password checked on an empty vault")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Vault test failed: {e}")
+        return False
+    finally:
+        for path in set(paths):
+            if os.path.exists(path):
+                os.remove(path)
+
+def test_bin_archive():
+    """Test append-only .bin archive, torn-append recovery and compaction"""
+    print("\n🗃️ Testing .bin archive...")
+    
+    archive_path = "test_archive.bin"
+    try:
+        from crypto import encrypt_password_aes_gcm, decrypt_password_aes_gcm
+        from bin_archive import BinArchive, append_entry, compact_archive
+        
+        if os.path.exists(archive_path):
+            os.remove(archive_path)
+        for entry_id, password in [("github", "gh-pass"), ("email", "mail-pass"), ("github", "gh-pass-2")]:
+            salt, nonce, ct = encrypt_password_aes_gcm(password, "archive_master")
+            append_entry(archive_path, entry_id, salt + nonce + ct)
+        print("✅ Entries appended")
+        
+        # Simulate an interrupted append
+        with open(archive_path, "ab") as f:
+            f.write(b"FKRC\x00\x04torn")
+        with BinArchive(archive_path) as archive:
+            if not archive.recovered or sorted(archive.entries) != ["email", "github"]:
+                print("❌ Torn archive not recovered")
+                return False
+        
+        compact_archive(archive_path)
+        with BinArchive(archive_path) as archive:
+            blob = archive.read("github")
+        if decrypt_password_aes_gcm(blob[:16], blob[16:28], blob[28:], "archive_master") != "gh-pass-2":
+            print("❌ Latest entry not returned after compaction")
+            return False
+        print("✅ Archive recovered and compacted")
+
+        # Appends chain small index deltas, so size grows linearly with the appends
+        sizes = {}
+        for n in (300, 600):
+            os.remove(archive_path)
+            for i in range(n):
+                append_entry(archive_path, f"entry-{i % 50}" if i % 3 == 0 else f"entry-{i}", bytes([i % 256]) * 40)
+            sizes[n] = os.path.getsize(archive_path)
+        with BinArchive(archive_path) as archive:
+            if archive.recovered or archive.read("entry-48") != bytes([498 % 256]) * 40:
+                print("❌ Chained index returned the wrong entry")
+                return False
+        if sizes[600] > 2.3 * sizes[300]:
+            print(f"❌ Archive grows faster than linear: {sizes}")
+            return False
+        print(f"✅ Archive size linear in appends ({sizes[300]} -> {sizes[600]} bytes)")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Archive test failed: {e}")
+        return False
+    finally:
+        if os.path.exists(archive_path):
+            os.remove(archive_path)
+
+def _make_share_set(folder, master, secret, n=3, blind_tags=()):
+    """Embed a fresh n-share password set into white carriers under folder"""
+    from PIL import Image
+    from crypto import encrypt_password_aes_gcm
+    from sss import split_bytes_into_shares
+    from steganography import embed_data_into_image
+    from share_codec import wrap_share_payload
+    from session_key import package_binary_blob
+    
+    salt, nonce, ct = encrypt_password_aes_gcm(secret, master)
+    k2, packaged = package_binary_blob(salt + nonce + ct)
+    stego = []
+    for i, share in enumerate(split_bytes_into_shares(k2, n=n, k=2), start=1):
+        carrier = os.path.join(folder, f"carrier_{i}.png")
+        Image.new('RGB', (100, 100), color='white').save(carrier)
+        payload = wrap_share_payload(share, i, n, 2, packaged, blind_tags=blind_tags)
+        stego.append(embed_data_into_image(carrier, payload))
+        os.remove(carrier)
+    return stego
+
+def test_share_index():
+    """Test incremental SQLite share index over a folder"""
+    print("\n📇 Testing share index...")
+    
+    folder = tempfile.mkdtemp()
+    try:
+        from PIL import Image
+        from share_index import ShareIndex
+        
+        stego = _make_share_set(folder, "index_master", "secret")
+        Image.new('RGB', (50, 50), color='white').save(os.path.join(folder, "holiday.png"))
+        db_path = os.path.join(folder, "index.db")
+        
+        with ShareIndex(db_path) as index:
+            stats = index.scan(folder)
+            if (stats.seen, stats.probed, stats.shares) != (4, 4, 3):
+                print(f"❌ Unexpected first scan: {stats}")
+                return False
+            sets = index.sets()
+            if len(sets) != 1 or sets[0].indices != [1, 2, 3] or not sets[0].recoverable:
+                print(f"❌ Unexpected sets: {sets}")
+                return False
+            print("✅ Shares grouped into one set")
+            
+            if index.scan(folder).probed != 0:
+                print("❌ Rescan probed unchanged files")
+                return False
+            os.remove(stego[0])
+            stats = index.scan(folder)
+            if (stats.probed, stats.removed, stats.shares) != (0, 1, 2):
+                print(f"❌ Deleted share not dropped: {stats}")
+                return False
+            print("✅ Rescan only touched changed files")
+            
+            # A share still being copied in is skipped, not remembered as "no share"
+            with open(stego[1], "rb") as f:
+                data = f.read()
+            copy = os.path.join(folder, "copying.png")
+            with open(copy, "wb") as f:
+                f.write(data[:64])
+            stats = index.scan(folder)
+            if (stats.probed, stats.skipped) != (0, 1):
+                print(f"❌ Partly written image not skipped: {stats}")
+                return False
+            with open(copy, "wb") as f:
+                f.write(data)
+            os.utime(copy, ns=(0, 0))
+            stats = index.scan(folder)
+            if (stats.probed, stats.skipped, stats.shares) != (1, 0, 3):
+                print(f"❌ Skipped image not probed again: {stats}")
+                return False
+            print("✅ Unreadable images left for the next scan")
+        
+        # Probing a large carrier decodes only the rows holding the share
+        import steganography
+        from share_index import read_share_info
+        big = os.path.join(folder, "big.png")
+        Image.new('RGB', (2000, 1500), color='white').save(big)
+        share_payload = steganography.peek_data_from_image(stego[1], 0xFFFFFFFF)
+        steganography.embed_data_into_image(big, share_payload, big)
+        decoded = []
+        decode_rows = steganography._decode_rows
+        def counting(img, rows):
+            band = decode_rows(img, rows)
+            decoded.append(band.size[1])
+            return band
+        steganography._decode_rows = counting
+        try:
+            info = read_share_info(big)
+        finally:
+            steganography._decode_rows = decode_rows
+        if info["index"] != 2 or not decoded or max(decoded) > 1:
+            print(f"❌ Probe decoded {decoded} rows of a 1500-row image")
+            return False
+        print(f"✅ Probe decoded {sum(decoded)} rows of a 1500-row image")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Share index test failed: {e}")
+        return False
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+def test_blind_index():
+    """Test labelled share headers and blind-index lookup"""
+    print("\n🔎 Testing blind index...")
+    
+    folder = tempfile.mkdtemp()
+    previous_salt = os.environ.get("FK_BLIND_INDEX_SALT")
+    try:
+        from share_index import ShareIndex
+        from blind_index import SALT_FILE_ENV, blind_tag, derive_index_key, lookup
+        from decryption import decrypt_share_set
+        
+        os.environ[SALT_FILE_ENV] = os.path.join(folder, "salts", "blind_index.salt")
+        master = "index_master"
+        try:
+            derive_index_key(master)
+            print("❌ Index key derived without a salt file")
+            return False
+        except ValueError:
+            pass
+        tags = [blind_tag(derive_index_key(master, create=True), "GitHub ")]
+        if os.path.getsize(os.environ[SALT_FILE_ENV]) != 16:
+            print("❌ No per-user salt file written")
+            return False
+        _make_share_set(folder, master, "gh-secret", blind_tags=tags)
+        print("✅ Labelled shares embedded")
+        
+        db_path = os.path.join(folder, "index.db")
+        with ShareIndex(db_path) as index:
+            index.scan(folder)
+        if lookup("gitlab", master, db_path) or lookup("github", "other_master", db_path):
+            print("❌ Lookup matched the wrong label or master password")
+            return False
+        matches = lookup("github", master, db_path)
+        if len(matches) != 1 or len(matches[0].paths) != 3:
+            print(f"❌ Unexpected lookup result: {matches}")
+            return False
+        if decrypt_share_set(matches[0].distinct_paths()[:2], master) != "gh-secret":
+            print("❌ Targeted decryption mismatch")
+            return False
+        print("✅ Label found and set decrypted")
+        
+        os.environ[SALT_FILE_ENV] = os.path.join(folder, "other.salt")
+        derive_index_key(master, create=True)
+        if lookup("github", master, db_path):
+            print("❌ Label found without the salt file it was written with")
+            return False
+        print("✅ Tags need the user's salt file as well as the master password")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Blind index test failed: {e}")
+        return False
+    finally:
+        if previous_salt is None:
+            os.environ.pop("FK_BLIND_INDEX_SALT", None)
+        else:
+            os.environ["FK_BLIND_INDEX_SALT"] = previous_salt
+        shutil.rmtree(folder, ignore_errors=True)
+
+def test_cli():
+    """Test the non-interactive JSON-lines CLI pipeline"""
+    print("\n⌨️ Testing CLI...")
+    
+    import io
+    import json
+    folder = tempfile.mkdtemp()
+    old_stdin = sys.stdin
+    try:
+        from cli import main as cli_main
+        
+        def run(argv, stdin=""):
+            sys.stdin = io.StringIO(stdin)
+            out = io.StringIO()
+            code = cli_main(argv, out=out)
+            return code, [json.loads(line) for line in out.getvalue().splitlines()]
+        
+        blobs, shares, recovered = (os.path.join(folder, d) for d in ("blobs", "shares", "rec"))
+        code, lines = run(["encrypt", "--out-dir", blobs], 'cli_master\n{"id": "github", "password": "gh-cli"}\n')
+        if code != 0 or lines[0]["id"] != "github":
+            print(f"❌ encrypt failed: {lines}")
+            return False
+        code, lines = run(["split", lines[0]["blob"], "--out-dir", shares])
+        if code != 0 or len(lines[0]["shares"]) != 3:
+            print(f"❌ split failed: {lines}")
+            return False
+        code, lines = run(["recover", *lines[0]["shares"][1:], "--out-dir", recovered])
+        if code != 0 or len(lines) != 1:
+            print(f"❌ recover failed: {lines}")
+            return False
+        code, lines = run(["decrypt", lines[0]["blob"]], "cli_master\n")
+        if code != 0 or lines[0]["password"] != "gh-cli":
+            print(f"❌ decrypt failed: {lines}")
+            return False
+        print("✅ encrypt -> split -> recover -> decrypt round trip")
+        
+        code, lines = run(["decrypt", os.path.join(blobs, "github.bin")], "wrong\n")
+        if code != 1 or "error" not in lines[0]:
+            print(f"❌ Wrong master password not reported: {lines}")
+            return False
+        print("✅ Failures reported as JSON lines")
+        
+        # A set split across two folders is listed per folder, judged on that folder's shares
+        first, second = os.path.join(folder, "first"), os.path.join(folder, "second")
+        os.makedirs(first)
+        os.makedirs(second)
+        stego = _make_share_set(first, "cli_master", "split-secret")
+        for path in stego[1:]:
+            shutil.move(path, second)
+        db_path = os.path.join(folder, "index.db")
+        run(["index", second, "--index", db_path])
+        code, lines = run(["index", first, "--index", db_path])
+        sets = [line for line in lines if line["op"] == "set"]
+        if code != 0 or len(sets) != 1 or sets[0]["images"] != [os.path.abspath(stego[0])] \
+                or sets[0]["recoverable"]:
+            print(f"❌ index listed shares outside the folder: {sets}")
+            return False
+        print("✅ index lists only the folder's own shares")
+        return True
+        
+    except Exception as e:
+        print(f"❌ CLI test failed: {e}")
+        return False
+    finally:
+        sys.stdin = old_stdin
+        shutil.rmtree(folder, ignore_errors=True)
+
+def test_import():
+    """Test bulk import from a CSV export on a worker pool"""
+    print("\n📥 Testing bulk import...")
+    
+    folder = tempfile.mkdtemp()
+    try:
+        from PIL import Image
+        from importer import import_records, iter_records
+        from decryption import decrypt_share_set
+        
+        carriers = []
+        for i in range(4):
+            carriers.append(os.path.join(folder, f"carrier_{i}.png"))
+            Image.new('RGB', (60, 60), color='white').save(carriers[-1])
+        export = os.path.join(folder, "export.csv")
+        with open(export, "w", encoding="utf-8") as f:
+            f.write("name,url,username,password\ngithub,,me,gh-pw\nmail,,me,mail-pw\nempty,,me,\nbank,,me,bank-pw\n")
+        
+        import metrics
+        embedded = metrics.SHARES_EMBEDDED.value()
+        saves = metrics.STAGE_DURATION.count(stage="stego.png_save")
+        results = sorted(import_records(iter_records(export), "import_master", carriers,
+                                        os.path.join(folder, "out"), workers=2, max_pending=2),
+                         key=lambda r: r["record"])
+        if [("error" in r) for r in results] != [False, False, True, False]:
+            print(f"❌ Unexpected import results: {results}")
+            return False
+        print("✅ Records imported, empty password reported")
+        
+        if (metrics.SHARES_EMBEDDED.value() - embedded != 9 or
+                metrics.STAGE_DURATION.count(stage="stego.png_save") - saves != 9):
+            print("❌ Worker metrics not added to the parent's")
+            return False
+        print("✅ Worker metrics added to the parent's")
+        
+        if decrypt_share_set(results[3]["images"][1:], "import_master") != "bank-pw":
+            print("❌ Imported set does not decrypt")
+            return False
+        print("✅ Imported set decrypts with the master password")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Import test failed: {e}")
+        return False
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+def test_scrub():
+    """Test offline scrub reports degraded and broken sets"""
+    print("\n🧽 Testing scrub...")
+    
+    folder = tempfile.mkdtemp()
+    try:
+        from steganography import extract_data_from_image, embed_data_into_image
+        from share_codec import parse_share_payload
+        from scrub import scrub_folder
+        
+        stego = _make_share_set(folder, "scrub_master", "secret")
+        reports = scrub_folder(folder, index_path=None)
+        if [r.status for r in reports] != ["ok"]:
+            print(f"❌ Fresh set not ok: {[r.as_dict() for r in reports]}")
+            return False
+        print("✅ Fresh set reported ok")
+        
+        # Flip a byte of share 2 (not its header or packaged_cipher)
+        payload = bytearray(extract_data_from_image(stego[1]))
+        record = parse_share_payload(bytes(payload))
+        payload[len(payload) - record.packaged_cipher_len - 1] ^= 0xFF
+        embed_data_into_image(stego[1], bytes(payload), output_path=stego[1])
+        report = scrub_folder(folder, index_path=None)[0]
+        if report.status != "degraded" or report.missing != [2] or report.invalid != [stego[1]]:
+            print(f"❌ Corrupt share not detected: {report.as_dict()}")
+            return False
+        print("✅ Corrupt share reported, set degraded")
+        
+        os.remove(stego[0])
+        if scrub_folder(folder, index_path=None)[0].status != "broken":
+            print("❌ Unrecoverable set not reported broken")
+            return False
+        print("✅ Unrecoverable set reported broken")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Scrub test failed: {e}")
+        return False
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+def test_journal():
+    """Test job journal replay, torn-line recovery and resumed imports"""
+    print("\n📓 Testing job journal...")
+    
+    folder = tempfile.mkdtemp()
+    try:
+        from PIL import Image
+        from journal import JobJournal
+        from importer import ImportRecord, import_records
+        
+        journal_path = os.path.join(folder, "job.journal")
+        output = os.path.join(folder, "out.bin")
+        with JobJournal(journal_path, {"job": "t"}) as journal:
+            with open(output, "wb") as f:
+                f.write(b"done")
+            journal.begin("a", [output])
+            journal.finish("a", [output])
+            journal.begin("b", [output + "2"])
+        with open(journal_path, "a") as f:
+            f.write('{"event": "done", "unit": "b"')   # torn write
+        
+        with JobJournal(journal_path, {"job": "t"}) as journal:
+            if not journal.is_done("a") or journal.in_flight != ["b"]:
+                print("❌ Journal replay mismatch")
+                return False
+        with open(output, "wb") as f:
+            f.write(b"changed")
+        with JobJournal(journal_path) as journal:
+            if journal.is_done("a"):
+                print("❌ Changed output still counted as done")
+                return False
+        print("✅ Journal replayed, torn line dropped, changed output detected")
+        
+        carriers = []
+        for i in range(3):
+            carriers.append(os.path.join(folder, f"carrier_{i}.png"))
+            Image.new('RGB', (60, 60), color='white').save(carriers[-1])
+        records = [ImportRecord("github", "me", "gh-pw"), ImportRecord("mail", "me", "mail-pw")]
+        out_dir = os.path.join(folder, "stego")
+        import_journal = os.path.join(folder, "import.journal")
+        with JobJournal(import_journal) as journal:
+            list(import_records(records[:1], "journal_master", carriers, out_dir, workers=1,
+                                with_blind_index=False, journal=journal))
+        with JobJournal(import_journal) as journal:
+            results = sorted(import_records(records, "journal_master", carriers, out_dir, workers=1,
+                                            with_blind_index=False, journal=journal),
+                             key=lambda r: r["record"])
+        if [r.get("skipped", False) for r in results] != [True, False]:
+            print(f"❌ Resume did not skip the finished record: {results}")
+            return False
+        print("✅ Resumed import skipped finished records")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Journal test failed: {e}")
+        return False
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+def test_load_generator():
+    """Test the demo.py load generator summary"""
+    print("\n📈 Testing load generator...")
+    
+    try:
+        from demo import run_load, _percentile
+        
+        if _percentile([1, 2, 3, 4], 50) != 2 or _percentile([1, 2, 3, 4], 99) != 4:
+            print("❌ Percentile mismatch")
+            return False
+        summary = run_load(clients=2, mix={"embed": 1, "extract": 1}, sizes=[(60, 60), (80, 40)],
+                           requests=6, use_threads=True)
+        stages = summary["stages"]
+        if summary["total_ops"] != 12 or not set(stages) <= {"embed", "extract"}:
+            print(f"❌ Unexpected summary: {summary}")
+            return False
+        for name, s in stages.items():
+            if s["errors"] or not (s["p50_ms"] <= s["p95_ms"] <= s["p99_ms"]):
+                print(f"❌ Bad stage stats for {name}: {s}")
+                return False
+        print("✅ Load summary has per-stage throughput and percentiles")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Load generator test failed: {e}")
+        return False
+
+def test_bench():
+    """Test benchmark timing and baseline comparison"""
+    print("\n⏱️ Testing benchmark suite...")
+    
+    try:
+        from bench import Benchmark, compare, time_benchmark
+        
+        result = time_benchmark(Benchmark("noop", lambda _: None), repeat=3, min_time=0.001)
+        if result["samples"] != 3 or result["min_ms"] > result["median_ms"]:
+            print(f"❌ Unexpected timing result: {result}")
+            return False
+        
+        baseline = {"results": {"kdf.argon2id": {"median_ms": 100.0}, "sss.split.pure": {"median_ms": 1.0}}}
+        current = {"results": {"kdf.argon2id": {"median_ms": 115.0}, "sss.split.pure": {"median_ms": 1.2},
+                               "new.bench": {"median_ms": 5.0}}}
+        rows = {r["name"]: r for r in compare(current, baseline, 0.10, {"kdf": 0.25})}
+        if set(rows) != {"kdf.argon2id", "sss.split.pure"}:
+            print(f"❌ Unexpected comparison rows: {rows}")
+            return False
+        if rows["kdf.argon2id"]["regressed"] or not rows["sss.split.pure"]["regressed"]:
+            print("❌ Thresholds not applied per benchmark")
+            return False
+        print("✅ Timings and baseline regressions detected")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Benchmark test failed: {e}")
+        return False
+
+def test_tracing():
+    """Test span recording and Chrome trace output"""
+    print("\n🔬 Testing tracing spans...")
+    
+    temp_dir = tempfile.mkdtemp()
+    try:
+        import json
+        import tracing
+        from crypto import encrypt_password_aes_gcm
+        
+        if tracing.is_enabled() or tracing.span("noop") is not tracing.span("other"):
+            print("❌ Disabled tracing should hand out the shared no-op span")
+            return False
+        
+        tracing.clear()
+        tracing.enable(at_exit=False)
+        try:
+            encrypt_password_aes_gcm("secret", "master")
+            try:
+                with tracing.span("test.failing", step=1):
+                    raise ValueError("boom")
+            except ValueError:
+                pass
+        finally:
+            tracing.disable()
+        
+        path = tracing.write_trace(os.path.join(temp_dir, "trace.json"))
+        tracing.clear()
+        with open(path, "r", encoding="utf-8") as f:
+            events = json.load(f)["traceEvents"]
+        spans = {e["name"]: e for e in events if e["ph"] == "X"}
+        if not {"kdf.argon2id", "aes.encrypt", "test.failing"} <= set(spans):
+            print(f"❌ Missing spans: {sorted(spans)}")
+            return False
+        if spans["test.failing"]["args"] != {"step": 1, "error": "ValueError"} or spans["kdf.argon2id"]["cat"] != "kdf":
+            print(f"❌ Unexpected span fields: {spans['test.failing']}")
+            return False
+        if not any(e["ph"] == "M" for e in events):
+            print("❌ Thread names not recorded")
+            return False
+        print(f"✅ Recorded {len(spans)} spans in Chrome trace format")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Tracing test failed: {e}")
+        return False
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+def test_profiling():
+    """Test cProfile output and collapsed stacks"""
+    print("\n🔥 Testing profiling mode...")
+    
+    temp_dir = tempfile.mkdtemp()
+    try:
+        import profiling
+        from sss import _split_bytes_pure
+        
+        def work():
+            for _ in range(20):
+                _split_bytes_pure(os.urandom(16), 5, 3)
+        
+        with profiling.profile_operation("test-op", temp_dir):
+            work()
+        
+        files = sorted(os.listdir(temp_dir))
+        if len(files) != 2 or not files[0].startswith("test-op-") or not files[1].endswith(".pstats"):
+            print(f"❌ Unexpected profile files: {files}")
+            return False
+        with open(os.path.join(temp_dir, files[0]), "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        stacks = dict(line.rsplit(" ", 1) for line in lines)
+        if not any("work (" in stack and "_eval_poly" in stack for stack in stacks):
+            print(f"❌ Missing call path in collapsed stacks: {lines[:5]}")
+            return False
+        if not all(int(v) > 0 for v in stacks.values()):
+            print("❌ Collapsed stack counts must be positive")
+            return False
+        print(f"✅ Wrote pstats and {len(stacks)} collapsed stacks")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Profiling test failed: {e}")
+        return False
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+def test_memory_budget():
+    """Test memory budgets, the tiled embed path and per-stage accounting"""
+    print("\n🧮 Testing memory budgets...")
+    
+    temp_dir = tempfile.mkdtemp()
+    try:
+        import memory
+        from PIL import Image
+        from steganography import embed_data_into_image, extract_data_from_image
+        
+        if memory.parse_size("512M") != 512 << 20 or memory.parse_size("1.5GiB") != 3 << 29:
+            print("❌ Size parsing failed")
+            return False
+        
+        carrier = os.path.join(temp_dir, "carrier.png")
+        Image.effect_noise((120, 90), 64).convert("RGB").save(carrier)
+        payload = os.urandom(500)
+        pixel_path = embed_data_into_image(carrier, payload, os.path.join(temp_dir, "pixels.png"))
+        
+        previous = memory.get_budget()
+        memory.start_accounting()
+        try:
+            memory.set_budget(memory.estimate_embed(120, 90, tiled=True))
+            tiled_path = embed_data_into_image(carrier, payload, os.path.join(temp_dir, "tiled.png"))
+            extracted = extract_data_from_image(tiled_path)
+            memory.set_budget(memory.FIXED_OVERHEAD)
+            try:
+                embed_data_into_image(carrier, payload, os.path.join(temp_dir, "refused.png"))
+                print("❌ Embed over budget was not refused")
+                return False
+            except memory.MemoryBudgetError as e:
+                print(f"✅ Refused up front: {e}")
+        finally:
+            memory.set_budget(previous)
+            stages = memory.stop_accounting()
+        
+        if Image.open(pixel_path).tobytes() != Image.open(tiled_path).tobytes() or extracted != payload:
+            print("❌ Tiled path does not match the in-memory path")
+            return False
+        if "stego.lsb_embed" not in stages or stages["stego.lsb_embed"]["calls"] < 1:
+            print(f"❌ Missing stage accounting: {stages}")
+            return False
+        if os.path.exists(os.path.join(temp_dir, "refused.png")):
+            print("❌ Refused embed left an output behind")
+            return False
+        print("✅ Tiled embed matches the in-memory path; stages accounted")
+        
+        # Peak RSS of the tiled paths stays under the budget (a fresh interpreter
+        # per run, as the peak never goes down)
+        import subprocess
+        script = ("import sys, memory\n"
+                  "from steganography import embed_data_into_image, extract_data_from_image\n"
+                  "memory.set_budget(int(sys.argv[1]))\n"
+                  "if sys.argv[2] == 'embed':\n"
+                  "    embed_data_into_image(sys.argv[3], b'x' * 2000, sys.argv[4])\n"
+                  "else:\n"
+                  "    extract_data_from_image(sys.argv[3])\n"
+                  "print(memory.peak_rss_bytes())\n")
+        big = os.path.join(temp_dir, "big.png")
+        big_stego = os.path.join(temp_dir, "big_stego.png")
+        Image.new('RGB', (3000, 2000), color=(200, 120, 90)).save(big)
+        runs = [("embed", memory.estimate_embed(3000, 2000, tiled=True), [big, big_stego]),
+                # well under one decoded 3000x2000 image
+                ("extract", memory.FIXED_OVERHEAD + (8 << 20), [big_stego])]
+        for operation, budget, paths in runs:
+            result = subprocess.run([sys.executable, "-c", script, str(budget), operation] + paths,
+                                    cwd=os.path.dirname(os.path.abspath(__file__)),
+                                    capture_output=True, text=True)
+            if result.returncode != 0:
+                print(f"❌ Tiled {operation} failed: {result.stderr.strip()}")
+                return False
+            peak = result.stdout.split()[-1]
+            if peak != "None" and int(peak) > budget:
+                print(f"❌ Tiled {operation} peaked at {memory.format_size(int(peak))}, "
+                      f"over its budget of {memory.format_size(budget)}")
+                return False
+            print(f"✅ Tiled {operation} peaked at {peak if peak == 'None' else memory.format_size(int(peak))} "
+                  f"(budget {memory.format_size(budget)})")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Memory budget test failed: {e}")
+        return False
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+def _png_with_filters(path, img):
+    """Save img as an 8-bit PNG whose scanlines cycle through all five filter types"""
+    import struct, zlib
+    colour, channels = {"L": (0, 1), "RGB": (2, 3), "LA": (4, 2), "RGBA": (6, 4)}[img.mode]
+    width, height = img.size
+    stride = width * channels
+    data = img.tobytes()
+    raw = bytearray()
+    prev = bytes(stride)
+    for y in range(height):
+        line = data[y * stride:(y + 1) * stride]
+        kind = y % 5
+        raw.append(kind)
+        for i in range(stride):
+            a = line[i - channels] if i >= channels else 0
+            b = prev[i]
+            c = prev[i - channels] if i >= channels else 0
+            pa, pb, pc = abs(b - c), abs(a - c), abs(a + b - 2 * c)
+            predictor = [0, a, b, (a + b) >> 1, a if pa <= pb and pa <= pc else b if pb <= pc else c][kind]
+            raw.append((line[i] - predictor) & 0xFF)
+        prev = line
+    def chunk(kind, body):
+        return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body))
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, colour, 0, 0, 0)))
+        compressed = zlib.compress(bytes(raw))
+        for start in range(0, len(compressed), 97):   # several IDAT chunks
+            f.write(chunk(b"IDAT", compressed[start:start + 97]))
+        f.write(chunk(b"IEND", b""))
+
+def test_partial_decode():
+    """Test that decoding the top rows of a PNG matches a full decode"""
+    print("\n✂️ Testing partial PNG decode...")
+    
+    temp_dir = tempfile.mkdtemp()
+    try:
+        import random
+        import zlib
+        from PIL import Image
+        from steganography import _decode_rows, _decodes_rows
+        
+        rng = random.Random(7)
+        width, height = 37, 41
+        noise = Image.new('RGB', (width, height))
+        noise.putdata([tuple(rng.randrange(256) for _ in range(3)) for _ in range(width * height)])
+        cases = []
+        for mode in ("RGB", "RGBA", "L", "LA"):
+            path = os.path.join(temp_dir, f"filtered_{mode}.png")
+            _png_with_filters(path, noise.convert(mode))
+            cases.append(path)
+            path = os.path.join(temp_dir, f"pillow_{mode}.png")
+            noise.convert(mode).save(path)
+            cases.append(path)
+        path = os.path.join(temp_dir, "pillow_P.png")
+        noise.quantize(64).save(path)
+        cases.append(path)
+        
+        for path in cases:
+            with Image.open(path) as img:
+                if not _decodes_rows(img):
+                    print(f"❌ {os.path.basename(path)} not decoded by rows")
+                    return False
+                full = img.convert('RGB')
+            for rows in (1, 2, 5, 6, 23, height - 1):
+                with Image.open(path) as img:
+                    band = _decode_rows(img, rows)
+                if band.tobytes() != full.crop((0, 0, width, rows)).tobytes():
+                    print(f"❌ {os.path.basename(path)}: top {rows} rows differ from the full decode")
+                    return False
+        print(f"✅ Top rows of {len(cases)} PNGs match the full decode (all five filter types)")
+        
+        # Interlaced PNGs (flag set in IHDR) and other formats are decoded whole
+        interlaced = os.path.join(temp_dir, "interlaced.png")
+        with open(cases[0], "rb") as f:
+            data = bytearray(f.read())
+        data[28] = 1
+        data[29:33] = zlib.crc32(bytes(data[12:29])).to_bytes(4, "big")
+        with open(interlaced, "wb") as f:
+            f.write(data)
+        with Image.open(interlaced) as img:
+            if _decodes_rows(img):
+                print("❌ Interlaced PNG decoded by rows")
+                return False
+        bmp = os.path.join(temp_dir, "carrier.bmp")
+        noise.save(bmp)
+        with Image.open(bmp) as img:
+            if _decodes_rows(img) or _decode_rows(img, 3).tobytes() != noise.crop((0, 0, width, 3)).tobytes():
+                print("❌ BMP crop fallback differs")
+                return False
+        print("✅ Interlaced PNGs and other formats fall back to a full decode")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Partial decode test failed: {e}")
+        return False
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+def test_metrics():
+    """Test the metrics registry and textfile exporter"""
+    print("\n📟 Testing metrics...")
+    
+    temp_dir = tempfile.mkdtemp()
+    try:
+        import metrics
+        from PIL import Image
+        from steganography import embed_data_into_image, extract_data_from_image
+        
+        registry = metrics.Registry()
+        hits = registry.counter("t_hits_total", "Hits.", ["kind"])
+        latency = registry.histogram("t_latency_seconds", "Latency.", buckets=(0.1, 1.0))
+        hits.inc(kind="a")
+        hits.inc(2, kind='b"x')
+        latency.observe(0.05)
+        latency.observe(0.5)
+        text = registry.render()
+        for line in ('t_hits_total{kind="a"} 1', 't_hits_total{kind="b\\"x"} 2', 't_latency_seconds_bucket{le="0.1"} 1',
+                     't_latency_seconds_bucket{le="+Inf"} 2', "t_latency_seconds_count 2", "# TYPE t_hits_total counter"):
+            if line not in text.splitlines():
+                print(f"❌ Missing line {line!r} in:\n{text}")
+                return False
+        
+        embedded = metrics.SHARES_EMBEDDED.value()
+        no_payload = metrics.EXTRACTION_FAILURES.value(reason="no_payload")
+        carrier = os.path.join(temp_dir, "carrier.png")
+        Image.effect_noise((64, 64), 64).convert("RGB").save(carrier)
+        stego = embed_data_into_image(carrier, b"payload", os.path.join(temp_dir, "stego.png"))
+        extract_data_from_image(stego)
+        try:
+            extract_data_from_image(carrier)
+        except ValueError:
+            pass
+        if metrics.SHARES_EMBEDDED.value() != embedded + 1 or \
+                metrics.EXTRACTION_FAILURES.value(reason="no_payload") != no_payload + 1:
+            print("❌ Steganography did not update the metrics")
+            return False
+        
+        path = os.path.join(temp_dir, "fk.prom")
+        with metrics.TextfileExporter(path, interval=60, registry=registry):
+            pass
+        with open(path, "r", encoding="utf-8") as f:
+            if f.read() != text or len(os.listdir(temp_dir)) != 3:
+                print("❌ Exporter output differs or left a temporary file")
+                return False
+        print("✅ Counters, histograms and textfile export working")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Metrics test failed: {e}")
+        return False
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+def test_progress():
+    """Test progress callbacks from embed, save, extract and key derivation"""
+    print("\n📶 Testing progress reporting...")
+    
+    temp_dir = tempfile.mkdtemp()
+    try:
+        from PIL import Image
+        from crypto import derive_key_argon2id
+        from steganography import embed_data_into_image, extract_data_from_image
+        
+        carrier = os.path.join(temp_dir, "carrier.png")
+        Image.effect_noise((128, 128), 64).convert("RGB").save(carrier)
+        events = []
+        stego = embed_data_into_image(carrier, os.urandom(5000), os.path.join(temp_dir, "stego.png"),
+                                      progress=events.append)
+        extract_data_from_image(stego, progress=events.append)
+        derive_key_argon2id("progress", b"\x00" * 16)   # gives the next derivation an expected duration
+        derive_key_argon2id("progress", b"\x00" * 16, progress=events.append)
+        
+        stages = [e.stage for e in events if e.done == e.total]
+        if stages != ["decode", "embed", "save", "decode", "extract", "kdf"]:
+            print(f"❌ Unexpected finished stages: {stages}")
+            return False
+        save = [e for e in events if e.stage == "save"][-1]
+        if save.total != os.path.getsize(stego) or save.eta != 0.0:
+            print(f"❌ Save progress does not end at the file size: {save.total}")
+            return False
+        kdf_start = [e for e in events if e.stage == "kdf"][0]
+        if kdf_start.expected is None or kdf_start.eta is None:
+            print("❌ Key derivation progress has no expected duration")
+            return False
+        print("✅ Stages report progress, totals and ETAs")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Progress test failed: {e}")
+        return False
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+def test_cancellation():
+    """Test cancel tokens and deadlines in embedding and the CLI"""
+    print("\n🛑 Testing cancellation...")
+    
+    import io
+    import json
+    temp_dir = tempfile.mkdtemp()
+    old_stdin = sys.stdin
+    try:
+        from PIL import Image
+        from cancel import CancelToken, Cancelled, DeadlineExceeded
+        from cli import main as cli_main
+        from steganography import embed_data_into_image
+        
+        carrier = os.path.join(temp_dir, "carrier.png")
+        Image.effect_noise((256, 256), 64).convert("RGB").save(carrier)
+        output = os.path.join(temp_dir, "stego.png")
+        
+        for stage in ("embed", "save"):
+            token = CancelToken()
+            
+            def cancel_at(event, stage=stage, token=token):
+                if event.stage == stage and event.done < event.total:
+                    token.cancel()
+            try:
+                embed_data_into_image(carrier, os.urandom(20000), output, progress=cancel_at, cancel=token)
+                print(f"❌ Cancelling during {stage} did not stop the embed")
+                return False
+            except Cancelled:
+                pass
+            if sorted(os.listdir(temp_dir)) != ["carrier.png"]:
+                print(f"❌ Cancelled {stage} left files: {os.listdir(temp_dir)}")
+                return False
+        
+        try:
+            CancelToken(timeout=0).check()
+            print("❌ Expired deadline not reported")
+            return False
+        except DeadlineExceeded:
+            pass
+        
+        sys.stdin = io.StringIO("")
+        out = io.StringIO()
+        code = cli_main(["--timeout", "0", "extract", carrier], out=out)
+        lines = [json.loads(line) for line in out.getvalue().splitlines()]
+        if code != 124 or lines[-1]["op"] != "cancelled":
+            print(f"❌ CLI deadline not reported: {code} {lines}")
+            return False
+        print("✅ Cancelled embeds leave no files; deadlines stop the CLI")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Cancellation test failed: {e}")
+        return False
+    finally:
+        sys.stdin = old_stdin
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+def test_carrier_fit():
+    """Test carrier capacity and payload size predictions against real embeds"""
+    print("\n📐 Testing carrier fit...")
+    
+    temp_dir = tempfile.mkdtemp()
+    try:
+        from PIL import Image
+        from share_codec import share_payload_size, wrap_share_payload
+        from sss import share_length, split_bytes_into_shares
+        from steganography import capacity_bytes, carrier_size, embed_data_into_image, embedded_size
+        
+        share = split_bytes_into_shares(os.urandom(16))[0]
+        packaged = os.urandom(150)
+        payload = wrap_share_payload(share, 1, 3, 2, packaged, flags=1, blind_tags=[os.urandom(16)])
+        if len(share) != share_length() or len(payload) != share_payload_size(len(share), 150, 1, 1):
+            print("❌ Predicted share payload size differs from the real one")
+            return False
+        
+        needed = embedded_size(len(payload))
+        pixels = -(-needed * 8 // 3)   # fewest pixels that hold the payload
+        for height, fits in ((pixels, True), (pixels - 1, False)):
+            carrier = os.path.join(temp_dir, f"carrier{height}.png")
+            Image.new("RGB", (1, height)).save(carrier)
+            if carrier_size(carrier) != (1, height) or (capacity_bytes(1, height) >= needed) != fits:
+                print(f"❌ Wrong capacity for a 1x{height} carrier")
+                return False
+            try:
+                embed_data_into_image(carrier, payload, os.path.join(temp_dir, "stego.png"))
+                embedded = True
+            except ValueError:
+                embedded = False
+            if embedded != fits:
+                print(f"❌ Fit prediction {fits} but embed {'succeeded' if embedded else 'failed'}")
+                return False
+        print("✅ Capacity and payload size predictions match embedding")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Carrier fit test failed: {e}")
+        return False
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+def test_batch_recovery():
+    """Test recovering every share set in a folder with one derivation per salt"""
+    print("\n🗂️ Testing batch recovery...")
+    
+    temp_dir = tempfile.mkdtemp()
+    try:
+        from PIL import Image
+        import metrics
+        from batch_recovery import recover_folder
+        from crypto import derive_key_argon2id, encrypt_password_with_key, encrypt_password_aes_gcm
+        from session_key import package_binary_blob
+        from share_codec import wrap_share_payload
+        from sss import split_bytes_into_shares
+        from steganography import embed_data_into_image
+        
+        carrier = os.path.join(temp_dir, "carrier.bmp")   # not an indexed extension
+        Image.effect_noise((60, 60), 64).convert("RGB").save(carrier)
+        
+        def write_set(name, blob, keep, folders=None):
+            k2, packaged = package_binary_blob(blob)
+            for i, share in enumerate(split_bytes_into_shares(k2), start=1):
+                if i in keep:
+                    folder = os.path.join(temp_dir, *(folders or {}).get(i, ()))
+                    os.makedirs(folder, exist_ok=True)
+                    embed_data_into_image(carrier, wrap_share_payload(share, i, 3, 2, packaged),
+                                          os.path.join(folder, f"{name}_{i}.png"))
+        
+        salt = os.urandom(16)
+        key = derive_key_argon2id("batch_master", salt)
+        for name in ("first", "second"):   # one salt, as the bulk importer writes them
+            write_set(name, b"".join(encrypt_password_with_key(f"pw-{name}", key, salt)), (1, 2, 3))
+        write_set("third", b"".join(encrypt_password_aes_gcm("pw-third", "batch_master")), (1, 3))
+        write_set("lost", b"".join(encrypt_password_aes_gcm("pw-lost", "batch_master")), (2,))
+        write_set("split", b"".join(encrypt_password_with_key("pw-split", key, salt)), (1, 2),
+                  {1: ("split", "a"), 2: ("split", "b")})
+        os.remove(carrier)
+        
+        import batch_recovery
+        reads = []
+        read_share = batch_recovery.read_share
+        batch_recovery.read_share = lambda path, cancel=None: reads.append(path) or read_share(path, cancel)
+        derivations = metrics.KDF_DURATION.count()
+        streamed = []
+        try:
+            results = recover_folder(temp_dir, "batch_master", on_result=streamed.append)
+            derivations = metrics.KDF_DURATION.count() - derivations
+            # A persistent index that also covers other folders does not complete a set
+            db_path = os.path.join(temp_dir, "index.db")
+            recover_folder(temp_dir, "batch_master", index_path=db_path)
+            half = recover_folder(os.path.join(temp_dir, "split", "a"), "batch_master", index_path=db_path)
+        finally:
+            batch_recovery.read_share = read_share
+        recovered = sorted(r.password for r in results if r.status == "recovered")
+        if recovered != ["pw-first", "pw-second", "pw-split", "pw-third"] or streamed != results:
+            print(f"❌ Unexpected batch results: {results}")
+            return False
+        if [r.status for r in results if r.password is None] != ["incomplete"]:
+            print(f"❌ Incomplete set not reported: {results}")
+            return False
+        if derivations != 2:
+            print("❌ Expected one key derivation per distinct salt")
+            return False
+        if {r.status for r in recover_folder(temp_dir, "wrong")} != {"incomplete", "wrong-password"}:
+            print("❌ Wrong master password not reported")
+            return False
+        if reads:
+            print(f"❌ Shares decoded again after the scan: {reads}")
+            return False
+        if [(r.status, r.shares) for r in half] != [("incomplete", 1)]:
+            print(f"❌ Set judged from shares outside the folder: {half}")
+            return False
+        print("✅ Folder recovered with one derivation per salt")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Batch recovery test failed: {e}")
+        return False
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+def test_cold_start():
+    """Test that the menu and CLI start without the heavy libraries"""
+    print("\n🚀 Testing cold start imports...")
+    
+    try:
+        from bench import STARTUP_SCENARIOS, heavy_imports, import_report
+        
+        for scenario in STARTUP_SCENARIOS:
+            rows = import_report(scenario)
+            if not rows:
+                print(f"❌ No import timings for {scenario}")
+                return False
+            heavy = heavy_imports(rows)
+            if heavy:
+                print(f"❌ {scenario} imports {', '.join(heavy)} at start")
+                return False
+        
+        import sss
+        if sss._USE_PYCRYPTO not in (True, False):
+            print("❌ sss backend not resolved on demand")
+            return False
+        print("✅ Menu and CLI start without heavy imports")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Cold start test failed: {e}")
+        return False
+
 def main():
     """Run all tests"""
     print("🧪 Fractured Keys - Basic Functionality Test")
@@ -152,7 +1353,28 @@ def main():
         test_imports,
         test_crypto,
         test_sss,
-        test_steganography
+        test_steganography,
+        test_share_codec,
+        test_vault,
+        test_bin_archive,
+        test_share_index,
+        test_blind_index,
+        test_cli,
+        test_import,
+        test_scrub,
+        test_journal,
+        test_load_generator,
+        test_bench,
+        test_tracing,
+        test_profiling,
+        test_memory_budget,
+        test_partial_decode,
+        test_metrics,
+        test_cold_start,
+        test_progress,
+        test_cancellation,
+        test_carrier_fit,
+        test_batch_recovery
     ]
     
     passed = 0
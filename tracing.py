@@ -0,0 +1,204 @@
+"""
+Lightweight spans around the hot paths, written as Chrome trace event JSON.
+
+    FK_TRACE=trace.json python run_gui.py
+    FK_TRACE=trace.json python __main__.py
+    python __main__.py --trace trace.json decrypt ...      # CLI flag
+
+Open the file in https://ui.perfetto.dev (or chrome://tracing). Stages are wrapped as
+
+    with span("stego.lsb_embed", bytes=len(payload)):
+        ...
+
+or with the @traced("sss.split") decorator. Each span becomes one complete ("X")
+event on the thread that ran it, so GUI workers and the share index probe pool get
+their own tracks; the text before the first dot of a name is its category.
+
+Disabled (the default), span() returns one shared no-op object, so an instrumented
+call costs a function call and a global lookup. Events are kept in memory and
+written once: at exit for FK_TRACE, or by write_trace(). Spans that run inside
+process-pool workers (bulk import) are not collected.
+
+Other per-stage accounting (memory.py) can hook into the same spans with
+add_listener(); listeners see every span even while no trace is being written.
+"""
+
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+TRACE_ENV = "FK_TRACE"
+_OWNER_ENV = "FK_TRACE_PID"   # set by the process that owns the trace file; children skip FK_TRACE
+
+_enabled = False     # recording trace events
+_active = False      # recording or listeners registered: spans are live
+_listeners: list = []
+_path: Optional[str] = None
+_events: list = []
+_named_threads: set = set()
+_lock = threading.Lock()
+_atexit_registered = False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+class _Span:
+    __slots__ = ("name", "args", "start", "states")
+
+    def __init__(self, name: str, args: dict):
+        self.name = name
+        self.args = args
+        self.start = 0
+        self.states = None
+
+    def __enter__(self):
+        if _listeners:
+            self.states = [(listener, listener.span_enter(self.name)) for listener in _listeners]
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        if self.states:
+            for listener, state in reversed(self.states):
+                listener.span_exit(self.name, state, self.args)
+        if _enabled:
+            _record(self.name, self.start, end - self.start, self.args)
+        return False
+
+    def set(self, **args):
+        """Attach more arguments to the span once they are known (e.g. sizes)."""
+        self.args.update(args)
+
+
+def _record(name: str, start_ns: int, dur_ns: int, args: dict):
+    thread = threading.current_thread()
+    tid = threading.get_native_id()
+    event = {"name": name, "cat": name.split(".", 1)[0], "ph": "X", "pid": os.getpid(), "tid": tid,
+             "ts": start_ns / 1000, "dur": dur_ns / 1000}
+    if args:
+        event["args"] = args
+    with _lock:
+        if tid not in _named_threads:
+            _named_threads.add(tid)
+            _events.append({"name": "thread_name", "ph": "M", "pid": event["pid"], "tid": tid,
+                            "args": {"name": thread.name}})
+        _events.append(event)
+
+
+def record_span(name: str, start_ns: int, end_ns: Optional[int] = None, **args):
+    """
+    Record a span whose start was taken earlier with time.perf_counter_ns(), e.g.
+    launch-to-first-paint. Listeners do not see it.
+    """
+    if _enabled:
+        _record(name, start_ns, (end_ns or time.perf_counter_ns()) - start_ns, args)
+
+
+def span(name: str, **args):
+    """Context manager timing the enclosed block as a span called name."""
+    if not _active:
+        return _NO_SPAN
+    return _Span(name, args)
+
+
+def traced(name: Optional[str] = None):
+    """Decorator form of span(); name defaults to the function's qualified name."""
+    def decorate(fn):
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _active:
+                return fn(*args, **kwargs)
+            with _Span(label, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def enable(path: Optional[str] = None, at_exit: bool = True):
+    """Start recording spans. With at_exit, path is written when the interpreter exits."""
+    global _enabled, _active, _path, _atexit_registered
+    _path = path or _path
+    _enabled = _active = True
+    if at_exit and not _atexit_registered:
+        atexit.register(_write_at_exit)
+        _atexit_registered = True
+
+
+def disable():
+    global _enabled, _active
+    _enabled = False
+    _active = bool(_listeners)
+
+
+def add_listener(listener):
+    """
+    Call listener.span_enter(name) -> state and listener.span_exit(name, state, args)
+    around every span; span_exit may add entries to args.
+    """
+    global _active
+    _listeners.append(listener)
+    _active = True
+
+
+def remove_listener(listener):
+    global _active
+    _listeners.remove(listener)
+    _active = _enabled or bool(_listeners)
+
+
+def events() -> list:
+    with _lock:
+        return list(_events)
+
+
+def clear():
+    with _lock:
+        _events.clear()
+        _named_threads.clear()
+
+
+def write_trace(path: Optional[str] = None) -> str:
+    """Write the recorded events as a Chrome trace file. Returns the path written."""
+    path = path or _path
+    if not path:
+        raise ValueError("No trace file given")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events(), "displayTimeUnit": "ms"}, f)
+    return path
+
+
+def _write_at_exit():
+    if _enabled and _path and _events:
+        write_trace(_path)
+
+
+if os.environ.get(TRACE_ENV) and os.environ.get(_OWNER_ENV, str(os.getpid())) == str(os.getpid()):
+    os.environ[_OWNER_ENV] = str(os.getpid())
+    enable(os.environ[TRACE_ENV])
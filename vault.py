@@ -0,0 +1,356 @@
+"""
+Multi-entry vault container stored as the packaged_cipher of one share set.
+
+Container layout:
+    VAULT_MAGIC (6) | salt (16) | check (28) | sealed_index_len (4 BE) | sealed_index | entry region
+
+    check        = nonce (12) | AES-GCM(entry_key, b"", aad=VAULT_MAGIC|salt)
+    sealed_index = nonce (12) | AES-GCM(K2, index, aad=VAULT_MAGIC|salt)
+    index        = count (4 BE) then, sorted by label:
+                   label_len (2 BE) | label (utf-8) | offset (4 BE) | length (4 BE)
+    entry        = nonce (12) | AES-GCM(entry_key, secret, aad=salt|label)
+                   (offset is relative to the start of the entry region)
+    entry_key    = HMAC-SHA256(Argon2id(master_password, salt), ENTRY_KEY_INFO | K2)
+
+Looking up one label decrypts the index and that entry only; every entry in a vault
+shares one Argon2 derivation. Shares of a vault set are wrapped with FLAG_VAULT.
+check proves the master password before an entry is added, even to an empty vault.
+FKVT01 containers (no check field) are still read, and are rewritten as FKVT02
+when an entry is added.
+
+Adding an entry rewrites every image of the set, which must be PNGs. The new images
+are first written next to the old ones (UPDATE_SUFFIX), then moved over them; the
+move is recorded in a JobJournal (SWAP_JOURNAL, in the first image's folder), so a
+crash halfway through is completed the next time the set is loaded instead of
+leaving old and new shares that no longer match.
+"""
+
+import bisect
+import hashlib
+import hmac
+import os
+import struct
+from typing import Dict, List, Optional, Tuple
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from crypto import derive_key_argon2id
+from sss import split_bytes_into_shares
+from steganography import embed_data_into_image, extract_data_from_image
+from share_codec import wrap_share_payload, parse_share_payload, records_compatible, FLAG_VAULT
+from blind_index import blind_tag, derive_index_key
+from journal import JobJournal
+from session_key import (
+    new_session_key, seal_with_session_key, open_with_session_key, recover_session_key, NONCE_LEN
+)
+
+VAULT_MAGIC = b"FKVT02"
+VAULT_MAGIC_V1 = b"FKVT01"           # no check field
+VAULT_MAGIC_LEN = len(VAULT_MAGIC)
+SALT_LEN = 16
+CHECK_LEN = NONCE_LEN + 16           # nonce, GCM tag of an empty plaintext
+ENTRY_KEY_INFO = b"FKVT01 entry key"
+UPDATE_SUFFIX = ".fkvt-new"          # updated image waiting to replace the original
+SWAP_JOURNAL = ".fkvt-swap.journal"
+
+_HEADER = struct.Struct(">6s16s28sI")   # magic, salt, check, sealed_index_len
+_HEADER_V1 = struct.Struct(">6s16sI")    # magic, salt, sealed_index_len
+_COUNT = struct.Struct(">I")
+_LABEL_LEN = struct.Struct(">H")
+_LOCATION = struct.Struct(">II")     # offset, length
+
+
+class VaultIndex:
+    """Decrypted, label-sorted entry table of a vault."""
+    __slots__ = ("labels", "offsets", "lengths")
+
+    def __init__(self, labels: List[str], offsets: List[int], lengths: List[int]):
+        self.labels = labels
+        self.offsets = offsets
+        self.lengths = lengths
+
+    def __len__(self):
+        return len(self.labels)
+
+    def find(self, label: str) -> Optional[int]:
+        """Position of label in the table, or None."""
+        pos = bisect.bisect_left(self.labels, label)
+        if pos < len(self.labels) and self.labels[pos] == label:
+            return pos
+        return None
+
+
+def _encode_index(index: VaultIndex) -> bytes:
+    out = bytearray(_COUNT.pack(len(index)))
+    for label, offset, length in zip(index.labels, index.offsets, index.lengths):
+        raw = label.encode('utf-8')
+        out += _LABEL_LEN.pack(len(raw)) + raw + _LOCATION.pack(offset, length)
+    return bytes(out)
+
+
+def _decode_index(data: bytes) -> VaultIndex:
+    (count,) = _COUNT.unpack_from(data, 0)
+    pos = _COUNT.size
+    labels, offsets, lengths = [], [], []
+    for _ in range(count):
+        (label_len,) = _LABEL_LEN.unpack_from(data, pos)
+        pos += _LABEL_LEN.size
+        labels.append(bytes(data[pos:pos + label_len]).decode('utf-8'))
+        pos += label_len
+        offset, length = _LOCATION.unpack_from(data, pos)
+        pos += _LOCATION.size
+        offsets.append(offset)
+        lengths.append(length)
+    return VaultIndex(labels, offsets, lengths)
+
+
+def _split_container(container) -> Tuple[bytes, bytes, Optional[bytes], memoryview, memoryview]:
+    """Return (magic, salt, check, sealed_index, entry_region) of a container; check is None for FKVT01."""
+    view = container if isinstance(container, memoryview) else memoryview(container)
+    magic = bytes(view[:VAULT_MAGIC_LEN])
+    header = {VAULT_MAGIC: _HEADER, VAULT_MAGIC_V1: _HEADER_V1}.get(magic)
+    if header is None:
+        raise ValueError("Vault magic mismatch")
+    if len(view) < header.size:
+        raise ValueError("Vault container too short / malformed")
+    if header is _HEADER:
+        _, salt, check, sealed_len = header.unpack_from(view, 0)
+    else:
+        (_, salt, sealed_len), check = header.unpack_from(view, 0), None
+    end = header.size + sealed_len
+    if end > len(view):
+        raise ValueError("Declared index size exceeds container size")
+    return magic, salt, check, view[header.size:end], view[end:]
+
+
+def _seal_check(entry_key: bytes, salt: bytes) -> bytes:
+    nonce = os.urandom(NONCE_LEN)
+    return nonce + AESGCM(entry_key).encrypt(nonce, b"", VAULT_MAGIC + salt)
+
+
+def _assemble(salt: bytes, k2: bytes, entry_key: bytes, index: VaultIndex, region: bytes) -> bytes:
+    sealed_index = seal_with_session_key(k2, _encode_index(index), VAULT_MAGIC + salt)
+    check = _seal_check(entry_key, salt)
+    return _HEADER.pack(VAULT_MAGIC, salt, check, len(sealed_index)) + sealed_index + region
+
+
+def is_vault_container(data) -> bool:
+    return len(data) >= VAULT_MAGIC_LEN and bytes(data[:VAULT_MAGIC_LEN]) in (VAULT_MAGIC, VAULT_MAGIC_V1)
+
+
+def container_salt(container) -> bytes:
+    return _split_container(container)[1]
+
+
+def derive_entry_key(master_password: str, salt: bytes, k2: bytes) -> bytes:
+    """One Argon2id run per vault; the result opens every entry in it."""
+    master_key = derive_key_argon2id(master_password, salt)
+    return hmac.new(master_key, ENTRY_KEY_INFO + k2, hashlib.sha256).digest()
+
+
+def _seal_entry(entry_key: bytes, salt: bytes, label: str, secret: str) -> bytes:
+    nonce = os.urandom(NONCE_LEN)
+    aad = salt + label.encode('utf-8')
+    return nonce + AESGCM(entry_key).encrypt(nonce, secret.encode('utf-8'), aad)
+
+
+def build_vault(entries: Dict[str, str], k2: bytes, entry_key: bytes, salt: bytes) -> bytes:
+    """Pack label -> secret entries into a new container."""
+    labels = sorted(entries)
+    region = bytearray()
+    offsets, lengths = [], []
+    for label in labels:
+        sealed = _seal_entry(entry_key, salt, label, entries[label])
+        offsets.append(len(region))
+        lengths.append(len(sealed))
+        region += sealed
+    return _assemble(salt, k2, entry_key, VaultIndex(labels, offsets, lengths), bytes(region))
+
+
+def new_vault(entries: Dict[str, str], master_password: str, k2: bytes) -> bytes:
+    salt = os.urandom(SALT_LEN)
+    return build_vault(entries, k2, derive_entry_key(master_password, salt, k2), salt)
+
+
+def read_index(container, k2: bytes) -> VaultIndex:
+    """Decrypt the entry table only (needs K2, not the master password)."""
+    magic, salt, _, sealed_index, _ = _split_container(container)
+    return _decode_index(open_with_session_key(k2, sealed_index, magic + salt))
+
+
+def check_entry_key(container, k2: bytes, entry_key: bytes):
+    """
+    Raise cryptography's InvalidTag unless entry_key (i.e. the master password) is
+    the vault's. An FKVT01 container has no check value: one of its entries is
+    decrypted instead, and an empty one cannot be checked.
+    """
+    _, salt, check, _, _ = _split_container(container)
+    if check is not None:
+        AESGCM(entry_key).decrypt(check[:NONCE_LEN], check[NONCE_LEN:], VAULT_MAGIC + salt)
+        return
+    index = read_index(container, k2)
+    if len(index):
+        read_entry(container, k2, index.labels[0], entry_key)
+
+
+def read_entry(container, k2: bytes, label: str, entry_key: bytes) -> str:
+    """Decrypt a single entry. Raises KeyError if the label is not in the vault."""
+    _, salt, _, _, region = _split_container(container)
+    index = read_index(container, k2)
+    pos = index.find(label)
+    if pos is None:
+        raise KeyError(label)
+    offset, length = index.offsets[pos], index.lengths[pos]
+    if offset + length > len(region):
+        raise ValueError("Entry extends beyond vault container")
+    sealed = region[offset:offset + length]
+    aad = salt + label.encode('utf-8')
+    return AESGCM(entry_key).decrypt(sealed[:NONCE_LEN], sealed[NONCE_LEN:], aad).decode('utf-8')
+
+
+def add_entry(container, k2: bytes, label: str, secret: str, entry_key: bytes) -> bytes:
+    """
+    Return a new container with label set to secret. Existing sealed entries are
+    copied as-is; only the new entry and the index are encrypted.
+    """
+    _, salt, _, _, region = _split_container(container)
+    index = read_index(container, k2)
+    sealed = _seal_entry(entry_key, salt, label, secret)
+
+    labels, offsets, lengths = [], [], []
+    new_region = bytearray()
+    for old_label, offset, length in zip(index.labels, index.offsets, index.lengths):
+        if old_label == label:
+            continue
+        labels.append(old_label)
+        offsets.append(len(new_region))
+        lengths.append(length)
+        new_region += region[offset:offset + length]
+
+    pos = bisect.bisect_left(labels, label)
+    labels.insert(pos, label)
+    offsets.insert(pos, len(new_region))
+    lengths.insert(pos, len(sealed))
+    new_region += sealed
+    return _assemble(salt, k2, entry_key, VaultIndex(labels, offsets, lengths), bytes(new_region))
+
+
+# --- Share-set operations ---
+
+def create_vault_set(entries: Dict[str, str], master_password: str, carrier_paths: List[str],
+                     output_paths: List[Optional[str]] = None, threshold: int = 2,
+                     with_blind_index: bool = False) -> List[str]:
+    """
+    Create a vault and embed one share into each carrier. Returns saved stego paths.
+    with_blind_index tags the share headers with every entry label; read the
+    tradeoff in blind_index.py before turning it on.
+    """
+    total = len(carrier_paths)
+    if output_paths is None:
+        output_paths = [None] * total
+    k2 = new_session_key()
+    container = new_vault(entries, master_password, k2)
+    blind_tags = []
+    if with_blind_index:
+        index_key = derive_index_key(master_password, create=True)
+        blind_tags = sorted(blind_tag(index_key, label) for label in entries)
+    shares = split_bytes_into_shares(k2, n=total, k=threshold)
+    saved = []
+    for i, (share_bytes, carrier, out) in enumerate(zip(shares, carrier_paths, output_paths), start=1):
+        payload = wrap_share_payload(share_bytes, index=i, total=total, threshold=threshold,
+                                     packaged_cipher=container, flags=FLAG_VAULT, blind_tags=blind_tags)
+        saved.append(embed_data_into_image(carrier, payload, output_path=out))
+    return saved
+
+
+def _swap_journal_path(image_path: str) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(image_path)), SWAP_JOURNAL)
+
+
+def finish_interrupted_update(image_paths: List[str]):
+    """Complete an add_entry_to_set that stopped while moving the updated images into place."""
+    for journal_path in sorted({_swap_journal_path(path) for path in image_paths}):
+        if not os.path.exists(journal_path):
+            continue
+        with JobJournal(journal_path) as journal:
+            for target in journal.begun.get("swap", []):
+                if os.path.exists(target + UPDATE_SUFFIX):
+                    os.replace(target + UPDATE_SUFFIX, target)
+        os.remove(journal_path)
+
+
+def _replace_all(targets: List[str]):
+    """Move every target's updated image over it, as one journaled step."""
+    journal_path = _swap_journal_path(targets[0])
+    with JobJournal(journal_path, {"vault_update": targets}) as journal:
+        journal.begin("swap", targets)   # from here on the update is completed, never rolled back
+        for target in targets:
+            os.replace(target + UPDATE_SUFFIX, target)
+        journal.finish("swap", targets)
+    os.remove(journal_path)
+
+
+def load_vault_set(image_paths: List[str]):
+    """
+    Extract and validate the shares of a vault set and recover K2.
+    Returns (records, paths, k2); records[i] was read from paths[i].
+    """
+    finish_interrupted_update(image_paths)
+    records, paths = [], []
+    for path in image_paths:
+        records.append(parse_share_payload(extract_data_from_image(path)))
+        paths.append(path)
+    if not records_compatible(records):
+        raise ValueError("Selected shares do not belong to the same set")
+    if not records[0].is_vault:
+        raise ValueError("Selected shares are not a vault set")
+    threshold = records[0].threshold
+    if len(records) < threshold:
+        raise ValueError(f"Need at least {threshold} shares; got {len(records)}")
+    k2 = recover_session_key([r.share_bytes for r in records[:threshold]])
+    return records, paths, k2
+
+
+def lookup_in_set(image_paths: List[str], master_password: str, label: str) -> str:
+    records, _, k2 = load_vault_set(image_paths)
+    container = records[0].packaged_cipher
+    entry_key = derive_entry_key(master_password, container_salt(container), k2)
+    return read_entry(container, k2, label, entry_key)
+
+
+def add_entry_to_set(image_paths: List[str], master_password: str, label: str, secret: str) -> List[str]:
+    """
+    Add or replace one entry and re-embed the updated container into every image of
+    the set in place. All images of the set are required, and must be PNGs.
+    """
+    for path in image_paths:
+        if not path.lower().endswith(".png"):
+            raise ValueError(f"Cannot update {path} in place: vault images are rewritten as PNG")
+    records, paths, k2 = load_vault_set(image_paths)
+    total = records[0].total
+    if sorted(r.index for r in records) != list(range(1, total + 1)):
+        raise ValueError(f"All {total} images of the set are needed to add an entry")
+
+    container = records[0].packaged_cipher
+    entry_key = derive_entry_key(master_password, container_salt(container), k2)
+    check_entry_key(container, k2, entry_key)   # before anything is rewritten
+    updated = add_entry(container, k2, label, secret, entry_key)
+
+    blind_tags = list(records[0].iter_blind_tags())
+    if blind_tags:
+        tag = blind_tag(derive_index_key(master_password, create=True), label)
+        if tag not in blind_tags:
+            blind_tags = sorted(blind_tags + [tag])
+
+    targets = [os.path.abspath(path) for path in paths]
+    try:
+        for record, target in zip(records, targets):
+            payload = wrap_share_payload(record.share_bytes, index=record.index, total=record.total,
+                                         threshold=record.threshold, packaged_cipher=updated,
+                                         flags=record.flags, blind_tags=blind_tags)
+            embed_data_into_image(target, payload, output_path=target + UPDATE_SUFFIX)
+    except BaseException:
+        for target in targets:
+            if os.path.exists(target + UPDATE_SUFFIX):
+                os.remove(target + UPDATE_SUFFIX)
+        raise
+    _replace_all(targets)
+    return paths
@@ -0,0 +1,117 @@
+# vault_mode.py
+import getpass
+from colors import print_colored, Colors
+from file_utils import create_file_chooser
+from vault import create_vault_set, load_vault_set, lookup_in_set, add_entry_to_set, read_index
+from blind_index import LABEL_WARNING
+
+IMAGE_TYPES = [("Images", ("*.png","*.jpg","*.jpeg","*.bmp","*.tiff")), ("All files", "*.*")]
+PNG_TYPES = [("PNG images", "*.png")]   # adding an entry rewrites the images in place
+
+def _select_images(title: str, min_required: int, file_types=IMAGE_TYPES) -> list:
+    """Pick images one by one until the user cancels with at least min_required selected."""
+    selected = []
+    while True:
+        path = create_file_chooser(f"{title} (or Cancel to finish selection)", file_types, mode="open")
+        if not path:
+            if len(selected) >= min_required:
+                break
+            print_colored(f"You need to select at least {min_required} images to continue.", Colors.WARNING)
+            continue
+        if path not in selected:
+            selected.append(path)
+            print_colored(f"Selected: {path}", Colors.INFO)
+    return selected
+
+def _read_master_password() -> str:
+    master_password = getpass.getpass("Enter master password: ").strip()
+    if not master_password:
+        print_colored("Master password cannot be empty.", Colors.ERROR)
+    return master_password
+
+def _vault_create():
+    entries = {}
+    print_colored("Enter entries (empty label to finish).", Colors.INFO)
+    while True:
+        label = input("Entry label (e.g. github): ").strip()
+        if not label:
+            break
+        secret = getpass.getpass(f"Password for '{label}': ").strip()
+        if not secret:
+            print_colored("Password cannot be empty; entry skipped.", Colors.WARNING)
+            continue
+        entries[label] = secret
+    if not entries:
+        print_colored("No entries given. Aborting.", Colors.WARNING)
+        return
+    master_password = _read_master_password()
+    if not master_password:
+        return
+
+    print_colored(f"Blind-index labels make the vault findable by entry label. {LABEL_WARNING}", Colors.WARNING)
+    with_labels = input("Tag the shares with the entry labels? [y/N]: ").strip().lower() in ("y", "yes")
+
+    carriers = []
+    for i in range(1, 4):
+        path = create_file_chooser(f"Select carrier image for share {i}", IMAGE_TYPES, mode="open")
+        if not path:
+            print_colored("No carrier selected. Aborting.", Colors.ERROR)
+            return
+        carriers.append(path)
+
+    print_colored(f"Sealing {len(entries)} entries and embedding 3 shares...", Colors.INFO)
+    saved = create_vault_set(entries, master_password, carriers, with_blind_index=with_labels)
+    for path in saved:
+        print_colored(f"✓ Vault share embedded into {path}", Colors.SUCCESS)
+
+def _vault_add():
+    images = _select_images("Select every stego image of the vault set", 2, PNG_TYPES)
+    label = input("Entry label: ").strip()
+    secret = getpass.getpass(f"Password for '{label}': ").strip()
+    if not label or not secret:
+        print_colored("Label and password cannot be empty.", Colors.ERROR)
+        return
+    master_password = _read_master_password()
+    if not master_password:
+        return
+    saved = add_entry_to_set(images, master_password, label, secret)
+    print_colored(f"✓ Entry '{label}' stored; re-embedded {len(saved)} images in place.", Colors.SUCCESS)
+
+def _vault_list():
+    images = _select_images("Select stego images of the vault set", 2)
+    records, _, k2 = load_vault_set(images)
+    index = read_index(records[0].packaged_cipher, k2)
+    print_colored(f"Vault holds {len(index)} entries:", Colors.INFO, Colors.BOLD)
+    for label in index.labels:
+        print_colored(f"  {label}", Colors.RESULT)
+
+def _vault_lookup():
+    images = _select_images("Select stego images of the vault set", 2)
+    label = input("Entry label to look up: ").strip()
+    master_password = _read_master_password()
+    if not master_password:
+        return
+    try:
+        plaintext = lookup_in_set(images, master_password, label)
+    except KeyError:
+        print_colored(f"No entry named '{label}' in this vault.", Colors.ERROR)
+        return
+    print_colored("\n--- VAULT LOOKUP RESULT ---", Colors.SUCCESS, Colors.BOLD)
+    print_colored(f"Decrypted password for '{label}': {plaintext}", Colors.RESULT, Colors.BOLD)
+
+def vault_mode():
+    print_colored("\n--- VAULT MODE (many entries in one stego set) ---", Colors.INFO, Colors.BOLD)
+    print("1. Create a new vault set")
+    print("2. Add or replace an entry")
+    print("3. List entry labels")
+    print("4. Look up an entry")
+    choice = input("\nEnter your choice (1-4): ").strip()
+    actions = {"1": _vault_create, "2": _vault_add, "3": _vault_list, "4": _vault_lookup}
+    action = actions.get(choice)
+    if action is None:
+        print_colored("Invalid choice! Enter 1-4.", Colors.ERROR)
+        return
+    try:
+        action()
+    except Exception as e:
+        print_colored(f"Vault operation failed: {e}", Colors.ERROR)